@@ -1,7 +1,51 @@
 from django.contrib import admin
-from .models import Receita, Avaliacao, Comentario, ReceitaFavorita
+from django.db.models import ExpressionWrapper, F, FloatField, Value
+from django.db.models.functions import Greatest
+from .models import Receita, Avaliacao, Comentario, ReceitaFavorita, ConsultaBusca
 
 admin.site.register(Receita)
 admin.site.register(Avaliacao)
 admin.site.register(Comentario)
-admin.site.register(ReceitaFavorita)
\ No newline at end of file
+admin.site.register(ReceitaFavorita)
+
+
+@admin.register(ConsultaBusca)
+class ConsultaBuscaAdmin(admin.ModelAdmin):
+    """Relatório das consultas mais frequentes e mais lentas feitas à TheMealDB."""
+    list_display = (
+        'termo', 'tipo', 'total_consultas', 'taxa_acerto_cache', 'latencia_media_ms',
+        'latencia_max_ms', 'media_resultados', 'ultima_consulta',
+    )
+    list_filter = ('tipo',)
+    search_fields = ('termo',)
+    ordering = ('-total_consultas',)
+    date_hierarchy = 'ultima_consulta'
+
+    def get_queryset(self, request):
+        chamadas_api = Greatest(F('total_consultas') - F('acertos_cache'), Value(1))
+        return super().get_queryset(request).annotate(
+            _latencia_media=ExpressionWrapper(F('latencia_total_ms') / chamadas_api, output_field=FloatField()),
+            _media_resultados=ExpressionWrapper(
+                F('total_resultados') * 1.0 / Greatest(F('total_consultas'), Value(1)), output_field=FloatField()
+            ),
+        )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Latência média (ms)', ordering='_latencia_media')
+    def latencia_media_ms(self, obj):
+        return round(obj._latencia_media, 1)
+
+    @admin.display(description='Resultados por busca', ordering='_media_resultados')
+    def media_resultados(self, obj):
+        return round(obj._media_resultados, 1)
+
+    @admin.display(description='Acertos de cache')
+    def taxa_acerto_cache(self, obj):
+        if not obj.total_consultas:
+            return '-'
+        return f"{100 * obj.acertos_cache / obj.total_consultas:.0f}%"
@@ -0,0 +1,104 @@
+# app_receitas/admissao.py
+
+"""
+Controle de admissão para as chamadas à TheMealDB e ao tradutor. Cada processo
+aceita poucas requisições usando serviços externos ao mesmo tempo; as demais
+esperam um instante na fila e, sem vaga, seguem em modo degradado (só banco e
+cache). Assim, um serviço externo lento não prende todas as threads do worker
+e as páginas que só usam o banco continuam respondendo.
+"""
+
+import contextvars
+import threading
+from functools import wraps
+
+from django.conf import settings
+
+from .instrumentacao import medir
+
+# Estado da requisição atual em uma view limitada (None fora delas: sem limite)
+_estado = contextvars.ContextVar('estado_admissao', default=None)
+
+
+class Compartimento:
+    """Semáforo com espera limitada e contadores exportados em /metricas/."""
+
+    def __init__(self, nome, limite, espera):
+        self.nome = nome
+        self.limite = limite
+        self.espera = espera
+        self._semaforo = threading.BoundedSemaphore(limite)
+        self._lock = threading.Lock()
+        self.em_uso = 0
+        self.admitidas = 0
+        self.rejeitadas = 0
+
+    def entrar(self):
+        """Tenta ocupar uma vaga, esperando até `espera` segundos. Retorna se conseguiu."""
+        with medir('fila_upstream'):
+            admitida = self._semaforo.acquire(timeout=self.espera)
+        with self._lock:
+            if admitida:
+                self.em_uso += 1
+                self.admitidas += 1
+            else:
+                self.rejeitadas += 1
+        return admitida
+
+    def sair(self):
+        with self._lock:
+            self.em_uso -= 1
+        self._semaforo.release()
+
+    def exportar(self):
+        prefixo = f'receitas_{self.nome}'
+        with self._lock:
+            valores = (self.em_uso, self.admitidas, self.rejeitadas)
+        return [
+            f"# HELP {prefixo}_em_uso Requisições usando serviços externos agora (limite {self.limite}).",
+            f"# TYPE {prefixo}_em_uso gauge",
+            f"{prefixo}_em_uso {valores[0]}",
+            f"# HELP {prefixo}_admitidas_total Requisições que conseguiram vaga.",
+            f"# TYPE {prefixo}_admitidas_total counter",
+            f"{prefixo}_admitidas_total {valores[1]}",
+            f"# HELP {prefixo}_degradadas_total Requisições atendidas sem serviços externos por falta de vaga.",
+            f"# TYPE {prefixo}_degradadas_total counter",
+            f"{prefixo}_degradadas_total {valores[2]}",
+        ]
+
+
+compartimento_upstream = Compartimento(
+    'upstream', settings.UPSTREAM_MAX_SIMULTANEAS, settings.UPSTREAM_FILA_SEGUNDOS,
+)
+
+
+def upstream_disponivel():
+    """
+    Se a requisição atual pode chamar serviços externos. A vaga só é pedida na
+    primeira chamada, então páginas servidas do banco ou do cache não ocupam vaga;
+    depois disso, vale a mesma resposta até o fim da requisição.
+    """
+    estado = _estado.get()
+    if estado is None:
+        return True
+    if estado['admitida'] is None:
+        estado['admitida'] = compartimento_upstream.entrar()
+    return estado['admitida']
+
+
+def limitar_upstream(view):
+    """Decorador das views que dependem de serviços externos; marca com X-Degradado as respostas sem vaga."""
+    @wraps(view)
+    def _view(request, *args, **kwargs):
+        estado = {'admitida': None}
+        token = _estado.set(estado)
+        try:
+            response = view(request, *args, **kwargs)
+        finally:
+            _estado.reset(token)
+            if estado['admitida']:
+                compartimento_upstream.sair()
+        if estado['admitida'] is False:
+            response['X-Degradado'] = '1'
+        return response
+    return _view
@@ -1,52 +1,33 @@
 # D:\Freela\Receitas\app_receitas\api_services.py
 
 import requests
-import os
 import logging
-from dotenv import load_dotenv
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
 
-load_dotenv()
+from . import dicionario_culinario
+from .filtros import TODOS, combinar_filtros
+from .traducao import traduzir
 
-# Configuração de logging para depuração
-logging.basicConfig(level=logging.DEBUG)
-
-# Configuração da API do Google Translate
-GOOGLE_TRANSLATE_BASE_URL = 'https://translate.google.com/m'
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
+logger = logging.getLogger(__name__)
 
 class TheMealDB:
     def __init__(self):
         # A API Key da TheMealDB é a mesma para todos os usuários
-        self.THEMEALDB_BASE_URL = "https://www.themealdb.com/api/json/v1/1/"
+        self.THEMEALDB_BASE_URL = settings.THEMEALDB_BASE_URL
         self.session = requests.Session()
 
     def _traduzir_texto_para_portugues(self, texto, sl='en', tl='pt'):
         """Método interno para traduzir texto."""
         if not texto:
             return ""
-        
-        params = {
-            'tl': tl,
-            'sl': sl,
-            'q': texto
-        }
-        
-        try:
-            response = self.session.get(GOOGLE_TRANSLATE_BASE_URL, params=params, headers=HEADERS, timeout=5)
-            response.raise_for_status()
-            
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(response.text, 'html.parser')
-            traducao = soup.find('div', class_='result-container').text
-            return traducao
-        except requests.exceptions.RequestException as e:
-            logging.error(f"ERRO TRADUCAO: Falha ao traduzir o texto: {e}")
-            return texto
-        except Exception as e:
-            logging.error(f"ERRO TRADUCAO: Erro inesperado: {e}")
-            return texto
+
+        local = dicionario_culinario.traduzir(texto, tl)
+        if local is not None:
+            return local
+
+        return traduzir(texto, tl, origem=sl)
 
     def _traduzir_ingredientes_para_ingles(self, ingredientes_pt):
         """Método interno para traduzir ingredientes."""
@@ -61,54 +42,69 @@ class TheMealDB:
         
         return ingredientes_en
 
-    def search(self, ingredientes=None, area=None, categoria=None):
-        """Busca receitas na API TheMealDB."""
-        url = f"{self.THEMEALDB_BASE_URL}filter.php?"
-        params = {}
-        
+    @staticmethod
+    def _chave_filtro(filtro):
+        bruto = '|'.join(filtro)
+        return f"themealdb_filtro:{hashlib.md5(bruto.encode('utf-8')).hexdigest()}"
+
+    def _receitas_do_filtro(self, filtro):
+        """Receitas de um único filtro de filter.php ({idMeal: receita}), usando o cache."""
+        chave = self._chave_filtro(filtro)
+        receitas = cache.get(chave)
+        if receitas is not None:
+            return receitas
+
+        parametro, valor = filtro
+        try:
+            response = self.session.get(f"{self.THEMEALDB_BASE_URL}filter.php", params={parametro: valor}, timeout=5)
+            response.raise_for_status()
+            logger.debug("Status da resposta da API: %s", response.status_code)
+            receitas = {meal['idMeal']: meal for meal in response.json().get('meals') or []}
+        except requests.exceptions.RequestException as e:
+            logger.error("ERRO API: Falha ao se conectar com a TheMealDB: %s", e)
+            return {}
+        except Exception as e:
+            logger.exception("ERRO API: Um erro inesperado ocorreu: %s", e)
+            return {}
+        cache.set(chave, receitas, settings.BUSCA_CACHE_TIMEOUT)
+        return receitas
+
+    def search(self, ingredientes=None, area=None, categoria=None, modo=TODOS):
+        """
+        Busca receitas na API TheMealDB. Cada ingrediente, área e categoria é um
+        filtro separado, combinado localmente (todos ou qualquer um deles).
+        """
+        filtros = []
         if ingredientes:
-            ingredientes_en = self._traduzir_ingredientes_para_ingles(ingredientes.split(','))
-            if ingredientes_en:
-                params['i'] = ingredientes_en[0]
-                logging.debug(f"Buscando na TheMealDB com ingrediente: {ingredientes_en}")
+            ingredientes_en = self._traduzir_ingredientes_para_ingles(
+                [ingrediente.strip() for ingrediente in ingredientes.split(',') if ingrediente.strip()]
+            )
+            filtros += [('i', ingrediente) for ingrediente in ingredientes_en]
+            logger.debug("Buscando na TheMealDB com ingredientes: %s", ingredientes_en)
 
         if area:
-            params['a'] = area
-            logging.debug(f"Buscando na TheMealDB por área: {area}")
+            filtros.append(('a', area))
+            logger.debug("Buscando na TheMealDB por área: %s", area)
 
         if categoria:
-            params['c'] = categoria
-            logging.debug(f"Buscando na TheMealDB por categoria: {categoria}")
+            filtros.append(('c', categoria))
+            logger.debug("Buscando na TheMealDB por categoria: %s", categoria)
 
-        if not params:
-            logging.warning("AVISO: Nenhuma opção de busca fornecida para a API TheMealDB.")
+        if not filtros:
+            logger.warning("AVISO: Nenhuma opção de busca fornecida para a API TheMealDB.")
             return []
 
-        try:
-            response = self.session.get(url, params=params, timeout=5)
-            response.raise_for_status()
-            
-            data = response.json()
-            logging.debug(f"Status da resposta da API: {response.status_code}")
-            
-            receitas = data.get('meals', [])
-            if receitas is None:
-                return []
-            return receitas
-        
-        except requests.exceptions.RequestException as e:
-            logging.error(f"ERRO API: Falha ao se conectar com a TheMealDB: {e}")
-            return []
-        except Exception as e:
-            logging.error(f"ERRO API: Um erro inesperado ocorreu: {e}")
-            return []
+        return combinar_filtros(
+            filtros, self._receitas_do_filtro, modo,
+            em_cache=lambda filtro: cache.has_key(self._chave_filtro(filtro)),
+        )
 
     def get_meal_by_id(self, recipe_id):
         """Busca detalhes de uma receita específica na TheMealDB por ID."""
         try:
             meal_id = recipe_id.replace('themealdb_', '')
             url = f"{self.THEMEALDB_BASE_URL}lookup.php?i={meal_id}"
-            logging.debug(f"Buscando detalhes da receita com ID: {meal_id}")
+            logger.debug("Buscando detalhes da receita com ID: %s", meal_id)
             response = self.session.get(url)
             response.raise_for_status()
 
@@ -116,7 +112,7 @@ class TheMealDB:
             meal = data.get('meals')[0]
 
             if not meal:
-                logging.error(f"ERRO API DETALHES: Nenhuma receita encontrada para o ID {meal_id}")
+                logger.error("ERRO API DETALHES: Nenhuma receita encontrada para o ID %s", meal_id)
                 return None
 
             ingredientes_nomes_e_medidas = []
@@ -124,6 +120,10 @@ class TheMealDB:
                 ingrediente = meal.get(f'strIngredient{i}')
                 medida = meal.get(f'strMeasure{i}')
                 if ingrediente and ingrediente.strip():
+                    linha_local = dicionario_culinario.traduzir_linha_ingrediente(medida, ingrediente)
+                    if linha_local is not None:
+                        ingredientes_nomes_e_medidas.append(linha_local)
+                        continue
                     ingrediente_nome_pt = self._traduzir_texto_para_portugues(ingrediente)
                     if medida and medida.strip():
                         medida_pt = self._traduzir_texto_para_portugues(medida)
@@ -148,8 +148,8 @@ class TheMealDB:
             return receita_formatada
 
         except (requests.exceptions.RequestException, IndexError, KeyError) as e:
-            logging.error(f"ERRO API DETALHES: Erro ao buscar detalhes da receita {recipe_id} na TheMealDB: {e}")
+            logger.error("ERRO API DETALHES: Erro ao buscar detalhes da receita %s na TheMealDB: %s", recipe_id, e)
             return None
         except Exception as e:
-            logging.error(f"ERRO API DETALHES: Um erro inesperado ocorreu: {e}")
+            logger.exception("ERRO API DETALHES: Um erro inesperado ocorreu: %s", e)
             return None
\ No newline at end of file
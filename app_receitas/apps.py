@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AppReceitasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_receitas'
+
+    def ready(self):
+        # Registra os sinais que mantêm os índices em memória atualizados
+        from . import autocompletar, despensa  # noqa: F401
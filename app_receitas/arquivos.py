@@ -0,0 +1,181 @@
+# app_receitas/arquivos.py
+
+"""
+Arquivos estáticos e de mídia em produção: nomes com hash e versões
+pré-comprimidas geradas no collectstatic, cabeçalhos de cache longos e entrega
+com sendfile (ou delegada ao proxy) e suporte a Range.
+"""
+
+import gzip
+import logging
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+EXTENSOES_COMPRIMIVEIS = ('.css', '.js', '.map', '.svg', '.json', '.txt', '.html', '.xml', '.ico', '.ttf', '.eot')
+
+# Sufixo que o ManifestStaticFilesStorage acrescenta ao nome ("app.3f2a9c1b7d4e.css")
+NOME_COM_HASH = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+INTERVALO = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+
+
+def _comprimir(caminho):
+    """Grava ao lado do arquivo as versões .gz e .br, quando ficam menores que o original."""
+    with open(caminho, 'rb') as f:
+        conteudo = f.read()
+    versoes = [('.gz', lambda dados: gzip.compress(dados, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        versoes.append(('.br', lambda dados: brotli.compress(dados, quality=11)))
+    for sufixo, comprimir in versoes:
+        comprimido = comprimir(conteudo)
+        if len(comprimido) < len(conteudo) * 0.95:
+            with open(caminho + sufixo, 'wb') as f:
+                f.write(comprimido)
+
+
+class ArmazenamentoEstatico(ManifestStaticFilesStorage):
+    """Manifest com nomes com hash que, no collectstatic, também pré-comprime os arquivos de texto."""
+
+    def stored_name(self, name):
+        # Referências a arquivos que não existem caem no nome original em vez de derrubar a página
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            logger.warning("Arquivo estático ausente do manifest: %s", name)
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        processados = set()
+        for nome, nome_com_hash, processado in super().post_process(paths, dry_run, **options):
+            if not isinstance(processado, Exception):
+                processados.update(n for n in (nome, nome_com_hash) if n)
+            yield nome, nome_com_hash, processado
+        if dry_run:
+            return
+        for nome in processados:
+            if nome.endswith(EXTENSOES_COMPRIMIVEIS):
+                _comprimir(self.path(nome))
+        if brotli is None:
+            logger.info("brotli não instalado: apenas as versões .gz foram geradas.")
+
+
+def _versao_comprimida(request, caminho):
+    """Escolhe a versão pré-comprimida aceita pelo cliente (br antes de gzip), se existir."""
+    aceitas = request.headers.get('Accept-Encoding', '')
+    for codificacao, sufixo in (('br', '.br'), ('gzip', '.gz')):
+        if codificacao in aceitas and os.path.exists(caminho + sufixo):
+            return caminho + sufixo, codificacao
+    return caminho, None
+
+
+def _intervalo(cabecalho, tamanho):
+    """
+    Interpreta um único intervalo "bytes=inicio-fim". Retorna (inicio, fim), None
+    se o cabeçalho deve ser ignorado ou False se o intervalo não é satisfazível.
+    """
+    encontrado = INTERVALO.match(cabecalho.strip())
+    if not encontrado or encontrado.groups() == ('', ''):
+        return None
+    inicio, fim = encontrado.groups()
+    if inicio == '':
+        inicio, fim = max(0, tamanho - int(fim)), tamanho - 1
+    else:
+        inicio, fim = int(inicio), min(int(fim), tamanho - 1) if fim else tamanho - 1
+    if inicio >= tamanho or inicio > fim:
+        return False
+    return inicio, fim
+
+
+class _Trecho:
+    """Arquivo limitado a um trecho, para o FileResponse não ler além do intervalo pedido."""
+
+    def __init__(self, arquivo, inicio, tamanho):
+        self.arquivo = arquivo
+        self.restante = tamanho
+        arquivo.seek(inicio)
+
+    def read(self, tamanho=-1):
+        if tamanho < 0 or tamanho > self.restante:
+            tamanho = self.restante
+        dados = self.arquivo.read(tamanho)
+        self.restante -= len(dados)
+        return dados
+
+    def close(self):
+        self.arquivo.close()
+
+
+def servir_arquivo(request, caminho, raiz, cache_control=None, prefixo_interno=''):
+    """
+    Entrega um arquivo de `raiz`. Com ARQUIVOS_SENDFILE configurado, apenas
+    indica o arquivo ao proxy (X-Accel-Redirect para `prefixo_interno`, ou
+    X-Sendfile) e o worker fica livre; senão usa FileResponse, que o servidor
+    WSGI entrega com sendfile. Sem `cache_control`, só nomes com hash são imutáveis.
+    """
+    try:
+        completo = safe_join(raiz, caminho)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(completo):
+        raise Http404
+
+    tipo, _ = mimetypes.guess_type(completo)
+    tipo = tipo or 'application/octet-stream'
+    if cache_control is None:
+        cache_control = CACHE_IMUTAVEL if NOME_COM_HASH.search(caminho) else 'public, max-age=0, must-revalidate'
+
+    estado = os.stat(completo)
+    if not was_modified_since(request.headers.get('If-Modified-Since'), estado.st_mtime):
+        resposta = HttpResponseNotModified()
+        resposta['Cache-Control'] = cache_control
+        return resposta
+
+    intervalo = _intervalo(request.headers['Range'], estado.st_size) if 'Range' in request.headers else None
+    codificacao = None
+    if intervalo is None and not settings.ARQUIVOS_SENDFILE:
+        # Atrás do proxy, quem escolhe a versão comprimida é ele (gzip_static/brotli_static)
+        completo, codificacao = _versao_comprimida(request, completo)
+
+    if settings.ARQUIVOS_SENDFILE:
+        resposta = HttpResponse(content_type=tipo)
+        relativo = os.path.relpath(completo, raiz).replace(os.sep, '/')
+        if settings.ARQUIVOS_SENDFILE == 'x-accel-redirect':
+            resposta['X-Accel-Redirect'] = f"{prefixo_interno}{relativo}"
+        else:
+            resposta['X-Sendfile'] = completo
+    elif intervalo is False:
+        resposta = HttpResponse(status=416)
+        resposta['Content-Range'] = f"bytes */{estado.st_size}"
+        return resposta
+    elif intervalo:
+        inicio, fim = intervalo
+        resposta = FileResponse(_Trecho(open(completo, 'rb'), inicio, fim - inicio + 1), status=206, content_type=tipo)
+        resposta['Content-Length'] = fim - inicio + 1
+        resposta['Content-Range'] = f"bytes {inicio}-{fim}/{estado.st_size}"
+    else:
+        resposta = FileResponse(open(completo, 'rb'), content_type=tipo)
+
+    resposta['Last-Modified'] = http_date(estado.st_mtime)
+    resposta['Cache-Control'] = cache_control
+    resposta['Accept-Ranges'] = 'bytes'
+    resposta['Vary'] = 'Accept-Encoding'
+    if codificacao:
+        resposta['Content-Encoding'] = codificacao
+    return resposta
@@ -0,0 +1,19 @@
+# app_receitas/autenticacao.py
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class BackendComPerfil(ModelBackend):
+    """
+    ModelBackend que carrega o perfil junto com o usuário da sessão: o avatar
+    do menu aparece em todas as páginas e, sem isso, custaria uma consulta a mais.
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related('profile').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,205 @@
+# app_receitas/autocompletar.py
+
+"""
+Índice em memória para as sugestões da busca: nomes de receitas, ingredientes,
+categorias e cozinhas (em português e inglês) guardados em uma lista ordenada
+de chaves, consultada por prefixo com busca binária.
+"""
+
+import bisect
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import dicionario_culinario
+from .models import IngredienteReceita, Receita
+
+RECEITA = 'receita'
+INGREDIENTE = 'ingrediente'
+CATEGORIA = 'categoria'
+AREA = 'area'
+
+# Em empates, sugestões de receitas aparecem antes das de filtros
+PRIORIDADE_TIPOS = {RECEITA: 0, INGREDIENTE: 1, CATEGORIA: 2, AREA: 3}
+
+logger = logging.getLogger(__name__)
+
+
+def _chaves_de(texto):
+    """A chave do texto inteiro e a de cada palavra em diante ("torta de frango" -> "de frango", "frango")."""
+    chave = dicionario_culinario.chave(texto)
+    if not chave:
+        return []
+    chaves = [(chave, True)]
+    for posicao, caractere in enumerate(chave):
+        if caractere == ' ':
+            chaves.append((chave[posicao + 1:], False))
+    return chaves
+
+
+class IndiceAutocompletar:
+    """
+    Uma lista ordenada de chaves por tipo de sugestão, com as entradas
+    (rótulo, valor, início) em uma lista paralela. Todas as chaves que começam com
+    um prefixo ficam contíguas, então a consulta é uma busca binária seguida de
+    uma varredura curta. Receitas aprovadas entram e
+    saem uma a uma pelos sinais; o vocabulário fixo vem do dicionário culinário.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lock_construcao = threading.Lock()
+        self._construido_em = None
+        self._chaves = {tipo: [] for tipo in PRIORIDADE_TIPOS}
+        self._entradas = {tipo: [] for tipo in PRIORIDADE_TIPOS}
+        self._por_receita = {}
+        self._ingredientes = set()
+
+    def _precisa_construir(self):
+        if self._construido_em is None:
+            return True
+        return time.monotonic() - self._construido_em > settings.AUTOCOMPLETAR_RECONSTRUIR_SEGUNDOS
+
+    @staticmethod
+    def _entradas_de(rotulo, valor, textos):
+        return [(chave, (rotulo, valor, inicio)) for texto in textos for chave, inicio in _chaves_de(texto)]
+
+    def _entradas_vocabulario(self):
+        pares = {tipo: [] for tipo in PRIORIDADE_TIPOS}
+        for tipo, tabela in ((CATEGORIA, dicionario_culinario.CATEGORIAS), (AREA, dicionario_culinario.AREAS)):
+            for ingles, portugues in tabela.items():
+                pares[tipo] += self._entradas_de(portugues.capitalize(), ingles, [portugues, ingles])
+        for ingles, portugues in dicionario_culinario.INGREDIENTES.items():
+            pares[INGREDIENTE] += self._entradas_de(portugues, portugues, [portugues, ingles])
+        return pares
+
+    def construir(self):
+        """Monta o índice do zero a partir do vocabulário e das receitas aprovadas."""
+        inicio = time.perf_counter()
+        pares = self._entradas_vocabulario()
+        ingredientes = {dicionario_culinario.chave(portugues) for portugues in dicionario_culinario.INGREDIENTES.values()}
+
+        por_receita = {}
+        for receita_id, nome, external_id in Receita.objects.filter(status='aprovado').values_list(
+            'pk', 'nome', 'external_id'
+        ).iterator(chunk_size=10000):
+            entradas = self._entradas_de(nome, external_id, [nome])
+            por_receita[receita_id] = (external_id, [chave for chave, _ in entradas])
+            pares[RECEITA] += entradas
+
+        nomes = IngredienteReceita.objects.filter(receita__status='aprovado').values_list('nome', flat=True).distinct()
+        for nome in nomes.iterator(chunk_size=10000):
+            if dicionario_culinario.chave(nome) not in ingredientes:
+                ingredientes.add(dicionario_culinario.chave(nome))
+                pares[INGREDIENTE] += self._entradas_de(nome, nome, [nome])
+
+        chaves, entradas = {}, {}
+        for tipo, lista in pares.items():
+            # Entre chaves iguais, as que começam o texto vêm primeiro
+            lista.sort(key=lambda par: (par[0], not par[1][2]))
+            chaves[tipo] = [chave for chave, _ in lista]
+            entradas[tipo] = [entrada for _, entrada in lista]
+        with self._lock:
+            self._chaves = chaves
+            self._entradas = entradas
+            self._por_receita = por_receita
+            self._ingredientes = ingredientes
+            self._construido_em = time.monotonic()
+        logger.info(
+            "Índice de sugestões construído: %d chaves em %.0f ms.",
+            sum(map(len, chaves.values())), (time.perf_counter() - inicio) * 1000,
+        )
+
+    def _inserir(self, tipo, pares):
+        chaves, entradas = self._chaves[tipo], self._entradas[tipo]
+        for chave, entrada in pares:
+            buscar = bisect.bisect_left if entrada[2] else bisect.bisect_right
+            posicao = buscar(chaves, chave)
+            chaves.insert(posicao, chave)
+            entradas.insert(posicao, entrada)
+
+    def _remover_receita(self, receita_id):
+        external_id, lista = self._por_receita.pop(receita_id, (None, []))
+        chaves, entradas = self._chaves[RECEITA], self._entradas[RECEITA]
+        for chave in lista:
+            posicao = bisect.bisect_left(chaves, chave)
+            while posicao < len(chaves) and chaves[posicao] == chave:
+                if entradas[posicao][1] == external_id:
+                    del chaves[posicao]
+                    del entradas[posicao]
+                    break
+                posicao += 1
+
+    def atualizar_receitas(self, receita_ids):
+        """Reindexa apenas as receitas informadas (aprovadas entram, as demais saem)."""
+        if self._construido_em is None or not receita_ids:
+            return
+        aprovadas = Receita.objects.filter(pk__in=receita_ids, status='aprovado').values_list('pk', 'nome', 'external_id')
+        nomes = set(IngredienteReceita.objects.filter(receita_id__in=receita_ids).values_list('nome', flat=True))
+
+        with self._lock:
+            for receita_id in receita_ids:
+                self._remover_receita(receita_id)
+            for receita_id, nome, external_id in aprovadas:
+                entradas = self._entradas_de(nome, external_id, [nome])
+                self._por_receita[receita_id] = (external_id, [chave for chave, _ in entradas])
+                self._inserir(RECEITA, entradas)
+            for nome in nomes:
+                if dicionario_culinario.chave(nome) not in self._ingredientes:
+                    self._ingredientes.add(dicionario_culinario.chave(nome))
+                    self._inserir(INGREDIENTE, self._entradas_de(nome, nome, [nome]))
+
+    def invalidar(self):
+        self._construido_em = None
+
+    def sugerir(self, texto, limite=8, tipos=None, varredura=200):
+        """
+        Sugestões cujo texto (ou uma de suas palavras) começa com `texto`.
+        Quem começa pelo prefixo vem antes de quem só tem uma palavra que começa por ele.
+        Retorna uma lista de (tipo, rótulo, valor).
+        """
+        prefixo = dicionario_culinario.chave(texto)
+        if len(prefixo) < settings.AUTOCOMPLETAR_MINIMO_CARACTERES:
+            return []
+
+        if self._precisa_construir():
+            with self._lock_construcao:
+                if self._precisa_construir():
+                    self.construir()
+
+        encontradas = []
+        with self._lock:
+            for tipo in tipos or PRIORIDADE_TIPOS:
+                chaves, entradas, vistos = self._chaves[tipo], self._entradas[tipo], set()
+                posicao = bisect.bisect_left(chaves, prefixo)
+                while posicao < len(chaves) and len(vistos) < varredura and chaves[posicao].startswith(prefixo):
+                    rotulo, valor, inicio = entradas[posicao]
+                    posicao += 1
+                    if valor not in vistos:
+                        vistos.add(valor)
+                        encontradas.append((tipo, rotulo, valor, inicio))
+
+        encontradas.sort(key=lambda e: (not e[3], PRIORIDADE_TIPOS[e[0]], len(e[1]), e[1]))
+        return [(tipo, rotulo, valor) for tipo, rotulo, valor, _ in encontradas[:limite]]
+
+
+indice_autocompletar = IndiceAutocompletar()
+
+
+@receiver(post_save, sender=Receita)
+def atualizar_indice_autocompletar(sender, instance, update_fields=None, **kwargs):
+    """Reflete no índice as receitas aprovadas, hidratadas ou editadas, após o commit."""
+    if update_fields is not None and not {'status', 'nome'} & set(update_fields):
+        return
+    transaction.on_commit(lambda: indice_autocompletar.atualizar_receitas([instance.pk]))
+
+
+@receiver(post_delete, sender=Receita)
+def remover_do_indice_autocompletar(sender, instance, **kwargs):
+    receita_id = instance.pk
+    transaction.on_commit(lambda: indice_autocompletar.atualizar_receitas([receita_id]))
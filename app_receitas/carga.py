@@ -0,0 +1,191 @@
+# app_receitas/carga.py
+
+"""
+Gerador de carga em asyncio com cenários baseados nos fluxos reais do site.
+A carga é aplicada em degraus de RPS (modelo de chegada aberto), para encontrar
+o ponto de saturação de um worker.
+"""
+
+import asyncio
+import random
+import re
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+from .dados_sinteticos import PREFIXO_USUARIO, SENHA_USUARIOS
+from .instrumentacao import percentil
+from .stubs import ID_INICIAL, INGREDIENTES, TOTAL_REFEICOES
+
+CSRF_NO_FORMULARIO = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+# Peso relativo de cada cenário no tráfego simulado
+PESOS_CENARIOS = {
+    'homepage_anonima': 30,
+    'busca_multi_ingrediente': 25,
+    'detalhe_quente': 20,
+    'detalhe_frio': 10,
+    'avaliar': 10,
+    'favoritar': 5,
+}
+
+
+@dataclass
+class ResultadoDegrau:
+    rps_alvo: float
+    duracao: float
+    latencias_ms: list = field(default_factory=list)
+    erros: int = 0
+    descartadas: int = 0
+
+    @property
+    def total(self):
+        return len(self.latencias_ms) + self.descartadas
+
+    @property
+    def rps_obtido(self):
+        return len(self.latencias_ms) / self.duracao if self.duracao else 0.0
+
+    @property
+    def taxa_erros(self):
+        return (self.erros + self.descartadas) / self.total if self.total else 0.0
+
+    def resumo(self):
+        ordenadas = sorted(self.latencias_ms)
+        return {
+            'rps_alvo': self.rps_alvo,
+            'rps_obtido': round(self.rps_obtido, 1),
+            'p50_ms': round(percentil(ordenadas, 50), 1),
+            'p95_ms': round(percentil(ordenadas, 95), 1),
+            'p99_ms': round(percentil(ordenadas, 99), 1),
+            'taxa_erros': round(self.taxa_erros, 4),
+            'requisicoes': self.total,
+        }
+
+
+class GeradorCarga:
+    def __init__(self, url_base, total_receitas, usuarios=20, max_em_voo=500, timeout=10.0, semente=42):
+        self.url_base = url_base.rstrip('/')
+        self.total_receitas = total_receitas
+        self.quantidade_usuarios = usuarios
+        self.max_em_voo = max_em_voo
+        self.timeout = timeout
+        self.rnd = random.Random(semente)
+        self._ids_frios = iter(range(ID_INICIAL, ID_INICIAL + TOTAL_REFEICOES))
+        self._anonimo = None
+        self._logados = []
+
+    async def preparar(self):
+        """Abre os clientes HTTP e faz login dos usuários sintéticos."""
+        limites = httpx.Limits(max_connections=self.max_em_voo)
+        self._anonimo = httpx.AsyncClient(base_url=self.url_base, timeout=self.timeout, limits=limites)
+        for n in range(self.quantidade_usuarios):
+            cliente = httpx.AsyncClient(base_url=self.url_base, timeout=self.timeout)
+            pagina = await cliente.get('/login/')
+            token = CSRF_NO_FORMULARIO.search(pagina.text)
+            resposta = await cliente.post('/login/', data={
+                'username': f"{PREFIXO_USUARIO}{n}",
+                'password': SENHA_USUARIOS,
+                'csrfmiddlewaretoken': token.group(1) if token else '',
+            })
+            if resposta.status_code != 302:
+                await cliente.aclose()
+                raise RuntimeError(f"Falha no login de {PREFIXO_USUARIO}{n} (HTTP {resposta.status_code}).")
+            self._logados.append(cliente)
+
+    async def fechar(self):
+        for cliente in [self._anonimo, *self._logados]:
+            if cliente is not None:
+                await cliente.aclose()
+
+    def _receita_local(self):
+        return f"bench_{self.rnd.randrange(self.total_receitas)}"
+
+    async def _cenario(self, nome):
+        if nome == 'homepage_anonima':
+            return await self._anonimo.get('/')
+        if nome == 'busca_multi_ingrediente':
+            ingredientes = ', '.join(self.rnd.sample(INGREDIENTES, self.rnd.randint(2, 4)))
+            return await self._anonimo.get('/buscar/', params={'ingredientes': ingredientes})
+        if nome == 'detalhe_quente':
+            return await self._anonimo.get(f"/receita/{self._receita_local()}/")
+        if nome == 'detalhe_frio':
+            return await self._anonimo.get(f"/receita/tmdb_{next(self._ids_frios, ID_INICIAL)}/")
+
+        cliente = self.rnd.choice(self._logados)
+        dados = {'csrfmiddlewaretoken': cliente.cookies.get('csrftoken', '')}
+        if nome == 'avaliar':
+            dados.update({'submit_avaliacao': '1', 'nota': self.rnd.randint(1, 5)})
+            return await cliente.post(f"/receita/{self._receita_local()}/", data=dados)
+        return await cliente.post(f"/favoritos/{self._receita_local()}/", data=dados)
+
+    def _sortear_cenario(self, cenarios):
+        nomes = list(cenarios)
+        return self.rnd.choices(nomes, weights=[cenarios[n] for n in nomes])[0]
+
+    async def executar_degrau(self, rps, duracao, cenarios):
+        """Dispara requisições a uma taxa constante durante `duracao` segundos."""
+        resultado = ResultadoDegrau(rps_alvo=rps, duracao=duracao)
+        em_voo = set()
+        intervalo = 1.0 / rps
+
+        async def disparar(nome):
+            inicio = time.perf_counter()
+            try:
+                resposta = await self._cenario(nome)
+                if resposta.status_code >= 400:
+                    resultado.erros += 1
+            except httpx.HTTPError:
+                resultado.erros += 1
+            resultado.latencias_ms.append((time.perf_counter() - inicio) * 1000)
+
+        inicio = time.perf_counter()
+        proximo = inicio
+        while proximo - inicio < duracao:
+            if len(em_voo) >= self.max_em_voo:
+                # O servidor não está dando conta: conta como falha em vez de enfileirar sem limite
+                resultado.descartadas += 1
+            else:
+                tarefa = asyncio.create_task(disparar(self._sortear_cenario(cenarios)))
+                em_voo.add(tarefa)
+                tarefa.add_done_callback(em_voo.discard)
+            proximo += intervalo
+            await asyncio.sleep(max(0.0, proximo - time.perf_counter()))
+
+        if em_voo:
+            await asyncio.wait(em_voo)
+        resultado.duracao = time.perf_counter() - inicio
+        return resultado
+
+
+async def medir_capacidade(gerador, degraus, duracao, cenarios, slo_p95_ms, max_erros, aquecimento=5):
+    """
+    Executa os degraus de carga até a saturação: p95 acima do SLO, taxa de erros
+    acima do limite ou vazão abaixo de 90% da taxa pedida.
+    """
+    await gerador.preparar()
+    try:
+        if aquecimento:
+            await gerador.executar_degrau(degraus[0], aquecimento, cenarios)
+
+        resumos, maximo_sustentavel, saturacao = [], None, None
+        for rps in degraus:
+            resumo = (await gerador.executar_degrau(rps, duracao, cenarios)).resumo()
+            motivos = []
+            if resumo['p95_ms'] > slo_p95_ms:
+                motivos.append(f"p95 {resumo['p95_ms']} ms > {slo_p95_ms} ms")
+            if resumo['taxa_erros'] > max_erros:
+                motivos.append(f"erros {resumo['taxa_erros']:.1%} > {max_erros:.1%}")
+            if resumo['rps_obtido'] < 0.9 * rps:
+                motivos.append(f"vazão {resumo['rps_obtido']} < 90% de {rps}")
+            resumo['saturado'] = bool(motivos)
+            resumo['motivos'] = motivos
+            resumos.append(resumo)
+            if motivos:
+                saturacao = rps
+                break
+            maximo_sustentavel = resumo['rps_obtido']
+        return {'degraus': resumos, 'rps_max_sustentavel': maximo_sustentavel, 'rps_saturacao': saturacao}
+    finally:
+        await gerador.fechar()
@@ -0,0 +1,52 @@
+# app_receitas/clientes.py
+
+"""
+Clientes de serviços externos criados sob demanda: nada aqui é importado ou
+construído na inicialização do worker, só na primeira requisição que precisar.
+"""
+
+import asyncio
+import html
+import inspect
+import re
+import threading
+
+import requests
+
+_locais = threading.local()
+
+# Resposta de translate.google.com/m: a tradução é o texto desta div
+RESULTADO_TRADUCAO = re.compile(r'<div[^>]*class="result-container"[^>]*>(.*?)</div>', re.DOTALL)
+
+
+def traduzir_googletrans(texto, destino, origem='auto', timeout=None):
+    """
+    Traduz com o googletrans, importado só quando usado. A partir da 4.0 o
+    `Translator.translate` é assíncrono: cada thread tem o seu Translator e o seu
+    event loop, porque o cliente httpx interno fica preso ao loop em que nasceu.
+    """
+    tradutor = getattr(_locais, 'tradutor', None)
+    if tradutor is None:
+        from googletrans import Translator
+        _locais.loop = asyncio.new_event_loop()
+        tradutor = _locais.tradutor = Translator()
+    resultado = tradutor.translate(texto, dest=destino, src=origem)
+    if inspect.isawaitable(resultado):
+        resultado = _locais.loop.run_until_complete(asyncio.wait_for(resultado, timeout))
+    return resultado.text
+
+
+def sessao_http():
+    """Uma requests.Session por thread, para reaproveitar conexões sem compartilhar estado entre threads."""
+    sessao = getattr(_locais, 'sessao', None)
+    if sessao is None:
+        sessao = _locais.sessao = requests.Session()
+    return sessao
+
+
+def extrair_traducao(pagina):
+    """Texto traduzido de uma página do tradutor, sem montar a árvore HTML inteira."""
+    encontrado = RESULTADO_TRADUCAO.search(pagina)
+    if encontrado is None:
+        raise ValueError("Resposta do tradutor sem o resultado da tradução.")
+    return html.unescape(re.sub(r'<[^>]+>', '', encontrado.group(1)))
@@ -0,0 +1,84 @@
+# app_receitas/condicional.py
+
+"""
+GET condicional e cabeçalhos de cache para as páginas públicas. A página é
+versionada por uma data de alteração (ex.: Receita.atualizado_em): com o mesmo
+ETag, o navegador ou o proxy recebem 304 sem que o template seja renderizado.
+As partes que dependem do usuário ficam em fragmentos buscados à parte, então a
+versão anônima pode ser guardada por um proxy reverso.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+
+def _versao_da_requisicao(request, versao, args, kwargs):
+    # Calculada uma vez por requisição: o `condition` pede ETag e Last-Modified separadamente
+    if not hasattr(request, '_versao_pagina'):
+        # Mensagens pendentes aparecem no topo da página: ela não pode ser reaproveitada
+        pendentes = len(messages.get_messages(request)) > 0
+        request._versao_pagina = None if pendentes else versao(request, *args, **kwargs)
+    return request._versao_pagina
+
+
+def _data_e_complemento(versao):
+    """Separa a data de alteração do complemento opcional da versão."""
+    if isinstance(versao, tuple):
+        return versao
+    return versao, None
+
+
+def _identidade(user):
+    """O que o menu do topo mostra do usuário: muda o ETag quando nome ou foto mudam."""
+    if not user.is_authenticated:
+        return '0'
+    profile = getattr(user, 'profile', None)
+    return f"{user.pk}:{user.username}:{profile.foto.name if profile else ''}"
+
+
+def pagina_condicional(versao):
+    """
+    Decorador de views GET com conteúdo versionado. `versao(request, *args, **kwargs)`
+    devolve a data da última alteração do conteúdo, ou None para sempre responder a
+    página inteira sem cache compartilhado (ex.: receita ainda não hidratada).
+    Também pode devolver `(data, complemento)` quando a data sozinha não capta toda
+    mudança (ex.: remoções não alteram o Max da data): o complemento entra no ETag
+    e, como a data pode não avançar, a resposta sai sem Last-Modified.
+
+    O ETag junta a versão, PAGINAS_VERSAO (trocada a cada deploy que muda templates)
+    e o usuário, já que o menu do topo mostra o nome e a foto dele. Respostas
+    anônimas podem ficar PAGINAS_CACHE_SEGUNDOS em caches compartilhados; o
+    navegador sempre revalida.
+    """
+    def decorador(view):
+        def ultima_alteracao(request, *args, **kwargs):
+            alterado_em, complemento = _data_e_complemento(_versao_da_requisicao(request, versao, args, kwargs))
+            return alterado_em if complemento is None else None
+
+        def etag(request, *args, **kwargs):
+            alterado_em, complemento = _data_e_complemento(_versao_da_requisicao(request, versao, args, kwargs))
+            if alterado_em is None:
+                return None
+            bruto = f"{settings.PAGINAS_VERSAO}|{alterado_em.isoformat()}|{complemento}|{_identidade(request.user)}"
+            return hashlib.md5(bruto.encode('utf-8')).hexdigest()
+
+        view_condicional = condition(etag_func=etag, last_modified_func=ultima_alteracao)(view)
+
+        @wraps(view)
+        def _view(request, *args, **kwargs):
+            response = view_condicional(request, *args, **kwargs)
+            if request.method not in ('GET', 'HEAD') or response.status_code not in (200, 304):
+                return response
+            if getattr(request, '_versao_pagina', None) is not None and not request.user.is_authenticated:
+                patch_cache_control(response, public=True, max_age=0, s_maxage=settings.PAGINAS_CACHE_SEGUNDOS)
+            else:
+                patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Cookie'])
+            return response
+        return _view
+    return decorador
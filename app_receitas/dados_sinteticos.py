@@ -0,0 +1,83 @@
+# app_receitas/dados_sinteticos.py
+
+"""Geração de um conjunto de dados sintético para benchmarks e testes de carga."""
+
+import random
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .ingredientes import itens_das_linhas
+from .models import Avaliacao, IngredienteReceita, Profile, Receita, ReceitaFavorita
+from .stubs import AREAS, CATEGORIAS, INGREDIENTES, MEDIDAS
+
+TAMANHO_LOTE = 5000
+PREFIXO_USUARIO = 'bench_user_'
+SENHA_USUARIOS = 'bench-senha-123'
+
+
+def _em_lotes(objetos, modelo, **kwargs):
+    for inicio in range(0, len(objetos), TAMANHO_LOTE):
+        modelo.objects.bulk_create(objetos[inicio:inicio + TAMANHO_LOTE], **kwargs)
+
+
+def gerar_dados(receitas=10000, usuarios=200, avaliacoes_por_usuario=20, favoritos_por_usuario=10, semente=42):
+    """
+    Cria receitas locais ('bench_<n>') com ingredientes estruturados, usuários
+    com perfil, avaliações e favoritos de forma reprodutível. Retorna a lista de usuários criados.
+    """
+    rnd = random.Random(semente)
+
+    with transaction.atomic():
+        lote = []
+        for n in range(receitas):
+            ingredientes = [f"{rnd.choice(MEDIDAS)} {ing}".strip() for ing in rnd.sample(INGREDIENTES, rnd.randint(5, 12))]
+            lote.append(Receita(
+                nome=f"Receita {n} de {ingredientes[0].split()[-1]}",
+                external_id=f"bench_{n}",
+                categoria=[rnd.choice(CATEGORIAS)],
+                area=[rnd.choice(AREAS)],
+                instrucoes="Misture tudo e leve ao forno. " * rnd.randint(3, 15),
+                imagem_url=f"https://www.themealdb.com/images/media/meals/bench{n}.jpg",
+                ingredientes=ingredientes,
+                media_avaliacoes=Decimal(rnd.randint(100, 500)) / 100,
+                status='aprovado' if rnd.random() > 0.02 else 'pendente',
+            ))
+            if len(lote) >= TAMANHO_LOTE:
+                Receita.objects.bulk_create(lote)
+                lote = []
+        Receita.objects.bulk_create(lote)
+
+        itens = []
+        for receita_id, linhas in Receita.objects.filter(external_id__startswith='bench_').values_list('pk', 'ingredientes'):
+            for item in itens_das_linhas(linhas):
+                item.receita_id = receita_id
+                itens.append(item)
+            if len(itens) >= TAMANHO_LOTE:
+                IngredienteReceita.objects.bulk_create(itens)
+                itens = []
+        IngredienteReceita.objects.bulk_create(itens)
+
+        # Senha única com hash calculado uma vez, para não pagar o hasher por usuário
+        modelo = User(username='modelo')
+        modelo.set_password(SENHA_USUARIOS)
+        User.objects.bulk_create([
+            User(username=f"{PREFIXO_USUARIO}{n}", email=f"bench{n}@example.com", password=modelo.password)
+            for n in range(usuarios)
+        ])
+        usuarios_qs = User.objects.filter(username__startswith=PREFIXO_USUARIO).order_by('pk')
+        _em_lotes([Profile(user_id=pk) for pk in usuarios_qs.values_list('pk', flat=True)], Profile, ignore_conflicts=True)
+        lista_usuarios = list(usuarios_qs)
+
+        ids_receitas = list(Receita.objects.filter(external_id__startswith='bench_').values_list('pk', flat=True))
+        avaliacoes, favoritos = [], []
+        for usuario in lista_usuarios:
+            for receita_id in rnd.sample(ids_receitas, min(avaliacoes_por_usuario, len(ids_receitas))):
+                avaliacoes.append(Avaliacao(user=usuario, receita_id=receita_id, nota=rnd.randint(1, 5)))
+            for receita_id in rnd.sample(ids_receitas, min(favoritos_por_usuario, len(ids_receitas))):
+                favoritos.append(ReceitaFavorita(user=usuario, receita_id=receita_id))
+        _em_lotes(avaliacoes, Avaliacao, ignore_conflicts=True)
+        _em_lotes(favoritos, ReceitaFavorita, ignore_conflicts=True)
+
+    return lista_usuarios
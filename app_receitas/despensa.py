@@ -0,0 +1,194 @@
+# app_receitas/despensa.py
+
+"""
+Índice em memória para a busca "o que posso cozinhar": cada receita aprovada
+é uma linha de bits (um bit por ingrediente canônico), e a despensa do usuário
+é comparada com todas as receitas de uma vez com operações vetorizadas.
+"""
+
+import logging
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import dicionario_culinario
+from .models import IngredienteReceita, Receita
+
+logger = logging.getLogger(__name__)
+
+BITS_POR_PALAVRA = 64
+
+
+def _contar_bits(palavras):
+    """Quantidade de bits ligados por linha de uma matriz uint64."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(palavras).sum(axis=1, dtype=np.int32)
+    bytes_ = palavras.view(np.uint8).reshape(palavras.shape[0], -1)
+    return np.unpackbits(bytes_, axis=1).sum(axis=1, dtype=np.int32)
+
+
+class IndiceDespensa:
+    """
+    Matriz receita x ingrediente guardada como bitset (uint64). É construída
+    sob demanda, atualizada receita a receita pelos sinais dos modelos e
+    reconstruída periodicamente para incorporar mudanças feitas por outros workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lock_construcao = threading.Lock()
+        self._construido_em = None
+        self._vocabulario = {}
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._linhas = {}
+        self._bits = np.zeros((0, 1), dtype=np.uint64)
+        self._totais = np.zeros(0, dtype=np.int32)
+
+    def _precisa_construir(self):
+        if self._construido_em is None:
+            return True
+        return time.monotonic() - self._construido_em > settings.DESPENSA_RECONSTRUIR_SEGUNDOS
+
+    def construir(self):
+        """Lê os ingredientes de todas as receitas aprovadas e monta a matriz do zero."""
+        inicio = time.perf_counter()
+        pares = IngredienteReceita.objects.filter(receita__status='aprovado').values_list('receita_id', 'nome_canonico')
+        vocabulario, linhas, ids, colunas_por_linha = {}, {}, [], []
+        for receita_id, nome in pares.iterator(chunk_size=10000):
+            linha = linhas.get(receita_id)
+            if linha is None:
+                linha = linhas[receita_id] = len(ids)
+                ids.append(receita_id)
+                colunas_por_linha.append([])
+            colunas_por_linha[linha].append(vocabulario.setdefault(nome, len(vocabulario)))
+
+        bits = np.zeros((len(ids), self._palavras_para(len(vocabulario))), dtype=np.uint64)
+        if ids:
+            posicoes_linha = np.repeat(np.arange(len(ids)), [len(c) for c in colunas_por_linha])
+            colunas = np.fromiter((c for cols in colunas_por_linha for c in cols), dtype=np.int64, count=len(posicoes_linha))
+            np.bitwise_or.at(
+                bits,
+                (posicoes_linha, colunas // BITS_POR_PALAVRA),
+                np.left_shift(np.uint64(1), (colunas % BITS_POR_PALAVRA).astype(np.uint64)),
+            )
+
+        with self._lock:
+            self._vocabulario = vocabulario
+            self._ids = np.array(ids, dtype=np.int64)
+            self._linhas = linhas
+            self._bits = bits
+            self._totais = _contar_bits(bits)
+            self._construido_em = time.monotonic()
+        logger.info(
+            "Índice da despensa construído: %d receitas, %d ingredientes em %.0f ms.",
+            len(ids), len(vocabulario), (time.perf_counter() - inicio) * 1000,
+        )
+
+    @staticmethod
+    def _palavras_para(quantidade_ingredientes):
+        return max(1, -(-quantidade_ingredientes // BITS_POR_PALAVRA))
+
+    def _mascara(self, nomes, criar=False):
+        """Bitset de um conjunto de ingredientes; com criar=True, novos nomes entram no vocabulário."""
+        colunas = []
+        for nome in nomes:
+            coluna = self._vocabulario.get(nome)
+            if coluna is None and criar:
+                coluna = self._vocabulario[nome] = len(self._vocabulario)
+            if coluna is not None:
+                colunas.append(coluna)
+
+        palavras = self._palavras_para(len(self._vocabulario))
+        if palavras > self._bits.shape[1]:
+            self._bits = np.pad(self._bits, ((0, 0), (0, palavras - self._bits.shape[1])))
+        mascara = np.zeros(self._bits.shape[1], dtype=np.uint64)
+        for coluna in colunas:
+            mascara[coluna // BITS_POR_PALAVRA] |= np.uint64(1) << np.uint64(coluna % BITS_POR_PALAVRA)
+        return mascara
+
+    def atualizar_receitas(self, receita_ids):
+        """Recarrega do banco apenas as receitas informadas (aprovadas entram, as demais saem)."""
+        if self._construido_em is None or not receita_ids:
+            return
+        ingredientes = {receita_id: set() for receita_id in receita_ids}
+        aprovadas = set(Receita.objects.filter(pk__in=receita_ids, status='aprovado').values_list('pk', flat=True))
+        for receita_id, nome in IngredienteReceita.objects.filter(receita_id__in=aprovadas).values_list(
+            'receita_id', 'nome_canonico'
+        ):
+            ingredientes[receita_id].add(nome)
+
+        with self._lock:
+            for receita_id, nomes in ingredientes.items():
+                linha = self._linhas.get(receita_id)
+                if receita_id not in aprovadas or not nomes:
+                    if linha is not None:
+                        # Linha vazia: a receita some dos resultados sem reorganizar a matriz
+                        self._bits[linha] = 0
+                        self._totais[linha] = 0
+                    continue
+                mascara = self._mascara(nomes, criar=True)
+                if linha is None:
+                    linha = self._linhas[receita_id] = len(self._ids)
+                    self._ids = np.append(self._ids, receita_id)
+                    self._bits = np.vstack([self._bits, mascara[np.newaxis, :]])
+                    self._totais = np.append(self._totais, np.int32(0))
+                self._bits[linha] = mascara
+                self._totais[linha] = _contar_bits(mascara[np.newaxis, :])[0]
+
+    def invalidar(self):
+        self._construido_em = None
+
+    def buscar(self, ingredientes, limite=30, max_faltando=None):
+        """
+        Ordena as receitas pelo número de ingredientes que faltam na despensa e,
+        em caso de empate, pela fração da receita que a despensa cobre.
+        Retorna uma lista de (receita_id, em_casa, faltando).
+        """
+        if self._precisa_construir():
+            with self._lock_construcao:
+                # Só uma thread reconstrói; as outras aproveitam o resultado
+                if self._precisa_construir():
+                    self.construir()
+
+        nomes = {dicionario_culinario.nome_canonico(ingrediente) for ingrediente in ingredientes}
+        with self._lock:
+            mascara = self._mascara(nomes)
+            if not mascara.any():
+                return []
+            em_casa = _contar_bits(self._bits & mascara)
+            totais, ids = self._totais, self._ids
+        faltando = totais - em_casa
+
+        candidatas = em_casa > 0
+        if max_faltando is not None:
+            candidatas &= faltando <= max_faltando
+        posicoes = np.flatnonzero(candidatas)
+        if not posicoes.size:
+            return []
+
+        cobertura = em_casa[posicoes] / totais[posicoes]
+        ordem = np.lexsort((-cobertura, faltando[posicoes]))[:limite]
+        escolhidas = posicoes[ordem]
+        return [(int(ids[p]), int(em_casa[p]), int(faltando[p])) for p in escolhidas]
+
+
+indice_despensa = IndiceDespensa()
+
+
+@receiver(post_save, sender=Receita)
+def atualizar_indice_despensa(sender, instance, update_fields=None, **kwargs):
+    """Reflete no índice as receitas aprovadas, hidratadas ou editadas, após o commit."""
+    if update_fields is not None and 'status' not in update_fields:
+        return
+    transaction.on_commit(lambda: indice_despensa.atualizar_receitas([instance.pk]))
+
+
+@receiver(post_delete, sender=Receita)
+def remover_do_indice_despensa(sender, instance, **kwargs):
+    receita_id = instance.pk
+    transaction.on_commit(lambda: indice_despensa.atualizar_receitas([receita_id]))
@@ -0,0 +1,353 @@
+# app_receitas/dicionario_culinario.py
+
+"""
+Dicionário bilíngue (inglês/português) do vocabulário fechado das receitas:
+unidades de medida, categorias e áreas da TheMealDB e ingredientes comuns.
+Consultado antes de qualquer tradução pela rede; as linhas de ingrediente
+("1/2 cup Flour") são traduzidas estruturalmente, sem chamar o tradutor.
+"""
+
+import re
+import unicodedata
+
+# Unidades: forma em inglês -> código canônico da unidade
+UNIDADES = {
+    'cup': 'xicara', 'cups': 'xicara',
+    'tbs': 'colher_sopa', 'tbsp': 'colher_sopa', 'tblsp': 'colher_sopa', 'tbls': 'colher_sopa',
+    'tablespoon': 'colher_sopa', 'tablespoons': 'colher_sopa',
+    'tsp': 'colher_cha', 'tspn': 'colher_cha', 'teaspoon': 'colher_cha', 'teaspoons': 'colher_cha',
+    'g': 'g', 'gr': 'g', 'gram': 'g', 'grams': 'g',
+    'kg': 'kg', 'kilo': 'kg', 'kilogram': 'kg', 'kilograms': 'kg',
+    'ml': 'ml', 'l': 'l', 'litre': 'l', 'litres': 'l', 'liter': 'l', 'liters': 'l',
+    'lb': 'libra', 'lbs': 'libra', 'pound': 'libra', 'pounds': 'libra',
+    'oz': 'onca', 'ounce': 'onca', 'ounces': 'onca',
+    'clove': 'dente', 'cloves': 'dente',
+    'pinch': 'pitada', 'pinches': 'pitada', 'dash': 'pitada',
+    'can': 'lata', 'cans': 'lata', 'tin': 'lata', 'tins': 'lata',
+    'slice': 'fatia', 'slices': 'fatia',
+    'handful': 'punhado', 'handfuls': 'punhado',
+    'sprig': 'ramo', 'sprigs': 'ramo',
+    'bunch': 'maco', 'bunches': 'maco',
+    'piece': 'pedaco', 'pieces': 'pedaco',
+    'leaf': 'folha', 'leaves': 'folha',
+    'drop': 'gota', 'drops': 'gota',
+    'packet': 'pacote', 'packets': 'pacote', 'pack': 'pacote',
+    'jar': 'pote', 'jars': 'pote',
+}
+
+# Código da unidade -> (singular, plural) em português
+FORMAS_UNIDADES = {
+    'xicara': ('xícara', 'xícaras'), 'colher_sopa': ('colher de sopa', 'colheres de sopa'),
+    'colher_cha': ('colher de chá', 'colheres de chá'), 'g': ('g', 'g'), 'kg': ('kg', 'kg'),
+    'ml': ('ml', 'ml'), 'l': ('litro', 'litros'), 'libra': ('libra', 'libras'), 'onca': ('onça', 'onças'),
+    'dente': ('dente', 'dentes'), 'pitada': ('pitada', 'pitadas'), 'lata': ('lata', 'latas'),
+    'fatia': ('fatia', 'fatias'), 'punhado': ('punhado', 'punhados'), 'ramo': ('ramo', 'ramos'),
+    'maco': ('maço', 'maços'), 'pedaco': ('pedaço', 'pedaços'), 'folha': ('folha', 'folhas'),
+    'gota': ('gota', 'gotas'), 'pacote': ('pacote', 'pacotes'), 'pote': ('pote', 'potes'),
+}
+
+# Medidas sem quantidade que vêm depois do ingrediente ("Sal a gosto")
+COMPLEMENTOS = {
+    'to taste': 'a gosto',
+    'to serve': 'para servir',
+    'garnish': 'para decorar',
+    'to garnish': 'para decorar',
+    'for garnish': 'para decorar',
+    'for frying': 'para fritar',
+    'to glaze': 'para pincelar',
+    'dusting': 'para polvilhar',
+    'for dusting': 'para polvilhar',
+    'as required': 'a gosto',
+}
+
+CATEGORIAS = {
+    'Beef': 'carne bovina', 'Breakfast': 'café da manhã', 'Chicken': 'frango', 'Dessert': 'sobremesa',
+    'Goat': 'cabra', 'Lamb': 'cordeiro', 'Miscellaneous': 'diversos', 'Pasta': 'massa', 'Pork': 'carne de porco',
+    'Seafood': 'frutos do mar', 'Side': 'acompanhamento', 'Starter': 'entrada', 'Vegan': 'vegana',
+    'Vegetarian': 'vegetariana',
+}
+
+AREAS = {
+    'American': 'americana', 'British': 'britânica', 'Canadian': 'canadense', 'Chinese': 'chinesa',
+    'Croatian': 'croata', 'Dutch': 'holandesa', 'Egyptian': 'egípcia', 'Filipino': 'filipina',
+    'French': 'francesa', 'Greek': 'grega', 'Indian': 'indiana', 'Irish': 'irlandesa', 'Italian': 'italiana',
+    'Jamaican': 'jamaicana', 'Japanese': 'japonesa', 'Kenyan': 'queniana', 'Malaysian': 'malaia',
+    'Mexican': 'mexicana', 'Moroccan': 'marroquina', 'Polish': 'polonesa', 'Portuguese': 'portuguesa',
+    'Russian': 'russa', 'Spanish': 'espanhola', 'Thai': 'tailandesa', 'Tunisian': 'tunisiana',
+    'Turkish': 'turca', 'Ukrainian': 'ucraniana', 'Vietnamese': 'vietnamita', 'Unknown': 'desconhecida',
+}
+
+INGREDIENTES = {
+    'Chicken': 'frango', 'Chicken Breast': 'peito de frango', 'Chicken Breasts': 'peitos de frango',
+    'Chicken Thighs': 'coxas de frango', 'Chicken Legs': 'coxas de frango', 'Chicken Stock': 'caldo de galinha',
+    'Beef': 'carne bovina', 'Minced Beef': 'carne moída', 'Beef Stock': 'caldo de carne', 'Pork': 'carne de porco',
+    'Bacon': 'bacon', 'Ham': 'presunto', 'Sausages': 'linguiças', 'Lamb': 'cordeiro', 'Lamb Mince': 'carne moída de cordeiro',
+    'Salmon': 'salmão', 'Tuna': 'atum', 'Prawns': 'camarões', 'Shrimp': 'camarão', 'Cod': 'bacalhau',
+    'Egg': 'ovo', 'Eggs': 'ovos', 'Egg Yolks': 'gemas', 'Egg White': 'clara de ovo', 'Egg Whites': 'claras de ovo',
+    'Milk': 'leite', 'Butter': 'manteiga', 'Unsalted Butter': 'manteiga sem sal', 'Cream': 'creme de leite',
+    'Double Cream': 'creme de leite fresco', 'Heavy Cream': 'creme de leite fresco', 'Sour Cream': 'creme azedo',
+    'Cheese': 'queijo', 'Cheddar Cheese': 'queijo cheddar', 'Parmesan': 'parmesão', 'Parmesan Cheese': 'queijo parmesão',
+    'Mozzarella': 'muçarela', 'Feta': 'queijo feta', 'Yogurt': 'iogurte', 'Greek Yogurt': 'iogurte grego',
+    'Flour': 'farinha de trigo', 'Plain Flour': 'farinha de trigo', 'Self-raising Flour': 'farinha com fermento',
+    'Sugar': 'açúcar', 'Caster Sugar': 'açúcar refinado', 'Brown Sugar': 'açúcar mascavo', 'Icing Sugar': 'açúcar de confeiteiro',
+    'Honey': 'mel', 'Salt': 'sal', 'Sea Salt': 'sal marinho', 'Pepper': 'pimenta', 'Black Pepper': 'pimenta-do-reino',
+    'Olive Oil': 'azeite', 'Vegetable Oil': 'óleo vegetal', 'Oil': 'óleo', 'Sunflower Oil': 'óleo de girassol',
+    'Vinegar': 'vinagre', 'Water': 'água', 'Baking Powder': 'fermento em pó', 'Yeast': 'fermento biológico',
+    'Rice': 'arroz', 'Pasta': 'macarrão', 'Spaghetti': 'espaguete', 'Noodles': 'macarrão oriental', 'Bread': 'pão',
+    'Potatoes': 'batatas', 'Potato': 'batata', 'Sweet Potatoes': 'batatas-doces', 'Onion': 'cebola', 'Onions': 'cebolas',
+    'Red Onions': 'cebolas roxas', 'Red Onion': 'cebola roxa', 'Spring Onions': 'cebolinhas', 'Garlic': 'alho',
+    'Garlic Clove': 'dente de alho', 'Tomato': 'tomate', 'Tomatoes': 'tomates', 'Chopped Tomatoes': 'tomates picados',
+    'Tomato Puree': 'purê de tomate', 'Carrots': 'cenouras', 'Carrot': 'cenoura', 'Celery': 'salsão',
+    'Mushrooms': 'cogumelos', 'Spinach': 'espinafre', 'Lettuce': 'alface', 'Cabbage': 'repolho', 'Broccoli': 'brócolis',
+    'Peas': 'ervilhas', 'Green Beans': 'vagens', 'Sweetcorn': 'milho', 'Corn': 'milho', 'Cucumber': 'pepino',
+    'Courgettes': 'abobrinhas', 'Zucchini': 'abobrinha', 'Aubergine': 'berinjela', 'Eggplant': 'berinjela',
+    'Red Pepper': 'pimentão vermelho', 'Green Pepper': 'pimentão verde', 'Chilli': 'pimenta-malagueta',
+    'Chilli Powder': 'pimenta em pó', 'Avocado': 'abacate', 'Lemon': 'limão-siciliano', 'Lime': 'limão',
+    'Lemon Juice': 'suco de limão', 'Orange': 'laranja', 'Apple': 'maçã', 'Apples': 'maçãs', 'Banana': 'banana',
+    'Bananas': 'bananas', 'Strawberries': 'morangos', 'Raisins': 'uvas-passas', 'Coconut Milk': 'leite de coco',
+    'Almonds': 'amêndoas', 'Walnuts': 'nozes', 'Peanuts': 'amendoins', 'Peanut Butter': 'pasta de amendoim',
+    'Chocolate': 'chocolate', 'Dark Chocolate': 'chocolate amargo', 'Cocoa': 'cacau em pó', 'Vanilla Extract': 'extrato de baunilha',
+    'Cinnamon': 'canela', 'Nutmeg': 'noz-moscada', 'Ginger': 'gengibre', 'Cumin': 'cominho', 'Paprika': 'páprica',
+    'Turmeric': 'cúrcuma', 'Coriander': 'coentro', 'Parsley': 'salsinha', 'Basil': 'manjericão', 'Oregano': 'orégano',
+    'Thyme': 'tomilho', 'Rosemary': 'alecrim', 'Mint': 'hortelã', 'Bay Leaf': 'folha de louro', 'Bay Leaves': 'folhas de louro',
+    'Soy Sauce': 'molho de soja', 'Worcestershire Sauce': 'molho inglês', 'Mustard': 'mostarda', 'Mayonnaise': 'maionese',
+    'Tomato Ketchup': 'ketchup', 'Beans': 'feijão', 'Black Beans': 'feijão-preto', 'Kidney Beans': 'feijão-vermelho',
+    'Chickpeas': 'grão-de-bico', 'Lentils': 'lentilhas', 'Tofu': 'tofu', 'Breadcrumbs': 'farinha de rosca', 'Oats': 'aveia',
+}
+
+# Substantivos contáveis: singular -> plural, usados quando a medida é só um número ("2 Eggs")
+PLURAIS = {
+    'ovo': 'ovos', 'batata': 'batatas', 'cebola': 'cebolas', 'cebola roxa': 'cebolas roxas', 'tomate': 'tomates',
+    'cenoura': 'cenouras', 'maçã': 'maçãs', 'banana': 'bananas', 'limão': 'limões', 'limão-siciliano': 'limões-sicilianos',
+    'laranja': 'laranjas', 'abacate': 'abacates', 'abobrinha': 'abobrinhas', 'berinjela': 'berinjelas',
+    'pepino': 'pepinos', 'pimentão vermelho': 'pimentões vermelhos', 'pimentão verde': 'pimentões verdes',
+    'peito de frango': 'peitos de frango', 'dente de alho': 'dentes de alho', 'folha de louro': 'folhas de louro',
+    'linguiça': 'linguiças', 'gema': 'gemas', 'clara de ovo': 'claras de ovo', 'batata-doce': 'batatas-doces',
+}
+
+# Termos em português usados nas buscas que não são a tradução direta de nenhum verbete
+SINONIMOS_PT = {
+    'carne': 'Beef', 'carne de vaca': 'Beef', 'porco': 'Pork', 'peixe': 'Fish', 'camarao': 'Prawns',
+    'massa': 'Pasta', 'macarrao': 'Pasta', 'limao': 'Lime', 'pimenta do reino': 'Black Pepper',
+    'salsa': 'Parsley', 'cheiro-verde': 'Parsley', 'feijao': 'Beans', 'milho verde': 'Sweetcorn',
+    'frutos do mar': 'Seafood', 'cafe da manha': 'Breakfast', 'creme de leite': 'Cream', 'queijo ralado': 'Parmesan',
+}
+
+FRACOES = {'½': 0.5, '¼': 0.25, '¾': 0.75, '⅓': 1 / 3, '⅔': 2 / 3, '⅛': 0.125}
+_NUMERO = r'(?:\d+(?:[.,]\d+)?(?:\s+\d+/\d+|/\d+)?[½¼¾⅓⅔⅛]?|[½¼¾⅓⅔⅛])'
+_MEDIDA = re.compile(rf'^(?P<quantidade>{_NUMERO}(?:\s*-\s*{_NUMERO})?)?\s*(?P<unidade>[^\d\s].*?)?\.?$')
+
+
+def chave(texto):
+    """Forma canônica de busca: minúsculas, sem acentos e sem espaços repetidos."""
+    sem_acentos = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sem_acentos.lower().split())
+
+
+def _compilar():
+    """Monta uma única tabela de consulta por idioma de destino."""
+    para_pt, para_en = {}, {}
+    for tabela in (INGREDIENTES, AREAS, CATEGORIAS):
+        for ingles, portugues in tabela.items():
+            para_pt[chave(ingles)] = portugues
+            para_en.setdefault(chave(portugues), ingles)
+    for singular, plural in PLURAIS.items():
+        if chave(singular) in para_en:
+            para_en.setdefault(chave(plural), para_en[chave(singular)])
+    for portugues, ingles in SINONIMOS_PT.items():
+        para_en.setdefault(chave(portugues), ingles)
+    return para_pt, para_en
+
+
+# Compilado uma única vez, na importação do módulo
+_PARA_PT, _PARA_EN = _compilar()
+_SINGULARES = {plural: singular for singular, plural in PLURAIS.items()}
+# Formas das unidades em português, da mais longa para a mais curta
+_UNIDADES_PT = sorted(
+    {(chave(forma), codigo) for codigo, formas in FORMAS_UNIDADES.items() for forma in formas},
+    key=lambda item: -len(item[0]),
+)
+
+
+def _valor(quantidade):
+    """Valor numérico aproximado da quantidade (o maior extremo, em faixas como '2-3')."""
+    ultimo = re.split(r'\s*-\s*', quantidade)[-1].replace(',', '.')
+    total = 0.0
+    for parte in ultimo.split():
+        fracao = FRACOES.get(parte[-1], 0.0)
+        parte = parte.rstrip(''.join(FRACOES))
+        if '/' in parte:
+            numerador, denominador = parte.split('/')
+            total += float(numerador) / float(denominador) if float(denominador) else 0.0
+        elif parte:
+            total += float(parte)
+        total += fracao
+    return total
+
+
+def _com_maiuscula(original, traducao):
+    return traducao[:1].upper() + traducao[1:] if original[:1].isupper() else traducao
+
+
+def _flexionar(nome, plural):
+    if plural:
+        return PLURAIS.get(nome, nome)
+    return _SINGULARES.get(nome, nome)
+
+
+def analisar_medida(medida):
+    """
+    Separa uma medida da TheMealDB ("1 1/2 cups", "200g", "to taste") em
+    (texto da quantidade, valor numérico, código da unidade, complemento).
+    Retorna None se a medida tiver palavras fora do dicionário.
+    """
+    medida = ' '.join((medida or '').split())
+    if not medida:
+        return '', None, '', ''
+
+    complemento = COMPLEMENTOS.get(medida.lower())
+    if complemento:
+        return '', None, '', complemento
+
+    encontrado = _MEDIDA.match(medida)
+    if not encontrado:
+        return None
+    quantidade, unidade = encontrado.group('quantidade') or '', encontrado.group('unidade')
+    codigo = ''
+    if unidade is not None:
+        codigo = UNIDADES.get(unidade.lower().rstrip('.'))
+        if codigo is None:
+            return None
+    return quantidade, _valor(quantidade) if quantidade else None, codigo, ''
+
+
+def formatar_quantidade(valor):
+    """Escreve um valor numérico como na receita: '1 1/2', '1/4', '200'."""
+    inteiro = int(valor)
+    resto = valor - inteiro
+    fracoes = {0.25: '1/4', 1 / 3: '1/3', 0.5: '1/2', 2 / 3: '2/3', 0.75: '3/4'}
+    for fracao, texto in fracoes.items():
+        if abs(resto - fracao) < 0.02:
+            return f"{inteiro} {texto}" if inteiro else texto
+    if resto < 0.02:
+        return str(inteiro)
+    if resto > 0.98:
+        return str(inteiro + 1)
+    return f"{valor:.1f}".replace('.', ',')
+
+
+def montar_linha(quantidade, valor, unidade, nome, complemento=''):
+    """Monta a linha em português a partir das partes já traduzidas."""
+    if complemento:
+        return f"{nome} {complemento}" if nome else complemento
+    plural = valor is not None and valor > 1
+    if not unidade:
+        if not nome:
+            return quantidade
+        return f"{quantidade} {_flexionar(nome, plural)}" if quantidade else nome
+    singular, plural_unidade = FORMAS_UNIDADES[unidade]
+    texto = plural_unidade if plural else singular
+    if quantidade:
+        texto = f"{quantidade} {texto}"
+    return f"{texto} de {nome}" if nome else texto
+
+
+def traduzir_medida(medida, ingrediente_pt=''):
+    """
+    Traduz a medida estruturalmente (quantidade + unidade) e, se informado,
+    monta a linha completa com o ingrediente já traduzido. Retorna None se a
+    medida tiver palavras fora do dicionário.
+    """
+    partes = analisar_medida(medida)
+    if partes is None:
+        return None
+    quantidade, valor, unidade, complemento = partes
+    return montar_linha(quantidade, valor, unidade, ingrediente_pt, complemento) or None
+
+
+def nome_canonico(ingrediente):
+    """
+    Nome usado para filtrar receitas por ingrediente: o verbete em inglês
+    (ou o próprio termo, se desconhecido) sem acentos e no singular.
+    """
+    ingles = traduzir_termo(ingrediente, 'en') or ingrediente
+    normalizado = chave(ingles)
+    if normalizado.endswith('oes'):
+        return normalizado[:-2]
+    if normalizado.endswith('s') and not normalizado.endswith('ss') and len(normalizado) > 3:
+        return normalizado[:-1]
+    return normalizado
+
+
+def _unidade_pt(texto):
+    """Identifica a unidade em português no início do texto: (código, restante)."""
+    normalizado = chave(texto)
+    for forma, codigo in _UNIDADES_PT:
+        if normalizado == forma or normalizado.startswith(forma + ' '):
+            restante = texto.split(None, len(forma.split()))[len(forma.split()):]
+            return codigo, ' '.join(restante)
+    return '', texto
+
+
+def analisar_linha_pt(linha):
+    """
+    Separa uma linha já em português ("1 xícara de farinha de trigo") em
+    (texto da quantidade, valor, código da unidade, complemento, ingrediente).
+    """
+    linha = ' '.join((linha or '').split())
+    complemento = ''
+    for traducao in set(COMPLEMENTOS.values()):
+        if linha.lower().endswith(' ' + traducao):
+            linha, complemento = linha[:-len(traducao)].strip(), traducao
+            break
+
+    encontrado = re.match(rf'^({_NUMERO}(?:\s*-\s*{_NUMERO})?)\s*(.*)$', linha)
+    quantidade, restante = (encontrado.group(1), encontrado.group(2)) if encontrado else ('', linha)
+    unidade, restante = _unidade_pt(restante)
+    if unidade and restante.lower().startswith('de '):
+        restante = restante[3:]
+    return quantidade, _valor(quantidade) if quantidade else None, unidade, complemento, restante
+
+
+def traduzir_termo(texto, destino):
+    """Traduz um termo isolado (ingrediente, categoria ou área) ou retorna None."""
+    tabela = _PARA_PT if destino == 'pt' else _PARA_EN
+    normalizado = chave(texto)
+    traducao = tabela.get(normalizado)
+    if traducao is None and destino == 'en' and normalizado.endswith('s'):
+        traducao = tabela.get(normalizado[:-1])
+    if traducao is None:
+        return None
+    return _com_maiuscula(texto.strip(), traducao) if destino == 'pt' else traducao
+
+
+def traduzir_linha_ingrediente(medida, ingrediente):
+    """Traduz para o português uma linha 'medida ingrediente' da TheMealDB, ou retorna None."""
+    ingrediente_pt = traduzir_termo(ingrediente, 'pt')
+    if ingrediente_pt is None:
+        return None
+    linha = traduzir_medida(medida, ingrediente_pt.lower())
+    if linha is None:
+        return None
+    return linha[:1].upper() + linha[1:]
+
+
+def traduzir(texto, destino):
+    """
+    Tenta traduzir localmente: primeiro como termo do dicionário e, para o
+    português, como linha 'medida ingrediente'. Retorna None quando o texto
+    precisa do tradutor externo.
+    """
+    if not texto or not texto.strip():
+        return None
+    traducao = traduzir_termo(texto, destino)
+    if traducao is not None or destino != 'pt':
+        return traducao
+
+    # "1/2 cup Flour": a medida é o prefixo e o ingrediente o maior sufixo conhecido
+    palavras = texto.split()
+    for corte in range(1, len(palavras)):
+        ingrediente = ' '.join(palavras[corte:])
+        if chave(ingrediente) in _PARA_PT:
+            return traduzir_linha_ingrediente(' '.join(palavras[:corte]), ingrediente)
+    return None
@@ -0,0 +1,127 @@
+# app_receitas/estatisticas.py
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def normalizar_termo(termo):
+    """Normaliza o termo buscado para que variações triviais sejam agregadas juntas."""
+    return ' '.join((termo or '').lower().split())[:255]
+
+
+def _incrementos(acumulado):
+    """Expressões de atualização que somam um lote às estatísticas já gravadas."""
+    return {
+        'total_consultas': F('total_consultas') + acumulado['consultas'],
+        'acertos_cache': F('acertos_cache') + acumulado['acertos'],
+        'total_resultados': F('total_resultados') + acumulado['resultados'],
+        'latencia_total_ms': F('latencia_total_ms') + acumulado['latencia_total'],
+        'latencia_max_ms': Greatest(F('latencia_max_ms'), acumulado['latencia_max']),
+        'ultima_consulta': acumulado['ultima'],
+    }
+
+
+class AgregadorConsultas:
+    """
+    Acumula em memória as estatísticas das buscas e as grava em lote no banco.
+    A gravação acontece em uma thread separada para não atrasar a requisição.
+    """
+
+    def __init__(self, tamanho_lote, intervalo):
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._pendentes = {}
+        self._eventos = 0
+        self._ultimo_envio = time.monotonic()
+
+    def registrar(self, tipo, termo, latencia_ms, resultados, do_cache=False):
+        chave = (tipo, normalizar_termo(termo))
+        if not chave[1]:
+            return
+
+        with self._lock:
+            acumulado = self._pendentes.get(chave)
+            if acumulado is None:
+                acumulado = self._pendentes[chave] = {
+                    'consultas': 0, 'acertos': 0, 'resultados': 0,
+                    'latencia_total': 0.0, 'latencia_max': 0.0, 'ultima': None,
+                }
+            acumulado['consultas'] += 1
+            acumulado['resultados'] += resultados
+            acumulado['ultima'] = timezone.now()
+            if do_cache:
+                acumulado['acertos'] += 1
+            else:
+                acumulado['latencia_total'] += latencia_ms
+                acumulado['latencia_max'] = max(acumulado['latencia_max'], latencia_ms)
+            self._eventos += 1
+
+            if self._eventos < self.tamanho_lote and time.monotonic() - self._ultimo_envio < self.intervalo:
+                return
+            lote = self._trocar_lote()
+
+        threading.Thread(target=self._gravar_em_thread, args=(lote,), daemon=True).start()
+
+    def descarregar(self):
+        """Grava imediatamente tudo o que estiver pendente (usado no encerramento)."""
+        with self._lock:
+            lote = self._trocar_lote()
+        if lote:
+            self._gravar(lote)
+
+    def _trocar_lote(self):
+        lote, self._pendentes = self._pendentes, {}
+        self._eventos = 0
+        self._ultimo_envio = time.monotonic()
+        return lote
+
+    def _gravar_em_thread(self, lote):
+        try:
+            self._gravar(lote)
+        finally:
+            connection.close()
+
+    def _gravar(self, lote):
+        from .models import ConsultaBusca
+
+        try:
+            with transaction.atomic():
+                for (tipo, termo), acumulado in lote.items():
+                    atualizadas = ConsultaBusca.objects.filter(tipo=tipo, termo=termo).update(**_incrementos(acumulado))
+                    if atualizadas:
+                        continue
+                    try:
+                        with transaction.atomic():
+                            ConsultaBusca.objects.create(
+                                tipo=tipo,
+                                termo=termo,
+                                total_consultas=acumulado['consultas'],
+                                acertos_cache=acumulado['acertos'],
+                                total_resultados=acumulado['resultados'],
+                                latencia_total_ms=acumulado['latencia_total'],
+                                latencia_max_ms=acumulado['latencia_max'],
+                                ultima_consulta=acumulado['ultima'],
+                            )
+                    except IntegrityError:
+                        # Outro processo criou a linha entre o update e o create
+                        ConsultaBusca.objects.filter(tipo=tipo, termo=termo).update(**_incrementos(acumulado))
+        except Exception as e:
+            logger.error("Erro ao gravar estatísticas de busca: %s", e)
+
+
+agregador = AgregadorConsultas(
+    tamanho_lote=settings.ESTATISTICAS_BUSCA_LOTE,
+    intervalo=settings.ESTATISTICAS_BUSCA_INTERVALO,
+)
+atexit.register(agregador.descarregar)
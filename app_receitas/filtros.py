@@ -0,0 +1,44 @@
+# app_receitas/filtros.py
+
+"""
+Combinação local dos filtros de busca da TheMealDB, que só aceita um
+filtro por requisição (um ingrediente, uma área ou uma categoria).
+"""
+
+TODOS = 'todos'
+QUALQUER = 'qualquer'
+
+
+def combinar_filtros(filtros, buscar, modo=TODOS, em_cache=lambda filtro: False):
+    """
+    Combina os resultados de vários filtros; `buscar(filtro)` devolve {id: receita}.
+
+    No modo TODOS, os filtros já em cache são lidos primeiro e a interseção é
+    feita do menor conjunto para o maior; assim que ela fica vazia, os filtros
+    restantes nem são buscados. No modo QUALQUER, o resultado é a união.
+    """
+    if modo == QUALQUER:
+        receitas = {}
+        for filtro in filtros:
+            receitas.update(buscar(filtro))
+        return list(receitas.values())
+
+    no_cache = [em_cache(filtro) for filtro in filtros]
+    conjuntos = sorted((buscar(filtro) for filtro, lido in zip(filtros, no_cache) if lido), key=len)
+    pendentes = [filtro for filtro, lido in zip(filtros, no_cache) if not lido]
+
+    ids = None
+    for encontrados in conjuntos:
+        ids = set(encontrados) if ids is None else ids & encontrados.keys()
+        if not ids:
+            return []
+    for filtro in pendentes:
+        encontrados = buscar(filtro)
+        conjuntos.append(encontrados)
+        ids = set(encontrados) if ids is None else ids & encontrados.keys()
+        if not ids:
+            return []
+    if ids is None:
+        return []
+    menor = min(conjuntos, key=len)
+    return [receita for receita_id, receita in menor.items() if receita_id in ids]
@@ -0,0 +1,122 @@
+# app_receitas/ingredientes.py
+
+"""
+Ingredientes estruturados das receitas (quantidade, unidade e nome canônico),
+com escala de porções e conversão de unidades feitas em lote com numpy.
+"""
+
+import numpy as np
+from django.db import transaction
+
+from . import dicionario_culinario
+from .models import IngredienteReceita
+
+# Unidades convertíveis para o sistema métrico: código -> (unidade métrica, fator)
+CONVERSOES_METRICAS = {
+    'xicara': ('ml', 240.0), 'colher_sopa': ('ml', 15.0), 'colher_cha': ('ml', 5.0),
+    'l': ('ml', 1000.0), 'ml': ('ml', 1.0),
+    'kg': ('g', 1000.0), 'libra': ('g', 453.592), 'onca': ('g', 28.3495), 'g': ('g', 1.0),
+}
+# Acima destes valores a quantidade métrica é exibida na unidade maior
+UNIDADES_MAIORES = {'ml': ('l', 1000.0), 'g': ('kg', 1000.0)}
+
+
+def _novo_item(ordem, texto, nome, quantidade, unidade, observacao):
+    return IngredienteReceita(
+        ordem=ordem,
+        texto=texto[:255],
+        nome=nome[:100],
+        nome_canonico=dicionario_culinario.nome_canonico(nome)[:100],
+        quantidade=quantidade,
+        unidade=unidade,
+        observacao=observacao[:50],
+    )
+
+
+def itens_da_refeicao(meal_data, traduzir):
+    """
+    Monta os ingredientes a partir dos campos strIngredientN/strMeasureN da
+    TheMealDB, separando a medida antes da tradução. `traduzir` só é chamada
+    para o que estiver fora do dicionário culinário.
+    """
+    itens = []
+    for i in range(1, 21):
+        ingrediente = (meal_data.get(f'strIngredient{i}') or '').strip()
+        if not ingrediente:
+            continue
+        medida = (meal_data.get(f'strMeasure{i}') or '').strip()
+        nome = dicionario_culinario.traduzir_termo(ingrediente, 'pt') or traduzir(ingrediente)
+
+        partes = dicionario_culinario.analisar_medida(medida)
+        if partes is None:
+            # Medida com palavras desconhecidas ("2 large"): guarda só a linha traduzida
+            itens.append(_novo_item(len(itens), traduzir(f"{medida} {ingrediente}"), nome, None, '', ''))
+            continue
+
+        quantidade, valor, unidade, complemento = partes
+        linha = dicionario_culinario.montar_linha(quantidade, valor, unidade, nome.lower(), complemento)
+        itens.append(_novo_item(len(itens), linha[:1].upper() + linha[1:], nome, valor, unidade, complemento))
+    return itens
+
+
+def itens_das_linhas(linhas):
+    """Estrutura linhas de texto já gravadas (em português ou no formato 'medida ingrediente')."""
+    itens = []
+    for linha in linhas or []:
+        if not isinstance(linha, str) or not linha.strip():
+            continue
+        em_portugues = dicionario_culinario.traduzir(linha, 'pt') or linha
+        quantidade, valor, unidade, complemento, nome = dicionario_culinario.analisar_linha_pt(em_portugues)
+        itens.append(_novo_item(len(itens), linha.strip(), nome or linha.strip(), valor, unidade, complemento))
+    return itens
+
+
+def salvar_itens(receita, itens):
+    """Substitui os ingredientes estruturados da receita."""
+    for item in itens:
+        item.receita = receita
+    with transaction.atomic():
+        IngredienteReceita.objects.filter(receita=receita).delete()
+        IngredienteReceita.objects.bulk_create(itens)
+
+
+def escalar(receita_ids, fator=1.0, metrico=False):
+    """
+    Multiplica as quantidades de várias receitas de uma só vez e, se pedido,
+    converte medidas caseiras e imperiais para ml/g. Retorna um dicionário
+    receita_id -> linhas em português.
+    """
+    linhas = list(
+        IngredienteReceita.objects.filter(receita_id__in=receita_ids)
+        .order_by('receita_id', 'ordem')
+        .values_list('receita_id', 'texto', 'nome', 'quantidade', 'unidade', 'observacao')
+    )
+    resultado = {receita_id: [] for receita_id in receita_ids}
+    if not linhas:
+        return resultado
+
+    quantidades = np.array([linha[3] if linha[3] is not None else np.nan for linha in linhas], dtype=float)
+    unidades = np.array([linha[4] for linha in linhas], dtype=object)
+    quantidades = quantidades * fator
+
+    if metrico:
+        codigos, posicoes = np.unique(unidades, return_inverse=True)
+        fatores = np.array([CONVERSOES_METRICAS.get(c, (c, 1.0))[1] for c in codigos])[posicoes]
+        destinos = np.array([CONVERSOES_METRICAS.get(c, (c, 1.0))[0] for c in codigos], dtype=object)[posicoes]
+        quantidades = quantidades * fatores
+        for menor, (maior, limite) in UNIDADES_MAIORES.items():
+            promover = (destinos == menor) & (quantidades >= limite)
+            quantidades = np.where(promover, quantidades / limite, quantidades)
+            destinos = np.where(promover, maior, destinos)
+        unidades = destinos
+
+    alterado = fator != 1 or metrico
+    for (receita_id, texto, nome, _, _, observacao), valor, unidade in zip(linhas, quantidades, unidades):
+        if not alterado or np.isnan(valor):
+            resultado[receita_id].append(texto)
+            continue
+        linha = dicionario_culinario.montar_linha(
+            dicionario_culinario.formatar_quantidade(valor), valor, unidade, nome.lower(), observacao,
+        )
+        resultado[receita_id].append(linha[:1].upper() + linha[1:])
+    return resultado
@@ -0,0 +1,135 @@
+# app_receitas/instrumentacao.py
+
+import contextvars
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django import shortcuts
+from django.db import connections
+
+# Tempos acumulados por etapa durante a requisição atual (None fora de uma requisição)
+_tempos_requisicao = contextvars.ContextVar('tempos_requisicao', default=None)
+
+# Limites (em segundos) dos buckets dos histogramas
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histograma:
+    """Histograma cumulativo no formato do Prometheus, separado por um rótulo."""
+
+    def __init__(self, nome, descricao, rotulo, buckets=BUCKETS):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulo = rotulo
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor_rotulo, segundos):
+        with self._lock:
+            serie = self._series.get(valor_rotulo)
+            if serie is None:
+                serie = self._series[valor_rotulo] = {'buckets': [0] * len(self.buckets), 'soma': 0.0, 'total': 0}
+            for i, limite in enumerate(self.buckets):
+                if segundos <= limite:
+                    serie['buckets'][i] += 1
+            serie['soma'] += segundos
+            serie['total'] += 1
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} histogram"]
+        with self._lock:
+            series = {rotulo: dict(serie, buckets=list(serie['buckets'])) for rotulo, serie in self._series.items()}
+        for valor_rotulo, serie in sorted(series.items()):
+            rotulo = f'{self.rotulo}="{valor_rotulo}"'
+            for limite, contagem in zip(self.buckets, serie['buckets']):
+                linhas.append(f'{self.nome}_bucket{{{rotulo},le="{limite}"}} {contagem}')
+            linhas.append(f'{self.nome}_bucket{{{rotulo},le="+Inf"}} {serie["total"]}')
+            linhas.append(f'{self.nome}_sum{{{rotulo}}} {serie["soma"]:.6f}')
+            linhas.append(f'{self.nome}_count{{{rotulo}}} {serie["total"]}')
+        return linhas
+
+
+duracao_etapas = Histograma(
+    'receitas_etapa_duracao_segundos',
+    'Tempo gasto por requisição em cada etapa (banco, TheMealDB, tradução, template, imagem).',
+    'etapa',
+)
+duracao_requisicoes = Histograma(
+    'receitas_requisicao_duracao_segundos',
+    'Tempo total das requisições por view.',
+    'view',
+)
+
+
+def percentil(valores, p):
+    """Percentil por vizinho mais próximo de uma lista já ordenada."""
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))]
+
+
+def exportar_metricas():
+    """Retorna todas as métricas no formato de texto do Prometheus."""
+    linhas = duracao_etapas.exportar() + duracao_requisicoes.exportar()
+    return '\n'.join(linhas) + '\n'
+
+
+@contextmanager
+def medir(etapa):
+    """Soma o tempo do bloco à etapa informada na requisição atual."""
+    tempos = _tempos_requisicao.get()
+    if tempos is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tempos[etapa] = tempos.get(etapa, 0.0) + time.perf_counter() - inicio
+
+
+def render(request, *args, **kwargs):
+    """Mesmo que django.shortcuts.render, medindo o tempo de renderização do template."""
+    with medir('template'):
+        return shortcuts.render(request, *args, **kwargs)
+
+
+def _medir_sql(execute, sql, params, many, context):
+    with medir('db'):
+        return execute(sql, params, many, context)
+
+
+class TempoPorEtapaMiddleware:
+    """
+    Mede o tempo gasto em cada etapa da requisição, devolve o detalhamento no
+    cabeçalho Server-Timing e alimenta os histogramas expostos em /metricas/.
+    As etapas podem se sobrepor (ex.: consultas feitas durante o template).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tempos = {}
+        token = _tempos_requisicao.set(tempos)
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as pilha:
+                for conexao in connections.all():
+                    pilha.enter_context(conexao.execute_wrapper(_medir_sql))
+                response = self.get_response(request)
+        finally:
+            _tempos_requisicao.reset(token)
+        total = time.perf_counter() - inicio
+
+        for etapa, segundos in tempos.items():
+            duracao_etapas.observar(etapa, segundos)
+        match = getattr(request, 'resolver_match', None)
+        duracao_requisicoes.observar(match.view_name if match else 'nao_resolvida', total)
+
+        detalhes = [f"{etapa};dur={segundos * 1000:.1f}" for etapa, segundos in tempos.items()]
+        detalhes.append(f"total;dur={total * 1000:.1f}")
+        response['Server-Timing'] = ', '.join(detalhes)
+        return response
@@ -0,0 +1,139 @@
+# app_receitas/management/commands/aquecer_cache.py
+
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import parse_qs
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from app_receitas.estatisticas import normalizar_termo
+from app_receitas.models import ConsultaBusca, Receita
+from app_receitas.views import (
+    HIDRATACAO_ADIADA, HIDRATACAO_EM_ANDAMENTO, _fetch_from_themealdb, _hidratar_com_lease, _receita_incompleta,
+)
+
+TIPOS_BUSCA = ('nome', 'ingredientes', 'categoria', 'area')
+
+# Captura a query string de linhas de log de acesso, ex.:
+# "GET /buscar/?ingredientes=frango%2C+cebola&page=2 HTTP/1.1" 200 ...
+BUSCA_NO_LOG = re.compile(r'/buscar/\?(\S+)')
+
+
+def _consultas_da_linha(linha):
+    """Extrai pares (tipo, valor) de uma linha de log ou de uma linha 'tipo=valor'."""
+    linha = linha.strip()
+    if not linha or linha.startswith('#'):
+        return []
+
+    encontrado = BUSCA_NO_LOG.search(linha)
+    query_string = encontrado.group(1) if encontrado else linha
+    params = parse_qs(query_string)
+
+    consultas = []
+    for tipo in TIPOS_BUSCA:
+        for valor in params.get(tipo, []):
+            if tipo == 'ingredientes':
+                # A view busca cada ingrediente separadamente na API
+                consultas.extend(('ingredientes', ing.strip()) for ing in valor.split(',') if ing.strip())
+            elif valor.strip():
+                consultas.append((tipo, valor.strip()))
+    return consultas
+
+
+class Command(BaseCommand):
+    help = (
+        "Aquece o cache de traduções e buscas da TheMealDB repetindo as consultas mais "
+        "frequentes (do log informado ou da tabela de estatísticas de busca) e hidrata as "
+        "receitas mais bem avaliadas. Com o cache padrão em memória o aquecimento só vale para o próprio processo; configure DJANGO_CACHE_BACKEND como "
+        "'arquivo' ou 'redis' para compartilhá-lo com os workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--arquivo-consultas',
+                            help="Log de acesso ou arquivo com uma consulta 'tipo=valor' por linha. "
+                                 "Se omitido, usa as consultas mais frequentes registradas no banco.")
+        parser.add_argument('--top-consultas', type=int, default=50, help="Quantidade de consultas mais frequentes a repetir.")
+        parser.add_argument('--top-receitas', type=int, default=50, help="Quantidade de receitas mais bem avaliadas a hidratar.")
+        parser.add_argument('--receitas-por-consulta', type=int, default=3,
+                            help="Quantas receitas do topo de cada consulta também devem ser hidratadas.")
+        parser.add_argument('--concorrencia', type=int, default=4, help="Número máximo de requisições simultâneas.")
+
+    def handle(self, *args, **options):
+        if options['concorrencia'] < 1:
+            raise CommandError("--concorrencia deve ser pelo menos 1.")
+
+        consultas = self._consultas_mais_frequentes(options['arquivo_consultas'], options['top_consultas'])
+        self.stdout.write(f"Repetindo {len(consultas)} consultas com concorrência {options['concorrencia']}...")
+
+        ids_para_hidratar = []
+        falhas_busca = 0
+        with ThreadPoolExecutor(max_workers=options['concorrencia']) as executor:
+            futuros = [executor.submit(self._aquecer_busca, tipo, valor) for tipo, valor in consultas]
+            for futuro in as_completed(futuros):
+                receitas_api, msg = futuro.result()
+                if msg and not receitas_api:
+                    falhas_busca += 1
+                ids_para_hidratar.extend(r['external_id'] for r in receitas_api[:options['receitas_por_consulta']])
+
+        top_receitas = (
+            Receita.objects.filter(status='aprovado', external_id__startswith='tmdb_')
+            .order_by('-media_avaliacoes')
+            .values_list('external_id', flat=True)[:options['top_receitas']]
+        )
+        ids_para_hidratar.extend(top_receitas)
+        ids_para_hidratar = list(dict.fromkeys(ids_para_hidratar))
+
+        self.stdout.write(f"Hidratando até {len(ids_para_hidratar)} receitas...")
+        resultados = Counter()
+        with ThreadPoolExecutor(max_workers=options['concorrencia']) as executor:
+            futuros = [executor.submit(self._aquecer_receita, external_id) for external_id in ids_para_hidratar]
+            for futuro in as_completed(futuros):
+                resultados[futuro.result()] += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Cache aquecido: {len(consultas) - falhas_busca}/{len(consultas)} consultas com resultado, "
+            f"{resultados['hidratada']} receitas hidratadas, {resultados['completa']} já completas, "
+            f"{resultados['em_andamento']} puladas (em preparo por outro processo), {resultados['erro']} com erro."
+        ))
+
+    def _consultas_mais_frequentes(self, arquivo, limite):
+        if not arquivo:
+            # Sem log informado, usa as estatísticas coletadas das buscas reais
+            return list(
+                ConsultaBusca.objects.filter(tipo__in=TIPOS_BUSCA)
+                .order_by('-total_consultas')
+                .values_list('tipo', 'termo')[:limite]
+            )
+        contagem = Counter()
+        try:
+            with open(arquivo, encoding='utf-8', errors='replace') as f:
+                for linha in f:
+                    for tipo, valor in _consultas_da_linha(linha):
+                        contagem[(tipo, normalizar_termo(valor))] += 1
+        except OSError as e:
+            raise CommandError(f"Não foi possível ler '{arquivo}': {e}")
+        return [consulta for consulta, _ in contagem.most_common(limite)]
+
+    def _aquecer_busca(self, tipo, valor):
+        try:
+            return _fetch_from_themealdb(tipo, valor, registrar=False)
+        finally:
+            connection.close()
+
+    def _aquecer_receita(self, external_id):
+        try:
+            receita, created = Receita.objects.get_or_create(external_id=external_id)
+            if not created and not _receita_incompleta(receita):
+                return 'completa'
+            resultado = _hidratar_com_lease(receita)
+            if resultado in (HIDRATACAO_EM_ANDAMENTO, HIDRATACAO_ADIADA):
+                # Outro processo tem a reserva (ou não houve vaga): nada foi hidratado aqui
+                return 'em_andamento'
+            return 'hidratada' if resultado else 'erro'
+        except Exception as e:
+            self.stderr.write(f"Erro ao hidratar {external_id}: {e}")
+            return 'erro'
+        finally:
+            connection.close()
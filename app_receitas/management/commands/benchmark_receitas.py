@@ -0,0 +1,190 @@
+# app_receitas/management/commands/benchmark_receitas.py
+
+import json
+import random
+import time
+import tracemalloc
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+from app_receitas.dados_sinteticos import gerar_dados
+from app_receitas.estatisticas import agregador
+from app_receitas.instrumentacao import percentil
+from app_receitas.stubs import ID_INICIAL, INGREDIENTES, TOTAL_REFEICOES, ServidorStub
+
+# Cache do benchmark: o `cache.clear()` entre cenários e as respostas dos stubs não
+# podem chegar a um cache compartilhado (redis, arquivo) usado pela aplicação
+CACHES_BENCHMARK = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark_receitas'},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Executa um benchmark reprodutível de index, buscar_receitas, detalhes_receita e "
+        "receitas_favoritas sobre um banco de teste com dados sintéticos, usando servidores "
+        "locais no lugar da TheMealDB e do tradutor. Reporta p50/p95/p99, consultas SQL por "
+        "requisição e pico de memória."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--receitas', type=int, default=10000, help="Quantidade de receitas geradas (10k a 1M).")
+        parser.add_argument('--usuarios', type=int, default=200)
+        parser.add_argument('--avaliacoes-por-usuario', type=int, default=20)
+        parser.add_argument('--favoritos-por-usuario', type=int, default=10)
+        parser.add_argument('--iteracoes', type=int, default=100, help="Requisições medidas por cenário.")
+        parser.add_argument('--latencia-api', type=float, default=50, help="Latência simulada da TheMealDB (ms).")
+        parser.add_argument('--latencia-traducao', type=float, default=20, help="Latência simulada do tradutor (ms).")
+        parser.add_argument('--variacao', type=float, default=10, help="Variação aleatória somada às latências (ms).")
+        parser.add_argument('--semente', type=int, default=42)
+        parser.add_argument('--cenarios', help="Lista separada por vírgulas dos cenários a executar.")
+        parser.add_argument('--saida', help="Grava o resultado em JSON neste arquivo.")
+        parser.add_argument('--comparar', help="JSON de uma execução anterior para detectar regressões de p95.")
+        parser.add_argument('--tolerancia', type=float, default=0.2,
+                            help="Aumento relativo de p95 aceito na comparação (padrão 20%%).")
+
+    def handle(self, *args, **options):
+        random.seed(options['semente'])
+        stub_api = ServidorStub(options['latencia_api'], options['variacao']).iniciar()
+        stub_traducao = ServidorStub(options['latencia_traducao'], options['variacao']).iniciar()
+
+        setup_test_environment()
+        nome_banco_original = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        # As estatísticas de busca ficam todas em memória durante o benchmark e são gravadas
+        # no banco de teste antes de ele ser destruído; senão, o descarregamento no atexit (ou
+        # uma gravação em segundo plano atrasada) iria para o banco real
+        lote_original = (agregador.tamanho_lote, agregador.intervalo)
+        agregador.tamanho_lote, agregador.intervalo = float('inf'), float('inf')
+        try:
+            # Trocar CACHES recria o `caches` do Django (sinal setting_changed) na entrada e na saída
+            with override_settings(
+                CACHES=CACHES_BENCHMARK,
+                THEMEALDB_BASE_URL=stub_api.url_themealdb,
+                TRADUCAO_URL=stub_traducao.url_traducao,
+                TRADUCAO_BACKENDS=['http'],
+            ):
+                resultados = self._executar(options)
+        finally:
+            agregador.descarregar()
+            agregador.tamanho_lote, agregador.intervalo = lote_original
+            connection.creation.destroy_test_db(nome_banco_original, verbosity=0)
+            teardown_test_environment()
+            stub_api.parar()
+            stub_traducao.parar()
+
+        self._imprimir(resultados)
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as f:
+                json.dump(resultados, f, indent=2)
+        if options['comparar']:
+            self._comparar(resultados, options['comparar'], options['tolerancia'])
+
+    def _executar(self, options):
+        inicio = time.perf_counter()
+        usuarios = gerar_dados(
+            receitas=options['receitas'],
+            usuarios=options['usuarios'],
+            avaliacoes_por_usuario=options['avaliacoes_por_usuario'],
+            favoritos_por_usuario=options['favoritos_por_usuario'],
+            semente=options['semente'],
+        )
+        self.stdout.write(f"Dados gerados em {time.perf_counter() - inicio:.1f}s.")
+
+        rnd = random.Random(options['semente'])
+        total_receitas = options['receitas']
+        ids_frios = iter(range(ID_INICIAL, ID_INICIAL + TOTAL_REFEICOES))
+
+        anonimo = Client()
+        logado = Client()
+        logado.force_login(usuarios[0])
+
+        cenarios = {
+            'index': lambda: anonimo.get('/'),
+            'buscar_nome': lambda: anonimo.get('/buscar/', {'nome': f"Receita {rnd.randrange(total_receitas)}"}),
+            'buscar_ingredientes': lambda: anonimo.get(
+                '/buscar/', {'ingredientes': ', '.join(rnd.sample(INGREDIENTES, 2))}
+            ),
+            'detalhes_local': lambda: anonimo.get(f"/receita/bench_{rnd.randrange(total_receitas)}/"),
+            'detalhes_tmdb_frio': lambda: anonimo.get(f"/receita/tmdb_{next(ids_frios)}/"),
+            'receitas_favoritas': lambda: logado.get('/receitas-favoritas/'),
+        }
+        if options['cenarios']:
+            escolhidos = [nome.strip() for nome in options['cenarios'].split(',')]
+            desconhecidos = set(escolhidos) - set(cenarios)
+            if desconhecidos:
+                raise CommandError(f"Cenários desconhecidos: {', '.join(sorted(desconhecidos))}")
+            cenarios = {nome: cenarios[nome] for nome in escolhidos}
+
+        resultados = {'parametros': {k: options[k] for k in (
+            'receitas', 'usuarios', 'iteracoes', 'latencia_api', 'latencia_traducao', 'semente')}, 'cenarios': {}}
+        for nome, requisicao in cenarios.items():
+            self.stdout.write(f"Executando '{nome}'...")
+            resultados['cenarios'][nome] = self._medir(requisicao, options['iteracoes'])
+        return resultados
+
+    def _medir(self, requisicao, iteracoes):
+        cache.clear()
+        latencias, consultas, erros = [], [], 0
+        for _ in range(iteracoes):
+            with CaptureQueriesContext(connection) as capturadas:
+                inicio = time.perf_counter()
+                response = requisicao()
+                latencias.append((time.perf_counter() - inicio) * 1000)
+            consultas.append(len(capturadas))
+            if response.status_code >= 400:
+                erros += 1
+
+        # Memória medida em uma rodada separada, pois o tracemalloc distorce as latências
+        picos = []
+        for _ in range(min(10, iteracoes)):
+            tracemalloc.start()
+            requisicao()
+            picos.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        latencias.sort()
+        return {
+            'p50_ms': round(percentil(latencias, 50), 2),
+            'p95_ms': round(percentil(latencias, 95), 2),
+            'p99_ms': round(percentil(latencias, 99), 2),
+            'consultas_media': round(sum(consultas) / len(consultas), 1),
+            'consultas_max': max(consultas),
+            'memoria_pico_kb': round(max(picos) / 1024, 1) if picos else 0,
+            'erros': erros,
+        }
+
+    def _imprimir(self, resultados):
+        cabecalho = f"{'cenário':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'SQL/req':>10}{'SQL máx':>10}{'mem KB':>10}{'erros':>7}"
+        self.stdout.write(cabecalho)
+        self.stdout.write('-' * len(cabecalho))
+        for nome, r in resultados['cenarios'].items():
+            self.stdout.write(
+                f"{nome:<22}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['consultas_media']:>10}"
+                f"{r['consultas_max']:>10}{r['memoria_pico_kb']:>10}{r['erros']:>7}"
+            )
+
+    def _comparar(self, resultados, arquivo, tolerancia):
+        try:
+            with open(arquivo, encoding='utf-8') as f:
+                base = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Não foi possível ler '{arquivo}': {e}")
+
+        regressoes = []
+        for nome, atual in resultados['cenarios'].items():
+            anterior = base.get('cenarios', {}).get(nome)
+            if not anterior or not anterior['p95_ms']:
+                continue
+            variacao = atual['p95_ms'] / anterior['p95_ms'] - 1
+            if variacao > tolerancia:
+                regressoes.append(f"{nome}: p95 {anterior['p95_ms']} -> {atual['p95_ms']} ms (+{variacao:.0%})")
+            if atual['consultas_max'] > anterior['consultas_max']:
+                regressoes.append(f"{nome}: SQL por requisição {anterior['consultas_max']} -> {atual['consultas_max']}")
+
+        if regressoes:
+            raise CommandError("Regressões detectadas:\n" + '\n'.join(regressoes))
+        self.stdout.write(self.style.SUCCESS("Nenhuma regressão em relação à execução anterior."))
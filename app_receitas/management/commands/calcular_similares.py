@@ -0,0 +1,37 @@
+# app_receitas/management/commands/calcular_similares.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from app_receitas.recomendacoes import calcular_colaborativas, calcular_similares
+
+
+class Command(BaseCommand):
+    help = (
+        "Pré-calcula as receitas semelhantes exibidas na página de cada receita: por conteúdo "
+        "(ingredientes, categoria e área) e colaborativas (quem favoritou ou avaliou bem uma "
+        "receita também gostou de). Deve rodar periodicamente; com --apenas-novas, incorpora "
+        "às semelhantes por conteúdo só as receitas que ainda não têm lista."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--origem', choices=['conteudo', 'colaborativa', 'todas'], default='todas',
+                            help="Quais recomendações recalcular (padrão: todas).")
+        parser.add_argument('--apenas-novas', action='store_true',
+                            help="Por conteúdo: calcula só as receitas sem semelhantes e atualiza as listas afetadas por elas.")
+        parser.add_argument('--k', type=int, help="Semelhantes guardadas por receita (padrão: SIMILARES_POR_RECEITA).")
+
+    def handle(self, *args, **options):
+        if options['origem'] in ('conteudo', 'todas'):
+            inicio = time.perf_counter()
+            total = calcular_similares(apenas_novas=options['apenas_novas'], k=options['k'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Semelhantes por conteúdo gravadas para {total} receitas em {time.perf_counter() - inicio:.1f}s."
+            ))
+        if options['origem'] in ('colaborativa', 'todas'):
+            inicio = time.perf_counter()
+            total = calcular_colaborativas(k=options['k'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Recomendações colaborativas gravadas para {total} receitas em {time.perf_counter() - inicio:.1f}s."
+            ))
@@ -0,0 +1,45 @@
+# app_receitas/management/commands/estruturar_ingredientes.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app_receitas.ingredientes import itens_das_linhas
+from app_receitas.models import IngredienteReceita, Receita
+
+
+class Command(BaseCommand):
+    help = (
+        "Separa em quantidade, unidade e nome canônico os ingredientes das receitas já "
+        "gravadas, preenchendo a tabela usada na escala de porções e no filtro por ingrediente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todas', action='store_true',
+                            help="Refaz também as receitas que já têm ingredientes estruturados.")
+        parser.add_argument('--lote', type=int, default=1000, help="Receitas processadas por transação.")
+
+    def handle(self, *args, **options):
+        receitas = Receita.objects.order_by('pk')
+        if not options['todas']:
+            receitas = receitas.filter(itens_ingredientes__isnull=True)
+
+        # Percorre por chave primária: o filtro acima muda à medida que os lotes são gravados
+        total, ultimo = 0, 0
+        while True:
+            lote = list(receitas.filter(pk__gt=ultimo).values_list('pk', 'ingredientes')[:options['lote']])
+            if not lote:
+                break
+            total += self._gravar([(receita_id, itens_das_linhas(linhas)) for receita_id, linhas in lote])
+            ultimo = lote[-1][0]
+        self.stdout.write(self.style.SUCCESS(f"{total} receitas estruturadas."))
+
+    def _gravar(self, lote):
+        novos = []
+        for receita_id, itens in lote:
+            for item in itens:
+                item.receita_id = receita_id
+                novos.append(item)
+        with transaction.atomic():
+            IngredienteReceita.objects.filter(receita_id__in=[receita_id for receita_id, _ in lote]).delete()
+            IngredienteReceita.objects.bulk_create(novos)
+        return len(lote)
@@ -0,0 +1,80 @@
+# app_receitas/management/commands/perfil_inicializacao.py
+
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Linha do `python -X importtime`: "import time:   self [us] | cumulative | imported package"
+LINHA_IMPORTTIME = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+# Executado em um processo novo, como um worker recém-iniciado: carrega a aplicação
+# WSGI e força o import das URLs e views, que o Django só faria na primeira requisição.
+SCRIPT_INICIALIZACAO = """
+import time
+inicio = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(f"TOTAL {time.perf_counter() - inicio:.6f}")
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede o custo de inicialização de um worker: sobe a aplicação WSGI em um processo "
+        "novo com `python -X importtime` e lista os módulos que mais pesam no import."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25, help="Quantidade de módulos listados.")
+        parser.add_argument('--ordenar', choices=['cumulativo', 'proprio'], default='cumulativo',
+                            help="Ordena pelo tempo acumulado (com os submódulos) ou só pelo do próprio módulo.")
+        parser.add_argument('--prefixo', help="Lista apenas módulos com este prefixo (ex.: app_receitas).")
+        parser.add_argument('--rodadas', type=int, default=1,
+                            help="Repete a medição e usa a mediana do tempo total.")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'gerador_receitas.settings'))
+        totais, modulos = [], {}
+        for _ in range(max(1, options['rodadas'])):
+            processo = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', SCRIPT_INICIALIZACAO],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            if processo.returncode != 0:
+                raise CommandError(f"A aplicação falhou ao iniciar:\n{processo.stderr[-2000:]}")
+            totais.append(float(processo.stdout.strip().rsplit('TOTAL ', 1)[-1]))
+            modulos = self._modulos(processo.stderr)
+
+        totais.sort()
+        self.stdout.write(f"Inicialização (import + setup + URLs): {totais[len(totais) // 2] * 1000:.0f} ms "
+                          f"({len(modulos)} módulos importados)")
+
+        chave = 1 if options['ordenar'] == 'cumulativo' else 0
+        selecionados = [
+            (nome, tempos) for nome, tempos in modulos.items()
+            if not options['prefixo'] or nome.startswith(options['prefixo'])
+        ]
+        selecionados.sort(key=lambda item: item[1][chave], reverse=True)
+
+        cabecalho = f"{'próprio ms':>11}{'acumulado ms':>14}  módulo"
+        self.stdout.write(cabecalho)
+        self.stdout.write('-' * len(cabecalho))
+        for nome, (proprio, acumulado) in selecionados[:options['top']]:
+            self.stdout.write(f"{proprio / 1000:>11.1f}{acumulado / 1000:>14.1f}  {nome}")
+
+    @staticmethod
+    def _modulos(saida):
+        """Tempo próprio e acumulado (µs) de cada módulo, a partir da saída do -X importtime."""
+        modulos = {}
+        for linha in saida.splitlines():
+            encontrado = LINHA_IMPORTTIME.match(linha)
+            if encontrado:
+                proprio, acumulado, _, nome = encontrado.groups()
+                modulos[nome] = (int(proprio), int(acumulado))
+        return modulos
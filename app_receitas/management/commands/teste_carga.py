@@ -0,0 +1,226 @@
+# app_receitas/management/commands/teste_carga.py
+
+import asyncio
+import importlib.util
+import json
+import logging
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from app_receitas.carga import PESOS_CENARIOS, GeradorCarga, medir_capacidade
+from app_receitas.dados_sinteticos import gerar_dados
+from app_receitas.models import Receita
+from app_receitas.stubs import ServidorStub
+
+
+# Receitas sintéticas do banco descartável quando --popular não é informado
+RECEITAS_LOCAIS = 1000
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga com cenários reais (homepage, busca com vários ingredientes, "
+        "detalhe frio/quente, avaliação e favorito) em degraus de RPS, gerando um relatório "
+        "de capacidade: RPS máximo sustentável por worker, ponto de saturação e taxa de erros."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help="Servidor já em execução. Se omitido, um worker local é iniciado com stubs.")
+        parser.add_argument('--popular', type=int, default=0,
+                            help="Receitas sintéticas geradas antes do teste. No modo local, vão para um banco "
+                                 f"descartável (padrão {RECEITAS_LOCAIS}); com --url, para o banco configurado "
+                                 "(se ainda não existirem).")
+        parser.add_argument('--banco', help="Nome do banco em que --popular pode gravar com --url (obrigatório com DEBUG desligado).")
+        parser.add_argument('--usuarios', type=int, default=20, help="Usuários logados usados nos cenários de escrita.")
+        parser.add_argument('--rps-inicial', type=float, default=5)
+        parser.add_argument('--passo', type=float, default=5, help="Incremento de RPS entre degraus.")
+        parser.add_argument('--rps-max', type=float, default=200)
+        parser.add_argument('--duracao-degrau', type=float, default=20, help="Segundos em cada degrau.")
+        parser.add_argument('--slo-p95', type=float, default=500, help="p95 máximo aceito (ms).")
+        parser.add_argument('--max-erros', type=float, default=0.01, help="Taxa de erros máxima aceita (0-1).")
+        parser.add_argument('--threads', type=int, default=4, help="Threads do worker iniciado localmente.")
+        parser.add_argument('--latencia-api', type=float, default=50, help="Latência simulada da TheMealDB (ms).")
+        parser.add_argument('--latencia-traducao', type=float, default=20, help="Latência simulada do tradutor (ms).")
+        parser.add_argument('--rps-alvo', type=float, help="Tráfego esperado, para sugerir a quantidade de workers.")
+        parser.add_argument('--cenarios', help="Pesos no formato nome=peso,... (padrão: mistura de produção).")
+        parser.add_argument('--saida', help="Grava o relatório em JSON neste arquivo.")
+
+    def handle(self, *args, **options):
+        cenarios = self._cenarios(options['cenarios'])
+        # Uma linha de log por requisição do gerador distorceria a própria medição
+        logging.getLogger('httpx').setLevel(logging.WARNING)
+
+        degraus = []
+        rps = options['rps_inicial']
+        while rps <= options['rps_max']:
+            degraus.append(rps)
+            rps += options['passo']
+        if not degraus:
+            raise CommandError("Nenhum degrau de carga: verifique --rps-inicial e --rps-max.")
+
+        stubs, servidor, nome_banco_original = [], None, None
+        url = options['url']
+        try:
+            if url:
+                total_receitas = self._dados_do_servidor(options)
+            else:
+                # O worker local grava receitas hidratadas dos stubs, avaliações e favoritos:
+                # tudo vai para um banco de teste, criado aqui e destruído no final
+                nome_banco_original = self._criar_banco_descartavel()
+                total_receitas = options['popular'] or RECEITAS_LOCAIS
+                self.stdout.write(f"Gerando {total_receitas} receitas sintéticas no banco de teste...")
+                gerar_dados(receitas=total_receitas, usuarios=max(options['usuarios'], 1))
+                stubs = [ServidorStub(options['latencia_api'], 10).iniciar(),
+                         ServidorStub(options['latencia_traducao'], 5).iniciar()]
+                url, servidor = self._iniciar_worker(stubs[0], stubs[1], options['threads'])
+
+            gerador = GeradorCarga(url, total_receitas, usuarios=options['usuarios'])
+            relatorio = asyncio.run(medir_capacidade(
+                gerador, degraus, options['duracao_degrau'], cenarios,
+                slo_p95_ms=options['slo_p95'], max_erros=options['max_erros'],
+            ))
+        finally:
+            if servidor:
+                servidor.terminate()
+                servidor.wait(timeout=10)
+            for stub in stubs:
+                stub.parar()
+            if nome_banco_original is not None:
+                connection.creation.destroy_test_db(nome_banco_original, verbosity=0)
+
+        relatorio['cenarios'] = cenarios
+        self._imprimir(relatorio, options['rps_alvo'])
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as f:
+                json.dump(relatorio, f, indent=2)
+
+    def _dados_do_servidor(self, options):
+        """Com --url, os dados sintéticos ficam no banco configurado, que é o do servidor testado."""
+        if options['popular']:
+            self._verificar_banco(options['banco'])
+        if options['popular'] and not Receita.objects.filter(external_id__startswith='bench_').exists():
+            self.stdout.write(f"Gerando {options['popular']} receitas sintéticas...")
+            gerar_dados(receitas=options['popular'], usuarios=max(options['usuarios'], 1))
+        total_receitas = Receita.objects.filter(external_id__startswith='bench_').count()
+        if not total_receitas:
+            raise CommandError("Não há dados sintéticos no banco. Use --popular N.")
+        return total_receitas
+
+    def _criar_banco_descartavel(self):
+        """
+        Cria o banco de teste do Django e retorna o nome do original. No SQLite, o
+        banco de teste padrão fica em memória, invisível ao worker: usa um arquivo temporário.
+        """
+        if connection.vendor == 'sqlite':
+            arquivo = tempfile.NamedTemporaryFile(prefix='teste_carga_', suffix='.sqlite3', delete=False)
+            arquivo.close()
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = arquivo.name
+        return connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+    def _verificar_banco(self, banco):
+        """
+        --popular cria usuários com uma senha conhecida: fora do DEBUG, só grava se o
+        banco for nomeado explicitamente, para não popular a produção por engano.
+        """
+        nome = str(settings.DATABASES['default']['NAME'])
+        if settings.DEBUG or banco == nome:
+            return
+        raise CommandError(
+            f"--popular grava usuários sintéticos (senha conhecida) em '{nome}'. "
+            f"Use um banco separado e confirme com --banco {nome}, ou ative o DEBUG."
+        )
+
+    def _cenarios(self, texto):
+        if not texto:
+            return dict(PESOS_CENARIOS)
+        cenarios = {}
+        for item in texto.split(','):
+            nome, _, peso = item.partition('=')
+            nome = nome.strip()
+            if nome not in PESOS_CENARIOS:
+                raise CommandError(f"Cenário desconhecido: {nome}. Opções: {', '.join(PESOS_CENARIOS)}")
+            try:
+                cenarios[nome] = float(peso or 1)
+            except ValueError:
+                raise CommandError(f"Peso inválido para {nome}: {peso}")
+        return cenarios
+
+    def _iniciar_worker(self, stub_api, stub_traducao, threads):
+        """
+        Sobe um único worker apontando para os stubs (gunicorn se disponível), com o
+        banco de teste e cache em memória: nada do teste chega ao banco ou ao cache reais.
+        """
+        porta = _porta_livre()
+        env = dict(
+            os.environ,
+            THEMEALDB_BASE_URL=stub_api.url_themealdb,
+            TRADUCAO_URL=stub_traducao.url_traducao,
+            TRADUCAO_BACKENDS='http',
+            DJANGO_ALLOWED_HOSTS='127.0.0.1',
+            DB_NAME=str(connection.settings_dict['NAME']),
+            DB_REPLICAS='',
+            DJANGO_CACHE_BACKEND='locmem',
+            DJANGO_SESSION_BACKEND='db',
+        )
+        if importlib.util.find_spec('gunicorn'):
+            modulo, _, aplicacao = settings.WSGI_APPLICATION.rpartition('.')
+            comando = [sys.executable, '-m', 'gunicorn', f'{modulo}:{aplicacao}',
+                       '--workers', '1', '--threads', str(threads), '--bind', f'127.0.0.1:{porta}']
+        else:
+            self.stdout.write(self.style.WARNING(
+                "gunicorn não instalado; usando runserver (resultados menos representativos)."
+            ))
+            comando = [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{porta}']
+        servidor = subprocess.Popen(comando, env=env, cwd=settings.BASE_DIR,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        url = f"http://127.0.0.1:{porta}"
+        for _ in range(100):
+            try:
+                with socket.create_connection(('127.0.0.1', porta), timeout=0.5):
+                    return url, servidor
+            except OSError:
+                if servidor.poll() is not None:
+                    raise CommandError("O worker local terminou durante a inicialização.")
+                time.sleep(0.2)
+        servidor.terminate()
+        raise CommandError("O worker local não respondeu a tempo.")
+
+    def _imprimir(self, relatorio, rps_alvo):
+        cabecalho = f"{'RPS alvo':>9}{'obtido':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'erros':>8}  situação"
+        self.stdout.write(cabecalho)
+        self.stdout.write('-' * len(cabecalho))
+        for d in relatorio['degraus']:
+            situacao = 'SATURADO: ' + '; '.join(d['motivos']) if d['saturado'] else 'ok'
+            self.stdout.write(
+                f"{d['rps_alvo']:>9}{d['rps_obtido']:>9}{d['p50_ms']:>9}{d['p95_ms']:>9}{d['p99_ms']:>9}"
+                f"{d['taxa_erros']:>8.1%}  {situacao}"
+            )
+
+        maximo = relatorio['rps_max_sustentavel']
+        if maximo is None:
+            self.stdout.write(self.style.ERROR("O worker saturou já no primeiro degrau."))
+            return
+        self.stdout.write(self.style.SUCCESS(f"RPS máximo sustentável por worker: {maximo}"))
+        if relatorio['rps_saturacao']:
+            self.stdout.write(f"Ponto de saturação: {relatorio['rps_saturacao']} RPS")
+        else:
+            self.stdout.write("Nenhuma saturação até o último degrau; aumente --rps-max.")
+        if rps_alvo:
+            self.stdout.write(f"Workers sugeridos para {rps_alvo} RPS (com 30% de folga): "
+                              f"{math.ceil(rps_alvo * 1.3 / maximo)}")
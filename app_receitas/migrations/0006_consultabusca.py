@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_receitas', '0005_receita_imagem_alter_receita_imagem_url'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsultaBusca',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=20)),
+                ('termo', models.CharField(max_length=255)),
+                ('total_consultas', models.PositiveIntegerField(default=0)),
+                ('acertos_cache', models.PositiveIntegerField(default=0)),
+                ('total_resultados', models.PositiveBigIntegerField(default=0)),
+                ('latencia_total_ms', models.FloatField(default=0)),
+                ('latencia_max_ms', models.FloatField(default=0)),
+                ('ultima_consulta', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-total_consultas'], name='app_receita_total_c_9e2b50_idx')],
+                'unique_together': {('tipo', 'termo')},
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# Índices GIN só existem no PostgreSQL; nos outros bancos a migração não faz nada.
+# - jsonb_path_ops acelera buscas por conteúdo exato (lookup __contains);
+# - pg_trgm sobre UPPER(coluna::text) atende o __icontains usado na busca.
+CAMPOS = ('ingredientes', 'categoria', 'area')
+
+
+def criar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for campo in CAMPOS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS receita_{campo}_gin '
+            f'ON app_receitas_receita USING gin ({campo} jsonb_path_ops)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS receita_{campo}_trgm '
+            f'ON app_receitas_receita USING gin ((UPPER({campo}::text)) gin_trgm_ops)'
+        )
+
+
+def remover_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for campo in CAMPOS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS receita_{campo}_gin')
+        schema_editor.execute(f'DROP INDEX IF EXISTS receita_{campo}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_receitas', '0006_consultabusca'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
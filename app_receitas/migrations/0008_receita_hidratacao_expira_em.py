@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_receitas', '0007_indices_gin_postgresql'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='receita',
+            name='hidratacao_expira_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
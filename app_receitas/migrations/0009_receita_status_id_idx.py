@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_receitas', '0008_receita_hidratacao_expira_em'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='receita',
+            index=models.Index(fields=['status', 'id'], name='app_receita_status_2bcd44_idx'),
+        ),
+    ]
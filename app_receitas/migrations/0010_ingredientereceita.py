@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_receitas', '0009_receita_status_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngredienteReceita',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ordem', models.PositiveSmallIntegerField(default=0)),
+                ('texto', models.CharField(max_length=255)),
+                ('nome', models.CharField(max_length=100)),
+                ('nome_canonico', models.CharField(max_length=100)),
+                ('quantidade', models.FloatField(blank=True, null=True)),
+                ('unidade', models.CharField(blank=True, max_length=20)),
+                ('observacao', models.CharField(blank=True, max_length=50)),
+                ('receita', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='itens_ingredientes', to='app_receitas.receita')),
+            ],
+            options={
+                'ordering': ['receita', 'ordem'],
+                'indexes': [models.Index(fields=['nome_canonico', 'receita'], name='app_receita_nome_ca_3f24e6_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_receitas', '0010_ingredientereceita'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceitaSimilar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posicao', models.PositiveSmallIntegerField()),
+                ('pontuacao', models.FloatField()),
+                ('receita', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similares', to='app_receitas.receita')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app_receitas.receita')),
+            ],
+            options={
+                'ordering': ['receita', 'posicao'],
+                'indexes': [models.Index(fields=['receita', 'posicao'], name='app_receita_receita_e37232_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_receitas', '0011_receitasimilar'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='receitasimilar',
+            options={'ordering': ['receita', 'origem', 'posicao']},
+        ),
+        migrations.RemoveIndex(
+            model_name='receitasimilar',
+            name='app_receita_receita_e37232_idx',
+        ),
+        migrations.AddField(
+            model_name='receitasimilar',
+            name='origem',
+            field=models.CharField(choices=[('conteudo', 'Ingredientes, categoria e área'), ('colaborativa', 'Favoritos e avaliações dos usuários')], default='conteudo', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='receitasimilar',
+            index=models.Index(fields=['receita', 'origem', 'posicao'], name='app_receita_receita_29aa02_idx'),
+        ),
+    ]
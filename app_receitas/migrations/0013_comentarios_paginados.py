@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:08
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def preencher_total_comentarios(apps, schema_editor):
+    Receita = apps.get_model('app_receitas', 'Receita')
+    Comentario = apps.get_model('app_receitas', 'Comentario')
+    contagem = (
+        Comentario.objects.filter(receita=OuterRef('pk')).order_by()
+        .values('receita').annotate(total=Count('id')).values('total')
+    )
+    Receita.objects.filter(pk__in=Comentario.objects.values('receita_id')).update(total_comentarios=Subquery(contagem))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_receitas', '0012_receitasimilar_origem'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='receita',
+            name='total_comentarios',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='comentario',
+            index=models.Index(fields=['receita', '-data_comentario', '-id'], name='app_receita_receita_4e4b0c_idx'),
+        ),
+        migrations.RunPython(preencher_total_comentarios, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 21:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_receitas', '0013_comentarios_paginados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='receita',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='receita',
+            index=models.Index(fields=['status', 'atualizado_em'], name='app_receita_status_3a5144_idx'),
+        ),
+    ]
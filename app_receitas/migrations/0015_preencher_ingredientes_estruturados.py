@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:45
+
+from django.db import migrations
+
+TAMANHO_LOTE = 1000
+
+
+def preencher_ingredientes(apps, schema_editor):
+    """Estrutura os ingredientes das receitas gravadas antes da 0010, para o filtro por ingrediente achá-las."""
+    from app_receitas.ingredientes import itens_das_linhas
+
+    Receita = apps.get_model('app_receitas', 'Receita')
+    IngredienteReceita = apps.get_model('app_receitas', 'IngredienteReceita')
+    pendentes = Receita.objects.filter(itens_ingredientes__isnull=True).order_by('pk')
+
+    ultimo = 0
+    while True:
+        lote = list(pendentes.filter(pk__gt=ultimo).values_list('pk', 'ingredientes')[:TAMANHO_LOTE])
+        if not lote:
+            break
+        IngredienteReceita.objects.bulk_create([
+            IngredienteReceita(
+                receita_id=receita_id, ordem=item.ordem, texto=item.texto, nome=item.nome,
+                nome_canonico=item.nome_canonico, quantidade=item.quantidade,
+                unidade=item.unidade, observacao=item.observacao,
+            )
+            for receita_id, linhas in lote
+            for item in itens_das_linhas(linhas)
+        ])
+        ultimo = lote[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_receitas', '0014_receita_atualizado_em'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher_ingredientes, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,30 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.serializers.json import DjangoJSONEncoder
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.db.models import Avg
+from django.db.models import Avg, Count, F
+from django.utils import timezone
 from PIL import Image # Importação correta
 
+from .instrumentacao import medir
+
+
+def _nomes_arquivos_carregados(instancia, *campos):
+    """Guarda o nome dos arquivos como vieram do banco, para detectar trocas de imagem."""
+    instancia._arquivos_carregados = {campo: instancia.__dict__.get(campo) for campo in campos}
+
+
+def _arquivo_alterado(instancia, campo, update_fields):
+    """Indica se o arquivo mudou desde o carregamento (e faz parte do save atual)."""
+    if update_fields is not None and campo not in update_fields:
+        return False
+    arquivo = getattr(instancia, campo)
+    carregados = getattr(instancia, '_arquivos_carregados', {})
+    return bool(arquivo) and arquivo.name != carregados.get(campo)
+
+_NAO_CARREGADO = object()
+
 # Altere apenas o modelo Receita
 class Receita(models.Model):
     nome = models.CharField(max_length=255)
@@ -22,19 +41,39 @@ class Receita(models.Model):
     autor = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     status = models.CharField(max_length=20, default='aprovado', choices=[('aprovado', 'Aprovado'), ('pendente', 'Pendente')])
     imagem = models.ImageField(upload_to='receitas_pics', blank=True, null=True)
+    # Enquanto no futuro, indica que um worker está buscando esta receita na TheMealDB
+    hidratacao_expira_em = models.DateTimeField(blank=True, null=True)
+    # Mantido pelos sinais de Comentario, para a página não precisar contar os comentários
+    total_comentarios = models.PositiveIntegerField(default=0)
+    # Muda com tudo o que aparece na página da receita (campos, avaliações, comentários,
+    # favoritos e semelhantes); é a versão usada no ETag e no Last-Modified
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'id']), models.Index(fields=['status', 'atualizado_em'])]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        _nomes_arquivos_carregados(instancia, 'imagem')
+        # Para o sinal abaixo saber se a lista de ingredientes mudou (ausente se o campo foi adiado)
+        instancia._ingredientes_carregados = instancia.__dict__.get('ingredientes', _NAO_CARREGADO)
+        return instancia
 
     def save(self, *args, **kwargs):
         """
-        Salva o modelo e redimensiona a imagem se existir.
+        Salva o modelo e redimensiona a imagem se ela foi trocada.
         """
         super().save(*args, **kwargs)
-        if self.imagem:
-            img = Image.open(self.imagem.path)
-            tamanho_maximo = (600, 600)
+        if _arquivo_alterado(self, 'imagem', kwargs.get('update_fields')):
+            with medir('imagem'):
+                img = Image.open(self.imagem.path)
+                tamanho_maximo = (600, 600)
 
-            if img.height > tamanho_maximo[0] or img.width > tamanho_maximo[1]:
-                img.thumbnail(tamanho_maximo)
-                img.save(self.imagem.path)
+                if img.height > tamanho_maximo[0] or img.width > tamanho_maximo[1]:
+                    img.thumbnail(tamanho_maximo)
+                    img.save(self.imagem.path)
+            _nomes_arquivos_carregados(self, 'imagem')
 
     def __str__(self):
         return self.nome
@@ -42,7 +81,55 @@ class Receita(models.Model):
     def update_media_avaliacoes(self):
         avg = self.avaliacoes.aggregate(Avg('nota'))['nota__avg']
         self.media_avaliacoes = avg if avg is not None else 0.00
-        self.save()
+        self.save(update_fields=['media_avaliacoes', 'atualizado_em'])
+
+    def histograma_avaliacoes(self):
+        """Quantidade de avaliações por nota (5 a 1) com o percentual, em uma consulta agrupada."""
+        contagens = dict(self.avaliacoes.values_list('nota').annotate(total=Count('id')).order_by())
+        total = sum(contagens.values())
+        return [
+            {'nota': nota, 'total': contagens.get(nota, 0), 'percentual': round(100 * contagens.get(nota, 0) / total) if total else 0}
+            for nota in range(5, 0, -1)
+        ]
+
+class IngredienteReceita(models.Model):
+    """Ingrediente de uma receita separado em quantidade, unidade e nome canônico."""
+    receita = models.ForeignKey(Receita, on_delete=models.CASCADE, related_name='itens_ingredientes')
+    ordem = models.PositiveSmallIntegerField(default=0)
+    texto = models.CharField(max_length=255)  # Linha como é exibida, em português
+    nome = models.CharField(max_length=100)
+    nome_canonico = models.CharField(max_length=100)
+    quantidade = models.FloatField(blank=True, null=True)
+    unidade = models.CharField(max_length=20, blank=True)
+    observacao = models.CharField(max_length=50, blank=True)
+
+    class Meta:
+        ordering = ['receita', 'ordem']
+        indexes = [models.Index(fields=['nome_canonico', 'receita'])]
+
+    def __str__(self):
+        return self.texto
+
+class ReceitaSimilar(models.Model):
+    """Vizinhos mais próximos de cada receita, pré-calculados pelo comando calcular_similares."""
+    CONTEUDO = 'conteudo'
+    COLABORATIVA = 'colaborativa'
+
+    receita = models.ForeignKey(Receita, on_delete=models.CASCADE, related_name='similares')
+    similar = models.ForeignKey(Receita, on_delete=models.CASCADE, related_name='+')
+    origem = models.CharField(max_length=20, default=CONTEUDO, choices=[
+        (CONTEUDO, 'Ingredientes, categoria e área'),
+        (COLABORATIVA, 'Favoritos e avaliações dos usuários'),
+    ])
+    posicao = models.PositiveSmallIntegerField()
+    pontuacao = models.FloatField()
+
+    class Meta:
+        ordering = ['receita', 'origem', 'posicao']
+        indexes = [models.Index(fields=['receita', 'origem', 'posicao'])]
+
+    def __str__(self):
+        return f"{self.receita_id} ~ {self.similar_id} ({self.pontuacao:.2f})"
 
 class Avaliacao(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -62,6 +149,10 @@ class Comentario(models.Model):
     texto = models.TextField()
     data_comentario = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Paginação por cursor (data, id) dos comentários de uma receita, do mais novo ao mais antigo
+        indexes = [models.Index(fields=['receita', '-data_comentario', '-id'])]
+
     def __str__(self):
         return f"Comentário de {self.user.username} em {self.receita.nome}"
 
@@ -83,21 +174,34 @@ class Profile(models.Model):
     def __str__(self):
         return f'Perfil de {self.user.username}'
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        _nomes_arquivos_carregados(instancia, 'foto')
+        return instancia
+
+    def tem_alteracoes(self):
+        """O único dado editável do perfil é a foto."""
+        return _arquivo_alterado(self, 'foto', None)
+
     def save(self, *args, **kwargs):
-        """Salva a imagem do perfil e redimensiona se necessário."""
+        """Salva a imagem do perfil e redimensiona se ela foi trocada."""
+        foto_alterada = _arquivo_alterado(self, 'foto', kwargs.get('update_fields'))
         super().save(*args, **kwargs)
         
-        if self.foto and self.foto.name != 'profile_pics/default-avatar.png': # Verifica se não é a imagem padrão
+        if foto_alterada and self.foto.name != 'profile_pics/default-avatar.png': # Verifica se não é a imagem padrão
             try:
-                img = Image.open(self.foto.path)
-                tamanho_maximo = (300, 300) # Tamanho ideal para fotos de perfil
+                with medir('imagem'):
+                    img = Image.open(self.foto.path)
+                    tamanho_maximo = (300, 300) # Tamanho ideal para fotos de perfil
 
-                if img.height > tamanho_maximo[0] or img.width > tamanho_maximo[1]:
-                    img.thumbnail(tamanho_maximo)
-                    img.save(self.foto.path)
+                    if img.height > tamanho_maximo[0] or img.width > tamanho_maximo[1]:
+                        img.thumbnail(tamanho_maximo)
+                        img.save(self.foto.path)
             except (IOError, FileNotFoundError):
                 # Ignora erros se o arquivo não puder ser aberto ou não existir
                 pass
+            _nomes_arquivos_carregados(self, 'foto')
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -105,5 +209,66 @@ def create_user_profile(sender, instance, created, **kwargs):
         Profile.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    instance.profile.save()
\ No newline at end of file
+def save_user_profile(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Salva o perfil junto com o usuário apenas quando ele foi carregado e alterado.
+    Saves parciais (como o last_login a cada login) nunca tocam no perfil.
+    """
+    if created or update_fields is not None:
+        return
+    if User.profile.related.is_cached(instance) and instance.profile.tem_alteracoes():
+        instance.profile.save()
+
+class ConsultaBusca(models.Model):
+    """Estatísticas agregadas das buscas feitas na TheMealDB, por termo normalizado."""
+    tipo = models.CharField(max_length=20)
+    termo = models.CharField(max_length=255)
+    total_consultas = models.PositiveIntegerField(default=0)
+    acertos_cache = models.PositiveIntegerField(default=0)
+    total_resultados = models.PositiveBigIntegerField(default=0)
+    latencia_total_ms = models.FloatField(default=0)
+    latencia_max_ms = models.FloatField(default=0)
+    ultima_consulta = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('tipo', 'termo')
+        indexes = [models.Index(fields=['-total_consultas'])]
+
+    def __str__(self):
+        return f"{self.tipo}: {self.termo} ({self.total_consultas})"
+
+@receiver(post_save, sender=Receita)
+def estruturar_ingredientes_receita(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """
+    Refaz os ingredientes estruturados (filtro por ingrediente e escala de porções)
+    quando um save completo, como o do admin, muda a lista de ingredientes. Saves
+    parciais são ignorados: a hidratação grava os seus itens por conta própria.
+    """
+    if raw or update_fields is not None:
+        return
+    if created and not instance.ingredientes:
+        return
+    if not created and instance.ingredientes == getattr(instance, '_ingredientes_carregados', _NAO_CARREGADO):
+        return
+    from .ingredientes import itens_das_linhas, salvar_itens  # ingredientes importa este módulo
+    salvar_itens(instance, itens_das_linhas(instance.ingredientes))
+    instance._ingredientes_carregados = instance.ingredientes
+
+@receiver(post_save, sender=Comentario)
+def contar_comentario(sender, instance, created, **kwargs):
+    if created:
+        Receita.objects.filter(pk=instance.receita_id).update(
+            total_comentarios=F('total_comentarios') + 1, atualizado_em=timezone.now()
+        )
+
+@receiver(post_delete, sender=Comentario)
+def descontar_comentario(sender, instance, **kwargs):
+    Receita.objects.filter(pk=instance.receita_id, total_comentarios__gt=0).update(
+        total_comentarios=F('total_comentarios') - 1, atualizado_em=timezone.now()
+    )
+
+@receiver(post_save, sender=ReceitaFavorita)
+@receiver(post_delete, sender=ReceitaFavorita)
+def contar_favorito(sender, instance, **kwargs):
+    """O contador de favoritos aparece na página da receita, então ela muda de versão."""
+    Receita.objects.filter(pk=instance.receita_id).update(atualizado_em=timezone.now())
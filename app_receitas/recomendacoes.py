@@ -0,0 +1,360 @@
+# app_receitas/recomendacoes.py
+
+"""
+Receitas semelhantes pré-calculadas, de duas origens: por conteúdo (vetor
+TF-IDF de ingredientes, categoria e área) e colaborativa (usuários que
+favoritaram ou avaliaram bem as mesmas receitas). Os K vizinhos mais próximos
+por cosseno são calculados em lote e gravados em ReceitaSimilar, de modo que as
+páginas só fazem consultas indexadas.
+"""
+
+import math
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from . import dicionario_culinario
+from .models import Avaliacao, IngredienteReceita, Receita, ReceitaFavorita, ReceitaSimilar
+
+# Peso de cada tipo de atributo no vetor da receita
+PESOS_ATRIBUTOS = {'ingrediente': 1.0, 'categoria': 1.5, 'area': 1.0}
+
+# Notas abaixo desta não contam como interesse do usuário na receita
+NOTA_MINIMA_COLABORATIVA = 4
+
+# Acima destas colunas (ex.: uma por usuário) os blocos densos ficariam grandes
+# demais e o produto é feito de forma esparsa
+LIMITE_COLUNAS_DENSAS = 4096
+MAX_VALORES_BLOCO = 8_000_000
+
+
+class MatrizEsparsa:
+    """Matriz em formato CSR (indptr/indices/dados), só com o que o cálculo dos vizinhos precisa."""
+
+    def __init__(self, indptr, indices, dados, n_colunas):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.dados = np.asarray(dados, dtype=np.float32)
+        self.n_colunas = n_colunas
+
+    @classmethod
+    def de_linhas(cls, linhas, n_colunas):
+        """Monta a matriz a partir de uma lista de dicionários {coluna: valor}."""
+        tamanhos = [len(linha) for linha in linhas]
+        indptr = np.zeros(len(linhas) + 1, dtype=np.int64)
+        np.cumsum(tamanhos, out=indptr[1:])
+        indices = np.fromiter((c for linha in linhas for c in linha), dtype=np.int64, count=int(indptr[-1]))
+        dados = np.fromiter((v for linha in linhas for v in linha.values()), dtype=np.float32, count=int(indptr[-1]))
+        return cls(indptr, indices, dados, n_colunas)
+
+    @property
+    def n_linhas(self):
+        return len(self.indptr) - 1
+
+    def normalizar_linhas(self):
+        """Divide cada linha pela sua norma L2, para que o produto escalar seja o cosseno."""
+        linha_de_cada_valor = np.repeat(np.arange(self.n_linhas), np.diff(self.indptr))
+        normas = np.sqrt(np.bincount(linha_de_cada_valor, weights=self.dados ** 2, minlength=self.n_linhas))
+        normas[normas == 0] = 1
+        self.dados = (self.dados / normas[linha_de_cada_valor]).astype(np.float32)
+        return self
+
+    def densa(self, inicio, fim):
+        """Bloco de linhas [inicio, fim) como matriz densa."""
+        bloco = np.zeros((fim - inicio, self.n_colunas), dtype=np.float32)
+        a, b = self.indptr[inicio], self.indptr[fim]
+        linhas = np.repeat(np.arange(fim - inicio), np.diff(self.indptr[inicio:fim + 1]))
+        bloco[linhas, self.indices[a:b]] = self.dados[a:b]
+        return bloco
+
+    def transpor(self):
+        """Transposta, também em CSR (as colunas viram linhas)."""
+        linhas = np.repeat(np.arange(self.n_linhas), np.diff(self.indptr))
+        ordem = np.argsort(self.indices, kind='stable')
+        indptr = np.zeros(self.n_colunas + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=self.n_colunas), out=indptr[1:])
+        return MatrizEsparsa(indptr, linhas[ordem], self.dados[ordem], self.n_linhas)
+
+    def produto_bloco(self, inicio, fim, transposta):
+        """
+        Linhas [inicio, fim) multiplicadas por outra matriz já transposta, sem
+        densificar os operandos: cada valor não nulo é expandido pela coluna
+        correspondente e os produtos são somados com bincount.
+        """
+        a, b = self.indptr[inicio], self.indptr[fim]
+        linhas = np.repeat(np.arange(fim - inicio), np.diff(self.indptr[inicio:fim + 1]))
+        colunas, valores = self.indices[a:b], self.dados[a:b]
+
+        comecos = transposta.indptr[colunas]
+        tamanhos = transposta.indptr[colunas + 1] - comecos
+        deslocamentos = np.arange(tamanhos.sum()) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+        posicoes = np.repeat(comecos, tamanhos) + deslocamentos
+
+        n = transposta.n_colunas
+        chaves = np.repeat(linhas, tamanhos) * n + transposta.indices[posicoes]
+        pesos = np.repeat(valores, tamanhos) * transposta.dados[posicoes]
+        return np.bincount(chaves, weights=pesos, minlength=(fim - inicio) * n).reshape(fim - inicio, n).astype(np.float32)
+
+    def selecionar(self, posicoes):
+        """Nova matriz só com as linhas informadas, na ordem dada."""
+        posicoes = np.asarray(posicoes, dtype=np.int64)
+        tamanhos = self.indptr[posicoes + 1] - self.indptr[posicoes]
+        indptr = np.zeros(len(posicoes) + 1, dtype=np.int64)
+        np.cumsum(tamanhos, out=indptr[1:])
+        origem = np.concatenate([np.arange(self.indptr[p], self.indptr[p + 1]) for p in posicoes]) \
+            if len(posicoes) else np.zeros(0, dtype=np.int64)
+        return MatrizEsparsa(indptr, self.indices[origem], self.dados[origem], self.n_colunas)
+
+
+def vizinhos_mais_proximos(consulta, base, k, ids_consulta, ids_base, bloco_consulta=512, bloco_base=20000):
+    """
+    Para cada linha de `consulta`, os k vizinhos de maior produto escalar em
+    `base` (ignorando o mesmo ID). Calcula por blocos densos, com memória
+    limitada a bloco_consulta x bloco_base valores de cada vez.
+    Retorna (posições em base, pontuações), ambos com forma (linhas, k);
+    posições -1 indicam que não havia vizinhos suficientes.
+    """
+    n = consulta.n_linhas
+    melhores_pos = np.full((n, k), -1, dtype=np.int64)
+    melhores_pts = np.full((n, k), -np.inf, dtype=np.float32)
+
+    esparso = base.n_colunas > LIMITE_COLUNAS_DENSAS
+    if esparso:
+        # Vetores muito largos: a base inteira de uma vez, com menos linhas de consulta por bloco
+        bloco_base = max(base.n_linhas, 1)
+        bloco_consulta = max(1, min(bloco_consulta, MAX_VALORES_BLOCO // bloco_base))
+        transposta = base.transpor()
+
+    for inicio_base in range(0, base.n_linhas, bloco_base):
+        fim_base = min(inicio_base + bloco_base, base.n_linhas)
+        if not esparso:
+            transposta = base.densa(inicio_base, fim_base).T
+        ids_bloco = ids_base[inicio_base:fim_base]
+
+        for inicio in range(0, n, bloco_consulta):
+            fim = min(inicio + bloco_consulta, n)
+            if esparso:
+                pontuacoes = consulta.produto_bloco(inicio, fim, transposta)
+            else:
+                pontuacoes = consulta.densa(inicio, fim) @ transposta
+            pontuacoes[ids_consulta[inicio:fim, np.newaxis] == ids_bloco[np.newaxis, :]] = -np.inf
+            pontuacoes[pontuacoes <= 0] = -np.inf
+
+            # Junta os candidatos do bloco com os melhores até agora e fica com os k maiores
+            candidatos_pts = np.concatenate([melhores_pts[inicio:fim], pontuacoes], axis=1)
+            candidatos_pos = np.concatenate([
+                melhores_pos[inicio:fim],
+                np.broadcast_to(np.arange(inicio_base, fim_base), pontuacoes.shape),
+            ], axis=1)
+            corte = min(k, candidatos_pts.shape[1] - 1)
+            escolhidos = np.argpartition(-candidatos_pts, corte, axis=1)[:, :k]
+            melhores_pts[inicio:fim] = np.take_along_axis(candidatos_pts, escolhidos, axis=1)
+            melhores_pos[inicio:fim] = np.take_along_axis(candidatos_pos, escolhidos, axis=1)
+
+    ordem = np.argsort(-melhores_pts, axis=1, kind='stable')
+    melhores_pts = np.take_along_axis(melhores_pts, ordem, axis=1)
+    melhores_pos = np.take_along_axis(melhores_pos, ordem, axis=1)
+    melhores_pos[~np.isfinite(melhores_pts)] = -1
+    return melhores_pos, melhores_pts
+
+
+def vetores_de_conteudo():
+    """
+    Vetores TF-IDF das receitas aprovadas que têm ingredientes, categoria ou área.
+    Retorna (ids das receitas em ordem, MatrizEsparsa normalizada).
+    """
+    atributos = {}
+    for receita_id, categorias, areas in Receita.objects.filter(status='aprovado').values_list(
+        'pk', 'categoria', 'area'
+    ).iterator(chunk_size=10000):
+        termos = atributos.setdefault(receita_id, set())
+        termos.update(('categoria', dicionario_culinario.chave(c)) for c in categorias or [] if isinstance(c, str))
+        termos.update(('area', dicionario_culinario.chave(a)) for a in areas or [] if isinstance(a, str))
+    for receita_id, nome in IngredienteReceita.objects.filter(receita__status='aprovado').values_list(
+        'receita_id', 'nome_canonico'
+    ).iterator(chunk_size=10000):
+        atributos[receita_id].add(('ingrediente', nome))
+
+    ids = np.array(sorted(r for r, termos in atributos.items() if termos), dtype=np.int64)
+    vocabulario, frequencias = {}, []
+    linhas_termos = []
+    for receita_id in ids:
+        colunas = []
+        for termo in atributos[int(receita_id)]:
+            coluna = vocabulario.get(termo)
+            if coluna is None:
+                coluna = vocabulario[termo] = len(vocabulario)
+                frequencias.append(0)
+            frequencias[coluna] += 1
+            colunas.append(coluna)
+        linhas_termos.append(colunas)
+
+    total = len(ids)
+    pesos = np.zeros(len(vocabulario), dtype=np.float32)
+    for (tipo, _), coluna in vocabulario.items():
+        # IDF suavizado: atributos raros aproximam mais as receitas que os comuns (sal, água)
+        pesos[coluna] = PESOS_ATRIBUTOS[tipo] * (math.log((1 + total) / (1 + frequencias[coluna])) + 1)
+
+    linhas = [{coluna: pesos[coluna] for coluna in colunas} for colunas in linhas_termos]
+    return ids, MatrizEsparsa.de_linhas(linhas, len(vocabulario)).normalizar_linhas()
+
+
+def vetores_colaborativos():
+    """
+    Matriz receita x usuário com os favoritos (peso 1) e as avaliações boas
+    (nota/5) das receitas aprovadas. Retorna (ids das receitas, MatrizEsparsa normalizada).
+    """
+    interesses = {}
+    for receita_id, user_id in ReceitaFavorita.objects.filter(receita__status='aprovado').values_list(
+        'receita_id', 'user_id'
+    ).iterator(chunk_size=10000):
+        interesses.setdefault(receita_id, {})[user_id] = 1.0
+    for receita_id, user_id, nota in Avaliacao.objects.filter(
+        receita__status='aprovado', nota__gte=NOTA_MINIMA_COLABORATIVA
+    ).values_list('receita_id', 'user_id', 'nota').iterator(chunk_size=10000):
+        usuarios = interesses.setdefault(receita_id, {})
+        usuarios[user_id] = max(usuarios.get(user_id, 0.0), nota / 5)
+
+    ids = np.array(sorted(interesses), dtype=np.int64)
+    colunas = {}
+    linhas = []
+    for receita_id in ids:
+        linhas.append({
+            colunas.setdefault(user_id, len(colunas)): peso
+            for user_id, peso in interesses[int(receita_id)].items()
+        })
+    return ids, MatrizEsparsa.de_linhas(linhas, len(colunas)).normalizar_linhas()
+
+
+def gravar_similares(ids_consulta, ids_base, posicoes, pontuacoes, origem=ReceitaSimilar.CONTEUDO, lote=1000):
+    """Substitui a lista de semelhantes (de uma origem) de cada receita consultada, em transações por lote."""
+    total = 0
+    for inicio in range(0, len(ids_consulta), lote):
+        receitas = [int(r) for r in ids_consulta[inicio:inicio + lote]]
+        novos = []
+        for linha, receita_id in enumerate(receitas, start=inicio):
+            for posicao, (indice, pontuacao) in enumerate(zip(posicoes[linha], pontuacoes[linha])):
+                if indice < 0:
+                    break
+                novos.append(ReceitaSimilar(
+                    receita_id=receita_id, similar_id=int(ids_base[indice]),
+                    origem=origem, posicao=posicao, pontuacao=float(pontuacao),
+                ))
+        with transaction.atomic():
+            ReceitaSimilar.objects.filter(receita_id__in=receitas, origem=origem).delete()
+            ReceitaSimilar.objects.bulk_create(novos)
+            Receita.objects.filter(pk__in=receitas).update(atualizado_em=timezone.now())
+        total += len(novos)
+    return total
+
+
+def incorporar_novas(ids, matriz, posicoes_novas, k):
+    """
+    Atualização incremental: calcula os vizinhos das receitas novas e, para as
+    já existentes, só reescreve a lista quando alguma receita nova entra no top-K.
+    Retorna a quantidade de receitas cuja lista foi gravada.
+    """
+    novas = matriz.selecionar(posicoes_novas)
+    ids_novas = ids[posicoes_novas]
+    posicoes, pontuacoes = vizinhos_mais_proximos(novas, matriz, k, ids_novas, ids)
+    gravar_similares(ids_novas, ids, posicoes, pontuacoes)
+
+    # O cosseno é simétrico: basta comparar cada receita existente com as novas
+    existentes = np.setdiff1d(np.arange(len(ids)), posicoes_novas)
+    if not len(existentes):
+        return len(ids_novas)
+    matriz_existentes = matriz.selecionar(existentes)
+    ids_existentes = ids[existentes]
+    cand_pos, cand_pts = vizinhos_mais_proximos(matriz_existentes, novas, k, ids_existentes, ids_novas)
+
+    atuais = {}
+    for receita_id, similar_id, pontuacao in ReceitaSimilar.objects.filter(
+        origem=ReceitaSimilar.CONTEUDO,
+        receita_id__in=[int(r) for r in ids_existentes[(cand_pos >= 0).any(axis=1)]]
+    ).values_list('receita_id', 'similar_id', 'pontuacao'):
+        atuais.setdefault(receita_id, []).append((pontuacao, similar_id))
+
+    posicao_do_id = {int(receita_id): posicao for posicao, receita_id in enumerate(ids)}
+    alteradas, novas_listas = [], []
+    for linha, receita_id in enumerate(ids_existentes):
+        candidatos = [(float(p), int(ids_novas[i])) for i, p in zip(cand_pos[linha], cand_pts[linha]) if i >= 0]
+        if not candidatos:
+            continue
+        lista_atual = atuais.get(int(receita_id), [])
+        minimo = min(p for p, _ in lista_atual) if len(lista_atual) >= k else -math.inf
+        if not any(p > minimo for p, _ in candidatos):
+            continue
+        combinada = sorted(set(lista_atual) | set(candidatos), reverse=True)[:k]
+        alteradas.append(receita_id)
+        novas_listas.append(combinada)
+
+    if alteradas:
+        posicoes = np.full((len(alteradas), k), -1, dtype=np.int64)
+        pontuacoes = np.zeros((len(alteradas), k), dtype=np.float32)
+        for linha, combinada in enumerate(novas_listas):
+            for coluna, (pontuacao, similar_id) in enumerate(combinada):
+                posicoes[linha, coluna] = posicao_do_id[similar_id]
+                pontuacoes[linha, coluna] = pontuacao
+        gravar_similares(np.array(alteradas), ids, posicoes, pontuacoes)
+    return len(ids_novas) + len(alteradas)
+
+
+def calcular_similares(apenas_novas=False, k=None):
+    """
+    Recalcula as receitas semelhantes; com apenas_novas, só incorpora receitas
+    sem lista. Os pesos IDF mudam aos poucos conforme entram receitas, então a
+    versão completa ainda deve rodar de tempos em tempos.
+    """
+    k = k or settings.SIMILARES_POR_RECEITA
+    ids, matriz = vetores_de_conteudo()
+    if not len(ids):
+        return 0
+
+    if apenas_novas:
+        com_lista = set(
+            ReceitaSimilar.objects.filter(origem=ReceitaSimilar.CONTEUDO).values_list('receita_id', flat=True).distinct()
+        )
+        posicoes_novas = np.array([p for p, r in enumerate(ids) if int(r) not in com_lista], dtype=np.int64)
+        if not len(posicoes_novas):
+            return 0
+        return incorporar_novas(ids, matriz, posicoes_novas, k)
+
+    posicoes, pontuacoes = vizinhos_mais_proximos(matriz, matriz, k, ids, ids)
+    gravar_similares(ids, ids, posicoes, pontuacoes)
+    return len(ids)
+
+
+def calcular_colaborativas(k=None):
+    """Recalcula as recomendações "quem favoritou esta também gostou de"."""
+    k = k or settings.SIMILARES_POR_RECEITA
+    ids, matriz = vetores_colaborativos()
+    if not len(ids):
+        return 0
+    posicoes, pontuacoes = vizinhos_mais_proximos(matriz, matriz, k, ids, ids)
+    gravar_similares(ids, ids, posicoes, pontuacoes, origem=ReceitaSimilar.COLABORATIVA)
+    return len(ids)
+
+
+def recomendacoes_para_usuario(user, limite):
+    """
+    Feed personalizado: soma as pontuações das receitas semelhantes (das duas
+    origens) às que o usuário favoritou ou avaliou bem, sem repetir as que ele já conhece.
+    """
+    favoritas = ReceitaFavorita.objects.filter(user=user).values_list('receita_id', flat=True)
+    bem_avaliadas = Avaliacao.objects.filter(user=user, nota__gte=NOTA_MINIMA_COLABORATIVA).values_list(
+        'receita_id', flat=True
+    )
+    conhecidas = set(favoritas) | set(bem_avaliadas)
+    if not conhecidas:
+        return []
+
+    sugestoes = list(
+        ReceitaSimilar.objects.filter(receita_id__in=conhecidas, similar__status='aprovado')
+        .exclude(similar_id__in=conhecidas)
+        .values('similar_id').annotate(total=Sum('pontuacao')).order_by('-total')[:limite]
+    )
+    receitas = Receita.objects.in_bulk([s['similar_id'] for s in sugestoes])
+    return [receitas[s['similar_id']] for s in sugestoes if s['similar_id'] in receitas]
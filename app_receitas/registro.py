@@ -0,0 +1,138 @@
+# app_receitas/registro.py
+
+"""
+Logging fora do caminho da requisição: os registros entram em uma fila e são
+formatados e gravados por uma thread em segundo plano. Cada registro leva o
+ID da requisição em que foi emitido, e eventos de DEBUG podem ser amostrados.
+Não importa modelos: é carregado pelo LOGGING antes de os apps estarem prontos.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+_id_requisicao = contextvars.ContextVar('id_requisicao', default='-')
+
+# IDs recebidos de um proxy só são aceitos se forem curtos e sem caracteres estranhos
+ID_VALIDO = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# Atributos padrão de um LogRecord; o que sobrar veio de `extra=` e vai para o JSON
+ATRIBUTOS_PADRAO = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id'}
+
+
+def id_requisicao_atual():
+    return _id_requisicao.get()
+
+
+class IdRequisicaoMiddleware:
+    """Atribui um ID a cada requisição (ou reaproveita o X-Request-ID do proxy) e o devolve na resposta."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recebido = request.headers.get('X-Request-ID', '')
+        request.id = recebido if ID_VALIDO.match(recebido) else uuid.uuid4().hex
+        token = _id_requisicao.set(request.id)
+        try:
+            response = self.get_response(request)
+        finally:
+            _id_requisicao.reset(token)
+        response['X-Request-ID'] = request.id
+        return response
+
+
+class FiltroIdRequisicao(logging.Filter):
+    """Anota o registro com o ID da requisição; roda na thread que emitiu o log."""
+
+    def filter(self, record):
+        record.request_id = _id_requisicao.get()
+        return True
+
+
+class FiltroAmostragem(logging.Filter):
+    """Deixa passar só uma fração `taxa` dos registros até `nivel` (por padrão, DEBUG)."""
+
+    def __init__(self, taxa=1.0, nivel='DEBUG'):
+        super().__init__()
+        self.taxa = float(taxa)
+        self.nivel = logging.getLevelName(nivel) if isinstance(nivel, str) else nivel
+
+    def filter(self, record):
+        if record.levelno > self.nivel or self.taxa >= 1:
+            return True
+        return random.random() < self.taxa
+
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro, com os campos passados em `extra=`."""
+
+    def format(self, record):
+        dados = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensagem': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+        }
+        dados.update({chave: valor for chave, valor in vars(record).items() if chave not in ATRIBUTOS_PADRAO})
+        if record.exc_info:
+            dados['excecao'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            dados['excecao'] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class HandlerEmFila(QueueHandler):
+    """
+    Coloca os registros em uma fila sem bloquear quem loga; uma QueueListener
+    formata (texto ou JSON) e grava no stderr. A fila é limitada: se a escrita não
+    der conta, registros são descartados em vez de segurar as requisições.
+    """
+
+    def __init__(self, formato='texto', tamanho_fila=10000):
+        super().__init__(queue.Queue(tamanho_fila))
+        destino = logging.StreamHandler(sys.stderr)
+        destino.setFormatter(
+            FormatadorJSON() if formato == 'json'
+            else logging.Formatter('%(levelname)s:%(name)s:[%(request_id)s] %(message)s')
+        )
+        self.listener = QueueListener(self.queue, destino, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self._parar_listener)
+        # Em servidores que fazem fork depois de configurar o logging, a thread não sobrevive no filho
+        os.register_at_fork(after_in_child=self._reiniciar_listener)
+
+    def _parar_listener(self):
+        # Esvazia a fila antes de o processo terminar; parar duas vezes não é erro
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def _reiniciar_listener(self):
+        self.listener._thread = None
+        self.listener.start()
+
+    def prepare(self, record):
+        # Só a interpolação da mensagem acontece aqui; formatação e I/O ficam com a listener
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
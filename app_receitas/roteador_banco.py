@@ -0,0 +1,72 @@
+# app_receitas/roteador_banco.py
+
+import contextvars
+import random
+
+from django.conf import settings
+
+# Ligado apenas durante as views de leitura (veja LeituraEmReplicaMiddleware)
+_usar_replica = contextvars.ContextVar('usar_replica', default=False)
+
+COOKIE_FIXAR_PRIMARIO = 'fixar_primario'
+
+
+def _replicas():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+class RoteadorReplicas:
+    """
+    Envia as leituras das views de leitura para uma réplica aleatória e todo o
+    resto (escritas, migrações e leituras fora dessas views) para o 'default'.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = _replicas()
+        if _usar_replica.get() and replicas:
+            return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas têm os mesmos dados do primário
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class LeituraEmReplicaMiddleware:
+    """
+    Liga a leitura em réplica para os GETs das views configuradas em
+    REPLICA_VIEWS. Depois de qualquer POST o navegador recebe um cookie que fixa
+    suas leituras no primário por alguns segundos, para que o usuário sempre
+    veja a própria avaliação, comentário ou favorito (read-your-writes).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _usar_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _usar_replica.reset(token)
+
+        if request.method == 'POST':
+            response.set_cookie(
+                COOKIE_FIXAR_PRIMARIO, '1',
+                max_age=settings.REPLICA_FIXACAO_SEGUNDOS, httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in ('GET', 'HEAD')
+            and request.resolver_match.view_name in settings.REPLICA_VIEWS
+            and COOKIE_FIXAR_PRIMARIO not in request.COOKIES
+        ):
+            _usar_replica.set(True)
@@ -0,0 +1,155 @@
+# app_receitas/stubs.py
+
+"""
+Servidores HTTP locais que imitam a TheMealDB e o tradutor, usados pelos
+comandos de benchmark e de teste de carga no lugar dos serviços reais.
+"""
+
+import html
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CATEGORIAS = ['Beef', 'Chicken', 'Dessert', 'Lamb', 'Pasta', 'Pork', 'Seafood', 'Side', 'Starter', 'Vegan', 'Vegetarian']
+AREAS = ['American', 'British', 'Canadian', 'Chinese', 'French', 'Indian', 'Italian', 'Japanese', 'Mexican', 'Spanish']
+INGREDIENTES = [
+    'Chicken', 'Onion', 'Garlic', 'Tomato', 'Rice', 'Potatoes', 'Carrots', 'Butter', 'Flour', 'Eggs',
+    'Milk', 'Sugar', 'Salt', 'Pepper', 'Olive Oil', 'Beef', 'Pork', 'Lemon', 'Parsley', 'Cheese',
+    'Basil', 'Ginger', 'Soy Sauce', 'Cumin', 'Paprika', 'Cream', 'Mushrooms', 'Spinach', 'Honey', 'Pasta',
+]
+MEDIDAS = ['1 cup', '2 tbs', '1 tsp', '200g', '1/2 cup', '3 cloves', 'pinch', '1 kg', '2', '']
+
+# Bem acima dos IDs reais da TheMealDB (na casa dos 50 mil): uma refeição de stub
+# gravada por engano nunca ocupa o lugar de uma receita real
+ID_INICIAL = 9_000_000
+TOTAL_REFEICOES = 5000
+
+
+def _aleatorio(*partes):
+    """Gerador determinístico para que o mesmo ID/termo sempre produza o mesmo conteúdo."""
+    return random.Random(zlib.crc32('|'.join(str(p) for p in partes).encode('utf-8')))
+
+
+def refeicao_completa(meal_id):
+    """Monta uma refeição no formato do lookup.php da TheMealDB."""
+    rnd = _aleatorio('refeicao', meal_id)
+    refeicao = {
+        'idMeal': str(meal_id),
+        'strMeal': f"Stub Meal {meal_id}",
+        'strCategory': rnd.choice(CATEGORIAS),
+        'strArea': rnd.choice(AREAS),
+        'strInstructions': ' '.join(f"Step {i}: mix and cook for {rnd.randint(2, 30)} minutes." for i in range(1, 8)),
+        'strMealThumb': f"https://www.themealdb.com/images/media/meals/stub{meal_id}.jpg",
+        'strYoutube': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+    }
+    for i, ingrediente in enumerate(rnd.sample(INGREDIENTES, rnd.randint(6, 14)), start=1):
+        refeicao[f'strIngredient{i}'] = ingrediente
+        refeicao[f'strMeasure{i}'] = rnd.choice(MEDIDAS)
+    return refeicao
+
+
+def _resumo(meal_id):
+    return {
+        'idMeal': str(meal_id),
+        'strMeal': f"Stub Meal {meal_id}",
+        'strMealThumb': f"https://www.themealdb.com/images/media/meals/stub{meal_id}.jpg",
+    }
+
+
+def _filtrar(tipo, termo):
+    """Lista de refeições resumidas para um filtro; alguns termos não têm resultado."""
+    rnd = _aleatorio('filtro', tipo, termo.lower())
+    if rnd.random() < 0.1:
+        return None
+    quantidade = rnd.randint(5, 60)
+    return [_resumo(ID_INICIAL + rnd.randrange(TOTAL_REFEICOES)) for _ in range(quantidade)]
+
+
+class _ManipuladorStub(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        servidor = self.server
+        servidor.aguardar_latencia()
+
+        url = urlparse(self.path)
+        params = {chave: valores[0] for chave, valores in parse_qs(url.query).items()}
+        rota = url.path.rsplit('/', 1)[-1]
+
+        if rota == 'traduzir':
+            corpo = f'<html><body><div class="result-container">{html.escape(params.get("q", ""))}</div></body></html>'
+            self._responder(corpo.encode('utf-8'), 'text/html; charset=utf-8')
+            return
+
+        if rota == 'lookup.php':
+            try:
+                meals = [refeicao_completa(int(params.get('i', '')))]
+            except ValueError:
+                meals = None
+        elif rota == 'search.php':
+            termo = params.get('s', '')
+            meals = [refeicao_completa(m['idMeal']) for m in (_filtrar('s', termo) or [])[:25]] or None
+        elif rota == 'filter.php' and params:
+            tipo, termo = next(iter(params.items()))
+            meals = _filtrar(tipo, termo)
+        else:
+            self.send_error(404)
+            return
+
+        self._responder(json.dumps({'meals': meals}).encode('utf-8'), 'application/json')
+
+    def _responder(self, corpo, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+class ServidorStub(ThreadingHTTPServer):
+    """
+    Servidor local que responde como a TheMealDB (/api/json/v1/1/...) e como o
+    tradutor (/traduzir), com latência configurável para simular a rede.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latencia_ms=0, variacao_ms=0, porta=0):
+        super().__init__(('127.0.0.1', porta), _ManipuladorStub)
+        self.latencia_ms = latencia_ms
+        self.variacao_ms = variacao_ms
+        self._thread = None
+
+    def aguardar_latencia(self):
+        atraso = self.latencia_ms + random.uniform(0, self.variacao_ms)
+        if atraso > 0:
+            time.sleep(atraso / 1000)
+
+    @property
+    def url_base(self):
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    @property
+    def url_themealdb(self):
+        return f"{self.url_base}/api/json/v1/1/"
+
+    @property
+    def url_traducao(self):
+        return f"{self.url_base}/traduzir"
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self.shutdown()
+        self.server_close()
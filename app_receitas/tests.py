@@ -0,0 +1,479 @@
+from datetime import timedelta
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import admissao, dicionario_culinario, recomendacoes, traducao, views
+from .filtros import QUALQUER, TODOS, combinar_filtros
+from .ingredientes import escalar, itens_da_refeicao, salvar_itens
+from .autocompletar import INGREDIENTE, RECEITA, indice_autocompletar
+from .despensa import indice_despensa
+from .models import Receita, ReceitaSimilar
+from .recomendacoes import MatrizEsparsa, gravar_similares, incorporar_novas, vizinhos_mais_proximos
+
+
+class CombinarFiltrosTests(SimpleTestCase):
+    RESULTADOS = {
+        ('ingredientes', 'frango'): {'1': 'a', '2': 'b', '3': 'c'},
+        ('ingredientes', 'arroz'): {'2': 'b', '3': 'c'},
+        ('area', 'Japanese'): {'3': 'c', '4': 'd'},
+        ('categoria', 'Dessert'): {'9': 'z'},
+    }
+
+    def setUp(self):
+        self.buscados = []
+
+    def buscar(self, filtro):
+        self.buscados.append(filtro)
+        return dict(self.RESULTADOS[filtro])
+
+    def test_intersecao_de_todos_os_filtros(self):
+        filtros = [('ingredientes', 'frango'), ('ingredientes', 'arroz'), ('area', 'Japanese')]
+        self.assertEqual(combinar_filtros(filtros, self.buscar, TODOS), ['c'])
+
+    def test_filtros_em_cache_sao_lidos_primeiro(self):
+        filtros = [('ingredientes', 'frango'), ('ingredientes', 'arroz'), ('area', 'Japanese')]
+        em_cache = {('area', 'Japanese')}
+        resultado = combinar_filtros(filtros, self.buscar, TODOS, em_cache=lambda filtro: filtro in em_cache)
+        self.assertEqual(resultado, ['c'])
+        self.assertEqual(self.buscados[0], ('area', 'Japanese'))
+
+    def test_intersecao_vazia_no_cache_nao_busca_os_demais(self):
+        filtros = [('ingredientes', 'frango'), ('categoria', 'Dessert'), ('area', 'Japanese')]
+        em_cache = {('categoria', 'Dessert'), ('area', 'Japanese')}
+        resultado = combinar_filtros(filtros, self.buscar, TODOS, em_cache=lambda filtro: filtro in em_cache)
+        self.assertEqual(resultado, [])
+        self.assertNotIn(('ingredientes', 'frango'), self.buscados)
+
+    def test_intersecao_vazia_para_antes_dos_filtros_restantes(self):
+        filtros = [('categoria', 'Dessert'), ('area', 'Japanese'), ('ingredientes', 'frango')]
+        self.assertEqual(combinar_filtros(filtros, self.buscar, TODOS), [])
+        self.assertEqual(self.buscados, [('categoria', 'Dessert'), ('area', 'Japanese')])
+
+    def test_uniao_no_modo_qualquer(self):
+        filtros = [('ingredientes', 'arroz'), ('area', 'Japanese')]
+        self.assertEqual(sorted(combinar_filtros(filtros, self.buscar, QUALQUER)), ['b', 'c', 'd'])
+
+    def test_sem_filtros(self):
+        self.assertEqual(combinar_filtros([], self.buscar, TODOS), [])
+        self.assertEqual(combinar_filtros([], self.buscar, QUALQUER), [])
+
+
+class MedidasTests(SimpleTestCase):
+    def test_analisar_medida(self):
+        self.assertEqual(dicionario_culinario.analisar_medida('2 cups'), ('2', 2.0, 'xicara', ''))
+        self.assertEqual(dicionario_culinario.analisar_medida('1 1/2 tbs'), ('1 1/2', 1.5, 'colher_sopa', ''))
+        self.assertEqual(dicionario_culinario.analisar_medida('½ cup'), ('½', 0.5, 'xicara', ''))
+        self.assertEqual(dicionario_culinario.analisar_medida('200g'), ('200', 200.0, 'g', ''))
+
+    def test_medida_com_palavras_desconhecidas(self):
+        self.assertIsNone(dicionario_culinario.analisar_medida('2 large'))
+
+    def test_analisar_linha_em_portugues(self):
+        self.assertEqual(
+            dicionario_culinario.analisar_linha_pt('1/2 colher de chá de sal'), ('1/2', 0.5, 'colher_cha', '', 'sal')
+        )
+        self.assertEqual(dicionario_culinario.analisar_linha_pt('sal a gosto'), ('', None, '', 'a gosto', 'sal'))
+
+    def test_formatar_quantidade(self):
+        self.assertEqual(dicionario_culinario.formatar_quantidade(1.5), '1 1/2')
+        self.assertEqual(dicionario_culinario.formatar_quantidade(2.0), '2')
+
+    def test_itens_da_refeicao(self):
+        traduzidos = []
+
+        def traduzir(texto):
+            traduzidos.append(texto)
+            return texto
+
+        itens = itens_da_refeicao({
+            'strIngredient1': 'Flour', 'strMeasure1': '2 cups',
+            'strIngredient2': 'Eggs', 'strMeasure2': '2 large',
+        }, traduzir)
+        self.assertEqual([(i.quantidade, i.unidade) for i in itens], [(2.0, 'xicara'), (None, '')])
+        self.assertEqual(itens[0].texto, '2 xícaras de farinha de trigo')
+        # Só a linha com medida desconhecida vai para o tradutor
+        self.assertEqual(traduzidos, ['2 large Eggs'])
+
+
+class EscalarTests(TestCase):
+    def setUp(self):
+        self.receita = Receita.objects.create(nome='Bolo', external_id='teste_1')
+        itens = itens_da_refeicao({
+            'strIngredient1': 'Flour', 'strMeasure1': '2 cups',
+            'strIngredient2': 'Butter', 'strMeasure2': '200g',
+            'strIngredient3': 'Eggs', 'strMeasure3': '2 large',
+        }, lambda texto: texto)
+        salvar_itens(self.receita, itens)
+
+    def test_sem_alteracao_devolve_o_texto_gravado(self):
+        linhas = escalar([self.receita.pk])[self.receita.pk]
+        self.assertEqual(linhas[:2], ['2 xícaras de farinha de trigo', '200 g de manteiga'])
+
+    def test_multiplica_as_quantidades(self):
+        linhas = escalar([self.receita.pk], fator=1.5)[self.receita.pk]
+        self.assertEqual(linhas[:2], ['3 xícaras de farinha de trigo', '300 g de manteiga'])
+        # Sem quantidade conhecida, a linha fica como está
+        self.assertEqual(linhas[2], '2 large Eggs')
+
+    def test_converte_para_o_sistema_metrico(self):
+        linhas = escalar([self.receita.pk], fator=5, metrico=True)[self.receita.pk]
+        self.assertEqual(linhas[:2], ['2,4 litros de farinha de trigo', '1 kg de manteiga'])
+
+
+class EstruturarIngredientesTests(TestCase):
+    def nomes(self, receita):
+        return list(receita.itens_ingredientes.values_list('nome_canonico', flat=True))
+
+    def test_save_completo_refaz_os_itens(self):
+        receita = Receita.objects.create(nome='Bolo', external_id='teste_1', ingredientes=['2 xícaras de farinha de trigo'])
+        self.assertEqual(self.nomes(receita), ['flour'])
+        receita = Receita.objects.get(pk=receita.pk)
+        receita.ingredientes = ['1 kg de manteiga', 'sal a gosto']
+        receita.save()
+        self.assertEqual(self.nomes(receita), ['butter', 'salt'])
+
+    def test_save_parcial_nao_mexe_nos_itens(self):
+        receita = Receita.objects.create(nome='Bolo', external_id='teste_1', ingredientes=['1 kg de manteiga'])
+        receita.ingredientes = ['sal a gosto']
+        receita.save(update_fields=['ingredientes'])
+        self.assertEqual(self.nomes(receita), ['butter'])
+
+@override_settings(TRADUCAO_BACKENDS=['dicionario'])
+class CadeiaTraducaoTests(SimpleTestCase):
+    def test_cadeia_configurada(self):
+        self.assertEqual([backend.nome for backend in traducao.cadeia()], ['dicionario'])
+
+    def test_traduz_pelo_dicionario(self):
+        self.assertEqual(traducao.traduzir('frango', 'en'), 'Chicken')
+
+    def test_sem_traducao_mantem_o_original(self):
+        self.assertIsNone(traducao.tentar_traduzir('xyzzy plugh', 'en'))
+        self.assertEqual(traducao.traduzir('xyzzy plugh', 'en'), 'xyzzy plugh')
+
+
+class VersaoIndexTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'senha')
+        self.aprovada = Receita.objects.create(nome='Bolo', external_id='teste_1')
+        self.pendente = Receita.objects.create(nome='Torta', external_id='teste_2', status='pendente')
+
+    def etag_index(self):
+        self.client.logout()
+        return self.client.get(reverse('app_receitas:index'))['ETag']
+
+    def test_etag_muda_ao_aprovar(self):
+        antes = self.etag_index()
+        self.client.force_login(self.admin)
+        self.client.get(reverse('app_receitas:aprovar_receita', args=[self.pendente.pk]))
+        self.assertNotEqual(self.etag_index(), antes)
+
+    def test_etag_muda_ao_remover(self):
+        # A receita mais recente continua lá: o Max(atualizado_em) não muda
+        Receita.objects.create(nome='Pudim', external_id='teste_3')
+        antes = self.etag_index()
+        self.aprovada.delete()
+        self.assertNotEqual(self.etag_index(), antes)
+
+
+@override_settings(METRICAS_TOKEN='segredo')
+class MetricasTests(TestCase):
+    def test_token_correto(self):
+        response = self.client.get(reverse('app_receitas:metricas'), HTTP_AUTHORIZATION='Bearer segredo')
+        self.assertEqual(response.status_code, 200)
+
+    def test_token_errado_ou_ausente(self):
+        self.assertEqual(self.client.get(reverse('app_receitas:metricas'), HTTP_AUTHORIZATION='Bearer segred').status_code, 403)
+        self.assertEqual(self.client.get(reverse('app_receitas:metricas')).status_code, 403)
+
+
+class LeaseHidratacaoTests(TestCase):
+    def setUp(self):
+        self.receita = Receita.objects.create(external_id='tmdb_9000001')
+
+    def prazo_gravado(self):
+        return Receita.objects.values_list('hidratacao_expira_em', flat=True).get(pk=self.receita.pk)
+
+    def test_reserva_vigente_nao_pode_ser_tomada(self):
+        self.assertIsNotNone(views._obter_lease_hidratacao(self.receita))
+        self.assertIsNone(views._obter_lease_hidratacao(self.receita))
+
+    def test_reserva_expirada_e_tomada_por_outro_worker(self):
+        expirado = timezone.now() - timedelta(seconds=1)
+        Receita.objects.filter(pk=self.receita.pk).update(hidratacao_expira_em=expirado)
+        prazo = views._obter_lease_hidratacao(self.receita)
+        self.assertIsNotNone(prazo)
+        self.assertEqual(self.prazo_gravado(), prazo)
+
+    def test_libera_a_propria_reserva_ao_terminar(self):
+        with mock.patch.object(views, '_hidratar_receita_tmdb', return_value=True):
+            self.assertIs(views._hidratar_com_lease(self.receita), True)
+        self.assertIsNone(self.prazo_gravado())
+
+    def test_nao_libera_a_reserva_tomada_por_outro_worker(self):
+        prazo_do_outro = timezone.now() + timedelta(minutes=5)
+
+        def hidratacao_lenta(receita):
+            # A reserva expira no meio da hidratação e outro worker a toma
+            Receita.objects.filter(pk=receita.pk).update(hidratacao_expira_em=prazo_do_outro)
+            return True
+
+        with mock.patch.object(views, '_hidratar_receita_tmdb', side_effect=hidratacao_lenta):
+            views._hidratar_com_lease(self.receita)
+        self.assertEqual(self.prazo_gravado(), prazo_do_outro)
+
+    @override_settings(HIDRATACAO_ESPERA_SEGUNDOS=0)
+    def test_sem_reserva_nao_hidrata(self):
+        views._obter_lease_hidratacao(self.receita)
+        with mock.patch.object(views, '_hidratar_receita_tmdb') as hidratar:
+            self.assertEqual(views._hidratar_com_lease(self.receita), views.HIDRATACAO_EM_ANDAMENTO)
+        hidratar.assert_not_called()
+
+
+class IndiceDespensaTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'senha')
+        self.bolo = Receita.objects.create(
+            nome='Bolo', external_id='teste_1', ingredientes=['2 xícaras de farinha de trigo', '3 ovos', '1 xícara de leite'],
+        )
+        self.omelete = Receita.objects.create(nome='Omelete', external_id='teste_2', ingredientes=['3 ovos', 'sal a gosto'])
+        self.pendente = Receita.objects.create(
+            nome='Panqueca', external_id='teste_3', status='pendente', ingredientes=['3 ovos', '1 xícara de leite'],
+        )
+        indice_despensa.construir()
+
+    def tearDown(self):
+        indice_despensa.invalidar()
+
+    def ids(self, despensa, **kwargs):
+        return [receita_id for receita_id, _, _ in indice_despensa.buscar(despensa, **kwargs)]
+
+    def test_ordena_pelo_que_falta(self):
+        resultado = indice_despensa.buscar(['ovos', 'sal', 'leite'])
+        self.assertEqual(resultado, [(self.omelete.pk, 2, 0), (self.bolo.pk, 2, 1)])
+
+    def test_limite_de_ingredientes_faltando(self):
+        self.assertEqual(self.ids(['ovos'], max_faltando=1), [self.omelete.pk])
+
+    def test_despensa_sem_ingredientes_conhecidos(self):
+        self.assertEqual(self.ids(['xyzzy']), [])
+
+    def test_receita_aprovada_entra_e_removida_sai(self):
+        self.assertNotIn(self.pendente.pk, self.ids(['ovos', 'leite']))
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('app_receitas:aprovar_receita', args=[self.pendente.pk]))
+        self.assertEqual(self.ids(['ovos', 'leite'])[0], self.pendente.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('app_receitas:rejeitar_receita', args=[self.pendente.pk]))
+        self.assertNotIn(self.pendente.pk, self.ids(['ovos', 'leite']))
+
+    def test_aprovacao_em_massa(self):
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('app_receitas:moderar_receitas_em_massa'), {'acao': 'aprovar', 'ids': [self.pendente.pk]})
+        self.assertIn(self.pendente.pk, self.ids(['ovos', 'leite']))
+
+
+def _matriz_aleatoria(linhas, colunas, densidade, semente=0):
+    """Matriz não negativa com algumas linhas sem vizinhos: uma zerada e uma com coluna exclusiva."""
+    rng = np.random.default_rng(semente)
+    densa = rng.random((linhas, colunas)) * (rng.random((linhas, colunas)) < densidade)
+    densa = np.hstack([densa, np.zeros((linhas, 1))])
+    densa[0] = 0
+    densa[1] = 0
+    densa[1, -1] = 1
+    matriz = MatrizEsparsa.de_linhas([{c: v for c, v in enumerate(linha) if v} for linha in densa], densa.shape[1])
+    return densa, matriz.normalizar_linhas()
+
+
+def _cossenos(densa, ids):
+    """Cossenos entre todas as linhas; o mesmo ID e os não positivos ficam em -inf, como em vizinhos_mais_proximos."""
+    normas = np.linalg.norm(densa, axis=1, keepdims=True)
+    normas[normas == 0] = 1
+    cossenos = (densa / normas) @ (densa / normas).T
+    cossenos[ids[:, np.newaxis] == ids[np.newaxis, :]] = -np.inf
+    cossenos[cossenos <= 0] = -np.inf
+    return cossenos
+
+
+class VizinhosMaisProximosTests(SimpleTestCase):
+    def assertIgualForcaBruta(self, densa, ids, k, obtido):
+        """Compara com a ordenação completa dos cossenos; empates podem trocar as posições, não as pontuações."""
+        posicoes, pontuacoes = obtido
+        cossenos = _cossenos(densa, ids)
+        esperadas = -np.sort(-cossenos, axis=1)[:, :k]
+        esperadas = np.pad(esperadas, ((0, 0), (0, k - esperadas.shape[1])), constant_values=-np.inf)
+        self.assertEqual(posicoes.shape, (len(ids), k))
+
+        finitas = np.isfinite(esperadas)
+        np.testing.assert_array_equal(posicoes >= 0, finitas)
+        np.testing.assert_allclose(pontuacoes[finitas], esperadas[finitas], rtol=1e-5)
+        linhas = np.nonzero(finitas)[0]
+        np.testing.assert_allclose(cossenos[linhas, posicoes[finitas]], esperadas[finitas], rtol=1e-5)
+        for linha in posicoes:
+            validas = linha[linha >= 0]
+            self.assertEqual(len(set(validas)), len(validas))
+
+    def test_blocos_densos_iguais_a_forca_bruta(self):
+        densa, matriz = _matriz_aleatoria(30, 12, 0.3)
+        ids = np.arange(100, 130)
+        # Blocos pequenos para exercitar a junção dos candidatos entre blocos
+        obtido = vizinhos_mais_proximos(matriz, matriz, 5, ids, ids, bloco_consulta=7, bloco_base=8)
+        self.assertIgualForcaBruta(densa, ids, 5, obtido)
+
+    def test_linhas_sem_vizinhos_ficam_com_menos_um(self):
+        _, matriz = _matriz_aleatoria(10, 6, 0.5)
+        ids = np.arange(10)
+        posicoes, _ = vizinhos_mais_proximos(matriz, matriz, 3, ids, ids)
+        self.assertTrue((posicoes[:2] == -1).all())
+        self.assertNotIn(-1, posicoes[2:, 0])
+
+    def test_k_maior_que_a_base(self):
+        densa, matriz = _matriz_aleatoria(6, 4, 0.8)
+        ids = np.arange(6)
+        obtido = vizinhos_mais_proximos(matriz, matriz, 10, ids, ids)
+        self.assertIgualForcaBruta(densa, ids, 10, obtido)
+
+
+    def test_caminho_esparso_igual_a_forca_bruta(self):
+        densa, matriz = _matriz_aleatoria(30, 12, 0.3, semente=2)
+        ids = np.arange(30)
+        # Força o produto esparso (vetores "largos") e blocos de consulta de 3 linhas
+        with mock.patch.object(recomendacoes, 'LIMITE_COLUNAS_DENSAS', 0), \
+                mock.patch.object(recomendacoes, 'MAX_VALORES_BLOCO', 100):
+            obtido = vizinhos_mais_proximos(matriz, matriz, 5, ids, ids)
+        self.assertIgualForcaBruta(densa, ids, 5, obtido)
+
+    def test_produto_esparso_igual_ao_denso(self):
+        _, matriz = _matriz_aleatoria(12, 8, 0.4, semente=3)
+        np.testing.assert_allclose(
+            matriz.produto_bloco(2, 9, matriz.transpor()), matriz.densa(2, 9) @ matriz.densa(0, 12).T, rtol=1e-5, atol=1e-7,
+        )
+
+
+class IncorporarNovasTests(TestCase):
+    K = 4
+
+    def test_resultado_igual_ao_recalculo_completo(self):
+        ids = np.array([Receita.objects.create(external_id=f'teste_{n}').pk for n in range(20)], dtype=np.int64)
+        _, matriz = _matriz_aleatoria(20, 10, 0.4, semente=1)
+        existentes, novas = np.arange(15), np.arange(15, 20)
+
+        # Listas das receitas antigas calculadas só entre elas, como antes de as novas chegarem
+        matriz_existentes = matriz.selecionar(existentes)
+        posicoes, pontuacoes = vizinhos_mais_proximos(matriz_existentes, matriz_existentes, self.K, ids[existentes], ids[existentes])
+        gravar_similares(ids[existentes], ids[existentes], posicoes, pontuacoes)
+
+        incorporar_novas(ids, matriz, novas, self.K)
+
+        posicoes, _ = vizinhos_mais_proximos(matriz, matriz, self.K, ids, ids)
+        for linha, receita_id in enumerate(ids):
+            esperados = [int(ids[p]) for p in posicoes[linha] if p >= 0]
+            gravados = list(
+                ReceitaSimilar.objects.filter(receita_id=receita_id).order_by('posicao').values_list('similar_id', flat=True)
+            )
+            self.assertEqual(gravados, esperados, f"receita {receita_id}")
+
+
+class IndiceAutocompletarTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'senha')
+        Receita.objects.create(nome='Torta de Jiló', external_id='teste_1')
+        Receita.objects.create(nome='Jiló Refogado', external_id='teste_2')
+        self.pendente = Receita.objects.create(nome='Jiló Empanado', external_id='teste_3', status='pendente')
+        indice_autocompletar.construir()
+
+    def tearDown(self):
+        indice_autocompletar.invalidar()
+
+    def receitas(self, texto):
+        return [valor for _, _, valor in indice_autocompletar.sugerir(texto, tipos=[RECEITA])]
+
+    def test_inicio_do_nome_vem_antes_de_palavra_no_meio(self):
+        self.assertEqual(self.receitas('jil'), ['teste_2', 'teste_1'])
+
+    def test_ignora_acentos_e_caixa(self):
+        self.assertEqual(self.receitas('TORTA DE JILO'), ['teste_1'])
+
+    def test_prefixo_curto_demais(self):
+        self.assertEqual(indice_autocompletar.sugerir('j'), [])
+
+    def test_ingrediente_em_ingles_sugere_o_nome_em_portugues(self):
+        self.assertIn((INGREDIENTE, 'frango', 'frango'), indice_autocompletar.sugerir('chick', tipos=[INGREDIENTE]))
+
+    def test_receita_aprovada_entra_e_removida_sai(self):
+        self.assertNotIn('teste_3', self.receitas('empan'))
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('app_receitas:aprovar_receita', args=[self.pendente.pk]))
+        self.assertEqual(self.receitas('empan'), ['teste_3'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('app_receitas:rejeitar_receita', args=[self.pendente.pk]))
+        self.assertEqual(self.receitas('empan'), [])
+        self.assertEqual(self.receitas('jil'), ['teste_2', 'teste_1'])
+
+    def test_renomear_reindexa(self):
+        receita = Receita.objects.get(external_id='teste_2')
+        receita.nome = 'Quiabo Refogado'
+        with self.captureOnCommitCallbacks(execute=True):
+            receita.save(update_fields=['nome'])
+        self.assertEqual(self.receitas('quia'), ['teste_2'])
+        self.assertEqual(self.receitas('jil'), ['teste_1'])
+
+
+class CompartimentoTests(SimpleTestCase):
+    def test_vagas_limitadas_e_contadores(self):
+        compartimento = admissao.Compartimento('teste', limite=1, espera=0)
+        self.assertTrue(compartimento.entrar())
+        self.assertFalse(compartimento.entrar())
+        self.assertEqual((compartimento.em_uso, compartimento.admitidas, compartimento.rejeitadas), (1, 1, 1))
+        compartimento.sair()
+        self.assertTrue(compartimento.entrar())
+        self.assertIn('receitas_teste_degradadas_total 1', compartimento.exportar())
+
+
+class LimitarUpstreamTests(TestCase):
+    def setUp(self):
+        self.compartimento = admissao.Compartimento('teste', limite=1, espera=0)
+        patcher = mock.patch.object(admissao, 'compartimento_upstream', self.compartimento)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def chamar(self, view):
+        return admissao.limitar_upstream(view)(RequestFactory().get('/'))
+
+    def test_view_sem_servicos_externos_nao_ocupa_vaga(self):
+        self.compartimento.entrar()
+        response = self.chamar(lambda request: HttpResponse())
+        self.assertNotIn('X-Degradado', response)
+
+    def test_vaga_e_devolvida_ao_fim_da_requisicao(self):
+        response = self.chamar(lambda request: HttpResponse(str(admissao.upstream_disponivel())))
+        self.assertEqual(response.content, b'True')
+        self.assertEqual(self.compartimento.em_uso, 0)
+
+    def test_sem_vaga_marca_a_resposta_como_degradada(self):
+        self.compartimento.entrar()
+        response = self.chamar(lambda request: HttpResponse(str(admissao.upstream_disponivel())))
+        self.assertEqual(response.content, b'False')
+        self.assertEqual(response['X-Degradado'], '1')
+        self.assertEqual(self.compartimento.em_uso, 1)
+
+    def test_receita_nao_hidratada_sem_vaga_responde_503(self):
+        self.compartimento.entrar()
+        with mock.patch.object(views, '_hidratar_receita_tmdb') as hidratar:
+            response = self.client.get(reverse('app_receitas:detalhes_receita', args=['tmdb_9000001']))
+        hidratar.assert_not_called()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['X-Degradado'], '1')
+        self.assertIn('Retry-After', response)
+        # A reserva de hidratação é devolvida para a próxima tentativa
+        self.assertIsNone(Receita.objects.get(external_id='tmdb_9000001').hidratacao_expira_em)
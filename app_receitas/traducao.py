@@ -0,0 +1,202 @@
+# app_receitas/traducao.py
+
+"""
+Tradução com vários provedores. A cadeia configurada em TRADUCAO_BACKENDS é
+percorrida em ordem dentro de um prazo por chamada: se o provedor da vez não
+responde até o seu p95 recente, o próximo é acionado em paralelo (requisição
+"hedged") e vale a primeira resposta. Sem nenhuma resposta no prazo, fica o
+texto original.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import dicionario_culinario
+from .clientes import extrair_traducao, sessao_http, traduzir_googletrans
+
+logger = logging.getLogger(__name__)
+
+URL_PADRAO = 'https://translate.google.com/m'
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class SemTraducao(Exception):
+    """O provedor não sabe traduzir o texto; a cadeia segue para o próximo."""
+
+
+class Tradutor:
+    """
+    Interface dos provedores: `traduzir(texto, destino, origem, timeout)` devolve o
+    texto traduzido ou levanta uma exceção. Provedores locais rodam na própria thread,
+    sem prazo nem hedge. Cada provedor guarda as latências recentes para estimar o p95.
+    """
+
+    nome = None
+    local = False
+
+    def __init__(self):
+        self._latencias = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def traduzir(self, texto, destino, origem='auto', timeout=None):
+        raise NotImplementedError
+
+    def medir(self, texto, destino, origem, timeout):
+        inicio = time.perf_counter()
+        resultado = self.traduzir(texto, destino, origem, timeout)
+        with self._lock:
+            self._latencias.append(time.perf_counter() - inicio)
+        return resultado
+
+    def atraso_hedge(self):
+        """Quanto esperar antes de acionar o próximo provedor: o percentil configurado das latências recentes."""
+        with self._lock:
+            latencias = sorted(self._latencias)
+        if len(latencias) < settings.TRADUCAO_HEDGE_AMOSTRAS_MINIMAS:
+            return settings.TRADUCAO_HEDGE_SEGUNDOS
+        posicao = min(len(latencias) - 1, int(len(latencias) * settings.TRADUCAO_HEDGE_PERCENTIL / 100))
+        return max(settings.TRADUCAO_HEDGE_MINIMO_SEGUNDOS, latencias[posicao])
+
+
+class TradutorDicionario(Tradutor):
+    """Offline: só o dicionário culinário. Serve de provedor único em testes e sem rede."""
+
+    nome = 'dicionario'
+    local = True
+
+    def traduzir(self, texto, destino, origem='auto', timeout=None):
+        traducao = dicionario_culinario.traduzir(texto, destino)
+        if traducao is None:
+            raise SemTraducao(texto)
+        return traducao
+
+
+class TradutorHTTP(Tradutor):
+    """Endpoint compatível com translate.google.com/m (TRADUCAO_URL, ou o próprio Google)."""
+
+    nome = 'http'
+
+    def __init__(self, url=None):
+        super().__init__()
+        self.url = url or settings.TRADUCAO_URL or URL_PADRAO
+
+    def traduzir(self, texto, destino, origem='auto', timeout=None):
+        response = sessao_http().get(
+            self.url, params={'sl': origem, 'tl': destino, 'q': texto}, headers=HEADERS, timeout=timeout or 5,
+        )
+        response.raise_for_status()
+        return extrair_traducao(response.text)
+
+
+class TradutorGoogletrans(Tradutor):
+    """Biblioteca googletrans (síncrona ou, a partir da 4.0, assíncrona)."""
+
+    nome = 'googletrans'
+
+    def traduzir(self, texto, destino, origem='auto', timeout=None):
+        return traduzir_googletrans(texto, destino, origem, timeout)
+
+
+BACKENDS = {classe.nome: classe for classe in (TradutorDicionario, TradutorHTTP, TradutorGoogletrans)}
+
+_lock = threading.Lock()
+_cadeia = (None, [])
+_executor = None
+
+
+def cadeia():
+    """Provedores de TRADUCAO_BACKENDS (nomes de BACKENDS ou caminhos de classes), recriados se a configuração mudar."""
+    global _cadeia
+    configuracao = (tuple(settings.TRADUCAO_BACKENDS), settings.TRADUCAO_URL)
+    if _cadeia[0] != configuracao:
+        with _lock:
+            if _cadeia[0] != configuracao:
+                _cadeia = (configuracao, [
+                    (BACKENDS[nome] if nome in BACKENDS else import_string(nome))()
+                    for nome in configuracao[0]
+                ])
+    return _cadeia[1]
+
+
+def _executor_traducao():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(settings.TRADUCAO_THREADS, thread_name_prefix='traducao')
+    return _executor
+
+
+def _resultado(futuro, backend):
+    try:
+        return futuro.result()
+    except SemTraducao:
+        return None
+    except Exception as e:
+        logger.warning("Tradução falhou em %s: %s", backend.nome, e, extra={'backend': backend.nome})
+        return None
+
+
+def tentar_traduzir(texto, destino, origem='auto', prazo=None):
+    """Tradução de `texto` pela cadeia de provedores, ou None se nenhum respondeu dentro do prazo."""
+    if not texto:
+        return None
+    limite = time.monotonic() + (prazo or settings.TRADUCAO_PRAZO_SEGUNDOS)
+    remotos = []
+    for backend in cadeia():
+        if not backend.local:
+            remotos.append(backend)
+            continue
+        try:
+            return backend.medir(texto, destino, origem, None)
+        except SemTraducao:
+            pass
+
+    logger.debug("Tradução remota para %s: %d caracteres", destino, len(texto), extra={'destino': destino})
+    pendentes, proximo = {}, 0
+    while pendentes or proximo < len(remotos):
+        restante = limite - time.monotonic()
+        if restante <= 0:
+            break
+        if not pendentes:
+            backend = remotos[proximo]
+            proximo += 1
+            pendentes[_executor_traducao().submit(backend.medir, texto, destino, origem, restante)] = backend
+            continue
+
+        # Espera a primeira resposta; sem ela até o p95 do provedor mais recente, aciona o próximo
+        espera = restante
+        if proximo < len(remotos):
+            espera = min(restante, remotos[proximo - 1].atraso_hedge())
+        concluidos, _ = wait(pendentes, timeout=espera, return_when=FIRST_COMPLETED)
+        for futuro in concluidos:
+            backend = pendentes.pop(futuro)
+            traducao = _resultado(futuro, backend)
+            if traducao:
+                for restantes in pendentes:
+                    restantes.cancel()
+                return traducao
+        if proximo < len(remotos):
+            if not concluidos:
+                logger.debug("Hedge: acionando %s após %.0f ms", remotos[proximo].nome, espera * 1000)
+            backend = remotos[proximo]
+            proximo += 1
+            pendentes[_executor_traducao().submit(backend.medir, texto, destino, origem, max(0.05, limite - time.monotonic()))] = backend
+
+    for futuro in pendentes:
+        futuro.cancel()
+    logger.warning("Nenhum provedor traduziu o texto no prazo; mantendo o original.", extra={'destino': destino})
+    return None
+
+
+def traduzir(texto, destino, origem='auto', prazo=None):
+    """Como `tentar_traduzir`, mas cai no próprio texto quando nenhum provedor responde."""
+    return tentar_traduzir(texto, destino, origem, prazo) or texto
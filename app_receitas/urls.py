@@ -12,6 +12,8 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('logout/', views.custom_logout_view, name='logout'),
     path('receita/<str:external_id>/', views.detalhes_receita, name='detalhes_receita'),
+    path('receita/<str:external_id>/comentarios/', views.comentarios_receita, name='comentarios_receita'),
+    path('receita/<str:external_id>/interacoes/', views.interacoes_receita, name='interacoes_receita'),
     path('favoritos/<str:external_id>/', views.adicionar_remover_favoritos, name='adicionar_remover_favoritos'),
     path('receitas-favoritas/', views.receitas_favoritas, name='receitas_favoritas'),
     path('perfil/', views.perfil_usuario, name='perfil_usuario'),
@@ -19,8 +21,12 @@ urlpatterns = [
     path('perfil/mudar-senha/', CustomPasswordChangeView.as_view(), name='mudar_senha'),
     path('perfil/mudar-senha/sucesso/', mudar_senha_sucesso, name='mudar_senha_sucesso'),
     path('buscar/', views.buscar_receitas, name='buscar_receitas'),
+    path('autocompletar/', views.autocompletar, name='autocompletar'),
+    path('o-que-cozinhar/', views.o_que_cozinhar, name='o_que_cozinhar'),
     path('moderar-receitas/', views.moderar_receitas, name='moderar_receitas'),
+    path('moderar-receitas/em-massa/', views.moderar_receitas_em_massa, name='moderar_receitas_em_massa'),
     path('aprovar-receita/<int:pk>/', views.aprovar_receita, name='aprovar_receita'),
     path('rejeitar-receita/<int:pk>/', views.rejeitar_receita, name='rejeitar_receita'),
+    path('metricas/', views.metricas, name='metricas'),
 ]
 
@@ -3,60 +3,135 @@
 import requests
 import json
 import logging
-from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import authenticate, login, logout, update_session_auth_hash
+import hashlib
+import hmac
+import time
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import redirect, get_object_or_404
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.contrib.auth import login, logout, update_session_auth_hash
 from django.contrib.auth.forms import AuthenticationForm, PasswordChangeForm
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.urls import reverse_lazy
-from django.db.models import Q, Avg
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.db import router, transaction
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
+from django.db.models import Q, Avg, Count, Max
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.contrib.auth.views import PasswordChangeView
-from googletrans import Translator
 
-from .models import Receita, Avaliacao, Comentario, ReceitaFavorita
+from . import dicionario_culinario
+from .admissao import compartimento_upstream, limitar_upstream, upstream_disponivel
+from .condicional import pagina_condicional
+from .clientes import sessao_http
+from .models import Receita, Avaliacao, Comentario, ReceitaFavorita, IngredienteReceita, ReceitaSimilar
+from .ingredientes import escalar, itens_da_refeicao, salvar_itens
+from .autocompletar import PRIORIDADE_TIPOS, RECEITA, indice_autocompletar
+from .despensa import indice_despensa
+from .filtros import QUALQUER, TODOS, combinar_filtros
+from .recomendacoes import recomendacoes_para_usuario
+from .estatisticas import agregador, normalizar_termo
+from .instrumentacao import exportar_metricas, medir, render
+from .traducao import tentar_traduzir
 from .forms import (
     AvaliacaoForm, ComentarioForm, RegistroUsuarioForm,
     UserEditForm, ProfileEditForm,
 )
 
-# Configuração de logging
-logging.basicConfig(level=logging.INFO)
-translator = Translator()
+logger = logging.getLogger(__name__)
+
+def _chave_cache(prefixo, *partes):
+    """Monta uma chave de cache curta e segura para qualquer backend."""
+    bruto = '|'.join(str(parte) for parte in partes)
+    return f"{prefixo}:{hashlib.md5(bruto.encode('utf-8')).hexdigest()}"
 
 def _translate_to_en(text):
     """Função auxiliar para traduzir para inglês com tratamento de erro."""
     if not text:
         return ""
-    try:
-        return translator.translate(text, dest='en').text
-    except Exception as e:
-        logging.error(f"Erro na tradução para inglês: {e}")
+    local = dicionario_culinario.traduzir(text, 'en')
+    if local is not None:
+        return local
+    chave = _chave_cache('traducao_en', text)
+    traducao = cache.get(chave)
+    if traducao is not None:
+        return traducao
+    if not upstream_disponivel():
         return text
+    with medir('traducao'):
+        traducao = tentar_traduzir(text, 'en')
+    if traducao is None:
+        return text
+    cache.set(chave, traducao, settings.TRADUCAO_CACHE_TIMEOUT)
+    return traducao
 
 def _translate_to_pt(text):
     """Função auxiliar para traduzir para português com tratamento de erro."""
     if not text:
         return ""
-    try:
-        return translator.translate(text, dest='pt').text
-    except Exception as e:
-        logging.error(f"Erro na tradução para português: {e}")
+    local = dicionario_culinario.traduzir(text, 'pt')
+    if local is not None:
+        return local
+    chave = _chave_cache('traducao_pt', text)
+    traducao = cache.get(chave)
+    if traducao is not None:
+        return traducao
+    if not upstream_disponivel():
         return text
+    with medir('traducao'):
+        traducao = tentar_traduzir(text, 'pt')
+    if traducao is None:
+        return text
+    cache.set(chave, traducao, settings.TRADUCAO_CACHE_TIMEOUT)
+    return traducao
+
+def _chave_themealdb(query_type, query_value):
+    return _chave_cache('themealdb', query_type, normalizar_termo(query_value))
+
+# Mensagem das buscas atendidas sem a TheMealDB por falta de vaga (veja admissao.py)
+BUSCA_EXTERNA_INDISPONIVEL = "A busca na TheMealDB está sobrecarregada; mostrando apenas as receitas já conhecidas."
 
-def _fetch_from_themealdb(query_type, query_value):
-    """Função auxiliar para buscar receitas na API TheMealDB."""
+def _fetch_from_themealdb(query_type, query_value, registrar=True):
+    """
+    Função auxiliar para buscar receitas na API TheMealDB, usando o cache quando
+    possível. Cada busca é registrada nas estatísticas de consultas.
+    """
     if not query_value:
         return [], ""
-    
+
+    inicio = time.perf_counter()
+    chave = _chave_themealdb(query_type, query_value)
+    resultado = cache.get(chave)
+    do_cache = resultado is not None
+    if not do_cache:
+        if not upstream_disponivel():
+            return [], BUSCA_EXTERNA_INDISPONIVEL
+        resultado = _buscar_na_themealdb(query_type, query_value, chave)
+
+    if registrar:
+        latencia_ms = (time.perf_counter() - inicio) * 1000
+        agregador.registrar(query_type, query_value, latencia_ms, len(resultado[0]), do_cache=do_cache)
+    logger.debug(
+        "TheMealDB %s=%r: %d receitas, cache=%s", query_type, query_value, len(resultado[0]), do_cache,
+        extra={'tipo': query_type, 'do_cache': do_cache},
+    )
+    return resultado
+
+def _buscar_na_themealdb(query_type, query_value, chave):
+    """Faz a requisição à TheMealDB e guarda no cache as respostas válidas."""
     query_value_en = _translate_to_en(query_value)
     
+    base_url = settings.THEMEALDB_BASE_URL
     api_map = {
-        'nome': f'https://www.themealdb.com/api/json/v1/1/search.php?s={query_value_en}',
-        'ingredientes': f'https://www.themealdb.com/api/json/v1/1/filter.php?i={query_value_en}',
-        'categoria': f'https://www.themealdb.com/api/json/v1/1/filter.php?c={query_value_en}',
-        'area': f'https://www.themealdb.com/api/json/v1/1/filter.php?a={query_value_en}',
-        'id': f'https://www.themealdb.com/api/json/v1/1/lookup.php?i={query_value_en}'
+        'nome': f'{base_url}search.php?s={query_value_en}',
+        'ingredientes': f'{base_url}filter.php?i={query_value_en}',
+        'categoria': f'{base_url}filter.php?c={query_value_en}',
+        'area': f'{base_url}filter.php?a={query_value_en}',
+        'id': f'{base_url}lookup.php?i={query_value_en}'
     }
     
     api_url = api_map.get(query_type)
@@ -64,13 +139,16 @@ def _fetch_from_themealdb(query_type, query_value):
         return [], f"Tipo de busca '{query_type}' inválido."
         
     try:
-        response = requests.get(api_url)
+        with medir('themealdb'):
+            response = sessao_http().get(api_url, timeout=5)
         response.raise_for_status()
         data = response.json()
         meals = data.get('meals', [])
         
         if not meals:
-            return [], f"Nenhuma receita encontrada na API TheMealDB para '{query_value}'."
+            resultado = ([], f"Nenhuma receita encontrada na API TheMealDB para '{query_value}'.")
+            cache.set(chave, resultado, settings.BUSCA_CACHE_TIMEOUT)
+            return resultado
         
         receitas_api = []
         for meal_data in meals:
@@ -79,12 +157,112 @@ def _fetch_from_themealdb(query_type, query_value):
                 'external_id': f"tmdb_{meal_data.get('idMeal')}",
                 'imagem_url': meal_data.get('strMealThumb')
             })
+        cache.set(chave, (receitas_api, ""), settings.BUSCA_CACHE_TIMEOUT)
         return receitas_api, ""
         
     except (requests.exceptions.RequestException, json.JSONDecodeError, Exception) as e:
-        logging.error(f"Erro ao buscar na API TheMealDB ({query_type}): {e}")
+        logger.error("Erro ao buscar na API TheMealDB (%s): %s", query_type, e)
         return [], f"Erro ao buscar receitas na API TheMealDB: {e}"
 
+def _receita_incompleta(receita):
+    """Indica se uma receita importada da TheMealDB ainda precisa ser hidratada."""
+    return not receita.instrucoes or not receita.ingredientes
+
+# Retornado quando outro worker está hidratando a receita e ela ainda não ficou pronta
+HIDRATACAO_EM_ANDAMENTO = 'em_andamento'
+# Retornado quando não há vaga para chamar a TheMealDB agora
+HIDRATACAO_ADIADA = 'adiada'
+
+def _obter_lease_hidratacao(receita):
+    """
+    Tenta reservar a hidratação da receita para este worker com um UPDATE
+    condicional: só um worker consegue enquanto a reserva não expirar.
+    Retorna o prazo gravado (que identifica a reserva) ou None.
+    """
+    agora = timezone.now()
+    prazo = agora + timedelta(seconds=settings.HIDRATACAO_LEASE_SEGUNDOS)
+    obtida = Receita.objects.filter(pk=receita.pk).filter(
+        Q(hidratacao_expira_em__isnull=True) | Q(hidratacao_expira_em__lt=agora)
+    ).update(hidratacao_expira_em=prazo) == 1
+    return prazo if obtida else None
+
+def _hidratar_com_lease(receita):
+    """
+    Hidrata a receita garantindo que apenas um worker busque e traduza a mesma
+    receita ao mesmo tempo. Os demais esperam alguns instantes pelo resultado;
+    se ele não chegar, retornam HIDRATACAO_EM_ANDAMENTO. Só quem obtém a reserva
+    ocupa vaga para serviços externos; sem vaga, retorna HIDRATACAO_ADIADA.
+    """
+    meu_prazo = _obter_lease_hidratacao(receita)
+    if meu_prazo is not None:
+        try:
+            if not upstream_disponivel():
+                return HIDRATACAO_ADIADA
+            return _hidratar_receita_tmdb(receita)
+        finally:
+            # Se a hidratação passou do prazo, outro worker pode já ter uma reserva nova: só libera a própria
+            Receita.objects.filter(pk=receita.pk, hidratacao_expira_em=meu_prazo).update(hidratacao_expira_em=None)
+
+    # A espera só consulta o banco, então não ocupa vaga de serviços externos.
+    # Lê sempre do primário: uma réplica atrasada nunca mostraria a receita pronta
+    banco = router.db_for_write(Receita)
+    limite = time.monotonic() + settings.HIDRATACAO_ESPERA_SEGUNDOS
+    while time.monotonic() < limite:
+        time.sleep(0.2)
+        receita.refresh_from_db(using=banco)
+        if not _receita_incompleta(receita):
+            return True
+        if receita.hidratacao_expira_em is None:
+            # O outro worker terminou sem conseguir hidratar
+            break
+    return HIDRATACAO_EM_ANDAMENTO
+
+# Campos preenchidos a partir da TheMealDB
+CAMPOS_HIDRATADOS = [
+    'nome', 'instrucoes', 'categoria', 'area', 'imagem_url', 'link_youtube', 'ingredientes', 'status', 'atualizado_em',
+]
+
+def _hidratar_receita_tmdb(receita):
+    """
+    Busca os detalhes de uma receita 'tmdb_' na API, traduz e salva no banco.
+    Retorna True se a receita foi preenchida, False se a API não a conhece e
+    None em caso de erro na requisição.
+    """
+    recipe_id = receita.external_id.replace('tmdb_', '')
+    try:
+        with medir('themealdb'):
+            response = sessao_http().get(f'{settings.THEMEALDB_BASE_URL}lookup.php?i={recipe_id}', timeout=5)
+    except requests.exceptions.RequestException as e:
+        logger.error("Erro ao buscar a receita %s na API TheMealDB: %s", recipe_id, e)
+        return None
+    if response.status_code != 200:
+        return None
+
+    data = response.json()
+    meals = data.get('meals')
+    if not meals:
+        return False
+
+    meal_data = meals[0]
+
+    # Traduzindo e preenchendo os dados
+    receita.nome = _translate_to_pt(meal_data.get('strMeal'))
+    receita.instrucoes = _translate_to_pt(meal_data.get('strInstructions', ''))
+    receita.categoria = [ _translate_to_pt(meal_data.get('strCategory', '')) ] if meal_data.get('strCategory') else []
+    receita.area = [ _translate_to_pt(meal_data.get('strArea', '')) ] if meal_data.get('strArea') else []
+    receita.imagem_url = meal_data.get('strMealThumb')
+    receita.link_youtube = meal_data.get('strYoutube')
+
+    # Medida e ingrediente são separados antes da tradução
+    itens = itens_da_refeicao(meal_data, _translate_to_pt)
+    receita.ingredientes = [item.texto for item in itens]
+    receita.status = 'aprovado' # Define o status como aprovado para novas receitas
+    with transaction.atomic():
+        # Sem hidratacao_expira_em: a reserva é controlada só por _hidratar_com_lease
+        receita.save(update_fields=CAMPOS_HIDRATADOS)
+        salvar_itens(receita, itens)
+    return True
+
 def registro(request):
     """View para o registro de novos usuários."""
     if request.method == 'POST':
@@ -102,63 +280,57 @@ def registro(request):
 
     return render(request, 'app_receitas/registro.html', {'form': form})
 
+@limitar_upstream
 def buscar_receitas(request):
     query_nome = request.GET.get('nome')
     query_ingredientes = request.GET.get('ingredientes')
     query_area = request.GET.get('area')
     query_categoria = request.GET.get('categoria')
 
-    todas_receitas = []
-    
-    # Busca na API
-    if query_nome:
-        receitas_api, msg = _fetch_from_themealdb('nome', query_nome)
-        todas_receitas.extend(receitas_api)
-        if msg:
-            messages.info(request, msg)
+    modo = QUALQUER if request.GET.get('modo') == QUALQUER else TODOS
+    ingredientes_list = [ing.strip() for ing in (query_ingredientes or '').split(',') if ing.strip()]
 
-    if query_ingredientes:
-        ingredientes_list = [ing.strip() for ing in query_ingredientes.split(',') if ing.strip()]
-        for ingrediente in ingredientes_list:
-            receitas_api, msg = _fetch_from_themealdb('ingredientes', ingrediente)
-            todas_receitas.extend(receitas_api)
-            if msg:
-                messages.info(request, msg)
+    # Busca na API: um filtro por requisição, combinados localmente
+    filtros = [('ingredientes', ingrediente) for ingrediente in ingredientes_list]
+    for query_type, query_value in (('nome', query_nome), ('categoria', query_categoria), ('area', query_area)):
+        if query_value:
+            filtros.append((query_type, query_value))
 
-    if query_categoria:
-        receitas_api, msg = _fetch_from_themealdb('categoria', query_categoria)
-        todas_receitas.extend(receitas_api)
-        if msg:
-            messages.info(request, msg)
-            
-    if query_area:
-        receitas_api, msg = _fetch_from_themealdb('area', query_area)
-        todas_receitas.extend(receitas_api)
-        if msg:
+    avisos = set()
+
+    def buscar_filtro(filtro):
+        receitas_api, msg = _fetch_from_themealdb(*filtro)
+        if msg and msg not in avisos:
+            avisos.add(msg)
             messages.info(request, msg)
+        return {receita['external_id']: receita for receita in receitas_api}
+
+    todas_receitas = combinar_filtros(
+        filtros, buscar_filtro, modo, em_cache=lambda filtro: cache.has_key(_chave_themealdb(*filtro))
+    )
 
     # Busca no banco de dados local
     receitas_local = Receita.objects.all()
-    q_objects = Q()
-    
+    condicoes = []
+
     if query_nome:
-        q_objects &= Q(nome__icontains=query_nome) | Q(nome__icontains=_translate_to_pt(query_nome))
-    
-    if query_ingredientes:
-        ingredientes_list = [ing.strip() for ing in query_ingredientes.split(',') if ing.strip()]
-        ing_q = Q()
-        for ingrediente in ingredientes_list:
-            ing_q |= Q(ingredientes__icontains=ingrediente) | Q(ingredientes__icontains=_translate_to_pt(ingrediente))
-        q_objects &= ing_q
-        
+        condicoes.append(Q(nome__icontains=query_nome) | Q(nome__icontains=_translate_to_pt(query_nome)))
+
+    # Filtro exato pelo nome canônico dos ingredientes estruturados, sem varrer o texto
+    for nome in {dicionario_culinario.nome_canonico(ingrediente) for ingrediente in ingredientes_list}:
+        condicoes.append(Q(pk__in=IngredienteReceita.objects.filter(nome_canonico=nome).values('receita_id')))
+
     if query_area:
-        q_objects &= Q(area__icontains=query_area) | Q(area__icontains=_translate_to_pt(query_area))
-    
+        condicoes.append(Q(area__icontains=query_area) | Q(area__icontains=_translate_to_pt(query_area)))
+
     if query_categoria:
-        q_objects &= Q(categoria__icontains=query_categoria) | Q(categoria__icontains=_translate_to_pt(query_categoria))
-    
-    if q_objects:
-        receitas_local = receitas_local.filter(q_objects).order_by('nome')
+        condicoes.append(Q(categoria__icontains=query_categoria) | Q(categoria__icontains=_translate_to_pt(query_categoria)))
+
+    if condicoes:
+        combinado = condicoes[0]
+        for condicao in condicoes[1:]:
+            combinado = combinado | condicao if modo == QUALQUER else combinado & condicao
+        receitas_local = receitas_local.filter(combinado).order_by('nome')
     else:
         receitas_local = receitas_local.order_by('nome')
 
@@ -184,6 +356,7 @@ def buscar_receitas(request):
         'query_ingredientes': query_ingredientes,
         'query_area': query_area,
         'query_categoria': query_categoria,
+        'query_modo': modo,
         'receitas_encontradas': receitas_encontradas,
         'query_string': query_string,
         'message': f'{len(todas_receitas)} receitas encontradas.' if todas_receitas else 'Nenhuma receita encontrada.',
@@ -191,53 +364,103 @@ def buscar_receitas(request):
     return render(request, 'app_receitas/buscar_receitas.html', context)
 
 
+def autocompletar(request):
+    """
+    Sugestões para os campos da busca, servidas do índice em memória sem
+    consultar a TheMealDB. `tipos` restringe a receita, ingrediente, categoria e/ou area.
+    """
+    tipos = [tipo for tipo in request.GET.get('tipos', '').split(',') if tipo in PRIORIDADE_TIPOS]
+    sugestoes = []
+    for tipo, rotulo, valor in indice_autocompletar.sugerir(
+        request.GET.get('q', ''), limite=settings.AUTOCOMPLETAR_SUGESTOES, tipos=tipos
+    ):
+        sugestao = {'tipo': tipo, 'rotulo': rotulo, 'valor': valor}
+        if tipo == RECEITA:
+            sugestao['url'] = reverse('app_receitas:detalhes_receita', kwargs={'external_id': valor})
+        sugestoes.append(sugestao)
+    resposta = JsonResponse({'sugestoes': sugestoes})
+    resposta['Cache-Control'] = 'public, max-age=60'
+    return resposta
+
+
+def o_que_cozinhar(request):
+    """
+    Lista as receitas que dá para fazer com os ingredientes da despensa,
+    das que faltam menos ingredientes para as que faltam mais.
+    """
+    query_ingredientes = request.GET.get('ingredientes', '')
+    despensa = [ing.strip() for ing in query_ingredientes.split(',') if ing.strip()]
+    try:
+        max_faltando = int(request.GET['max_faltando']) if request.GET.get('max_faltando') else None
+    except ValueError:
+        max_faltando = None
+
+    sugestoes = []
+    if despensa:
+        resultado = indice_despensa.buscar(despensa, limite=settings.DESPENSA_RESULTADOS, max_faltando=max_faltando)
+        ids = [receita_id for receita_id, _, _ in resultado]
+        receitas = Receita.objects.in_bulk(ids)
+        nomes_despensa = {dicionario_culinario.nome_canonico(ing) for ing in despensa}
+        faltantes = {receita_id: [] for receita_id in ids}
+        for receita_id, nome, canonico in IngredienteReceita.objects.filter(receita_id__in=ids).values_list(
+            'receita_id', 'nome', 'nome_canonico'
+        ):
+            if canonico not in nomes_despensa and nome not in faltantes[receita_id]:
+                faltantes[receita_id].append(nome)
+        for receita_id, em_casa, faltando in resultado:
+            if receita_id in receitas:
+                sugestoes.append({
+                    'receita': receitas[receita_id],
+                    'em_casa': em_casa,
+                    'faltando': faltando,
+                    'ingredientes_faltantes': faltantes[receita_id],
+                })
+
+    context = {
+        'query_ingredientes': query_ingredientes,
+        'max_faltando': max_faltando,
+        'sugestoes': sugestoes,
+    }
+    return render(request, 'app_receitas/o_que_cozinhar.html', context)
+
+
+# Multiplicadores oferecidos no seletor de porções da página de detalhes
+OPCOES_FATOR = [0.5, 1, 2, 3, 4]
+
+def _versao_detalhes(request, external_id):
+    """Última alteração da receita, ou None enquanto ela ainda não foi hidratada."""
+    linha = Receita.objects.filter(external_id=external_id).values_list('atualizado_em', 'instrucoes', 'ingredientes').first()
+    if linha is None or not linha[1] or not linha[2]:
+        return None
+    return linha[0]
+
+@pagina_condicional(_versao_detalhes)
+@limitar_upstream
 def detalhes_receita(request, external_id):
     receita = None
     
     if external_id.startswith('tmdb_'):
-        recipe_id = external_id.replace('tmdb_', '')
-
         # Tenta obter a receita do banco de dados, se não existir, busca na API e a cria
         try:
             receita, created = Receita.objects.get_or_create(external_id=external_id)
 
-            if created or not receita.instrucoes or not receita.ingredientes:
+            if created or _receita_incompleta(receita):
                 # Se a receita foi criada agora ou está incompleta, busca os detalhes da API
-                response = requests.get(f'https://www.themealdb.com/api/json/v1/1/lookup.php?i={recipe_id}')
-                if response.status_code == 200:
-                    data = response.json()
-                    meals = data.get('meals')
-                    if meals:
-                        meal_data = meals[0]
-                        
-                        # Traduzindo e preenchendo os dados
-                        receita.nome = _translate_to_pt(meal_data.get('strMeal'))
-                        receita.instrucoes = _translate_to_pt(meal_data.get('strInstructions', ''))
-                        receita.categoria = [ _translate_to_pt(meal_data.get('strCategory', '')) ] if meal_data.get('strCategory') else []
-                        receita.area = [ _translate_to_pt(meal_data.get('strArea', '')) ] if meal_data.get('strArea') else []
-                        receita.imagem_url = meal_data.get('strMealThumb')
-                        receita.link_youtube = meal_data.get('strYoutube')
-                        
-                        ingredientes_traduzidos = []
-                        for i in range(1, 21):
-                            ingrediente = meal_data.get(f'strIngredient{i}')
-                            medida = meal_data.get(f'strMeasure{i}')
-                            
-                            if ingrediente and ingrediente.strip():
-                                medida_str = medida.strip() if medida is not None else ''
-                                texto_completo = f"{medida_str} {ingrediente.strip()}"
-                                ingrediente_traduzido = _translate_to_pt(texto_completo)
-                                ingredientes_traduzidos.append(ingrediente_traduzido)
-                        
-                        receita.ingredientes = ingredientes_traduzidos
-                        receita.status = 'aprovado' # Define o status como aprovado para novas receitas
-                        receita.save()
-                    else:
-                        messages.warning(request, "Nenhuma receita encontrada na API TheMealDB.")
-                        return redirect('app_receitas:buscar_receitas')
-                else:
+                hidratada = _hidratar_com_lease(receita)
+                if hidratada == HIDRATACAO_EM_ANDAMENTO:
+                    return render(request, 'app_receitas/receita_em_preparo.html', {'receita': receita}, status=202)
+                if hidratada == HIDRATACAO_ADIADA:
+                    resposta = render(
+                        request, 'app_receitas/receita_em_preparo.html', {'receita': receita, 'adiada': True}, status=503,
+                    )
+                    resposta['Retry-After'] = settings.UPSTREAM_RETRY_AFTER_SEGUNDOS
+                    return resposta
+                if hidratada is None:
                     messages.error(request, "Erro ao buscar a receita na API.")
                     return redirect('app_receitas:buscar_receitas')
+                if not hidratada:
+                    messages.warning(request, "Nenhuma receita encontrada na API TheMealDB.")
+                    return redirect('app_receitas:buscar_receitas')
 
         except Exception as e:
             messages.error(request, f"Erro inesperado: {e}")
@@ -250,11 +473,6 @@ def detalhes_receita(request, external_id):
         messages.error(request, "A receita não foi encontrada.")
         return redirect('app_receitas:buscar_receitas')
 
-    # ... restante do código da sua view
-    is_favorita = False
-    if request.user.is_authenticated:
-        is_favorita = ReceitaFavorita.objects.filter(user=request.user, receita=receita).exists()
-
     if request.method == 'POST':
         if not request.user.is_authenticated:
             messages.error(request, "Você precisa estar logado para avaliar ou comentar.")
@@ -270,7 +488,7 @@ def detalhes_receita(request, external_id):
                 )
                 if not created:
                     avaliacao.nota = avaliacao_form.cleaned_data['nota']
-                    avaliacao.save()
+                    avaliacao.save(update_fields=['nota'])
                 receita.update_media_avaliacoes()
                 messages.success(request, "Avaliação adicionada/atualizada com sucesso!")
         
@@ -285,27 +503,101 @@ def detalhes_receita(request, external_id):
         
         return redirect('app_receitas:detalhes_receita', external_id=external_id)
 
-    avaliacao_form = AvaliacaoForm()
-    comentario_form = ComentarioForm()
-    avaliacoes = Avaliacao.objects.filter(receita=receita)
-    comentarios = Comentario.objects.filter(receita=receita).order_by('-data_comentario')
+    # Favorito e formulários dependem do usuário: vêm de interacoes_receita, para a página poder ir para o cache
+    comentarios, proximo_cursor = _pagina_comentarios(receita)
     
     media_avaliacoes = receita.media_avaliacoes
     contador_favoritos = ReceitaFavorita.objects.filter(receita=receita).count()
 
+    # Listas pré-calculadas pelo comando calcular_similares: uma única consulta pelo índice (receita, origem, posicao)
+    similares, tambem_gostaram = [], []
+    for item in ReceitaSimilar.objects.filter(receita=receita, similar__status='aprovado').select_related('similar'):
+        lista = similares if item.origem == ReceitaSimilar.CONTEUDO else tambem_gostaram
+        if len(lista) < settings.SIMILARES_EXIBIDOS:
+            lista.append(item.similar)
+
+    # Multiplicador de porções e conversão para ml/g, calculados sobre os ingredientes estruturados
+    try:
+        fator = float(request.GET.get('fator', '1').replace(',', '.'))
+    except ValueError:
+        fator = 1.0
+    if not 0.25 <= fator <= 20:
+        fator = 1.0
+    metrico = request.GET.get('metrico') == '1'
+    ingredientes = receita.ingredientes
+    if fator != 1 or metrico:
+        ingredientes = escalar([receita.pk], fator, metrico)[receita.pk] or receita.ingredientes
+
     context = {
         'receita': receita,
-        'is_favorita': is_favorita,
-        'avaliacao_form': avaliacao_form,
-        'comentario_form': comentario_form,
-        'avaliacoes': avaliacoes,
+        'histograma': receita.histograma_avaliacoes(),
         'comentarios': comentarios,
+        'proximo_cursor': proximo_cursor,
         'media_avaliacoes': media_avaliacoes,
-        'contador_favoritos': contador_favoritos
+        'contador_favoritos': contador_favoritos,
+        'ingredientes': ingredientes,
+        'fator': fator,
+        'opcoes_fator': OPCOES_FATOR,
+        'metrico': metrico,
+        'similares': similares,
+        'tambem_gostaram': tambem_gostaram,
     }
     return render(request, 'app_receitas/detalhes_receita.html', context)
 
 
+@never_cache
+def interacoes_receita(request, external_id):
+    """
+    Fragmento com as partes da página de detalhes que dependem do usuário (botão
+    de favorito e formulários de avaliação e comentário), buscado pelo navegador.
+    """
+    receita = get_object_or_404(Receita.objects.only('pk', 'external_id'), external_id=external_id)
+    is_favorita = (
+        request.user.is_authenticated
+        and ReceitaFavorita.objects.filter(user=request.user, receita=receita).exists()
+    )
+    context = {
+        'receita': receita,
+        'is_favorita': is_favorita,
+        'avaliacao_form': AvaliacaoForm(),
+        'comentario_form': ComentarioForm(),
+    }
+    return render(request, 'app_receitas/interacoes_receita.html', context)
+
+
+def _pagina_comentarios(receita, cursor=None):
+    """
+    Uma página de comentários, do mais novo ao mais antigo, a partir do cursor
+    "data|id" do último comentário já exibido. Retorna (comentarios, próximo cursor).
+    """
+    comentarios = Comentario.objects.filter(receita=receita).select_related('user').order_by('-data_comentario', '-id')
+    if cursor:
+        data, _, pk = cursor.rpartition('|')
+        try:
+            data = datetime.fromisoformat(data)
+            comentarios = comentarios.filter(Q(data_comentario__lt=data) | Q(data_comentario=data, pk__lt=int(pk)))
+        except ValueError:
+            comentarios = comentarios.none()
+
+    por_pagina = settings.COMENTARIOS_POR_PAGINA
+    pagina = list(comentarios[:por_pagina + 1])
+    if len(pagina) <= por_pagina:
+        return pagina, None
+    ultimo = pagina[por_pagina - 1]
+    return pagina[:por_pagina], f"{ultimo.data_comentario.isoformat()}|{ultimo.pk}"
+
+
+def comentarios_receita(request, external_id):
+    """Fragmento HTML com a próxima página de comentários, para o botão "carregar mais"."""
+    receita = get_object_or_404(Receita, external_id=external_id)
+    comentarios, proximo_cursor = _pagina_comentarios(receita, request.GET.get('cursor'))
+    return render(request, 'app_receitas/comentarios.html', {
+        'receita': receita,
+        'comentarios': comentarios,
+        'proximo_cursor': proximo_cursor,
+    })
+
+
 @login_required
 def adicionar_remover_favoritos(request, external_id):
     """View para adicionar ou remover uma receita dos favoritos."""
@@ -322,6 +614,8 @@ def adicionar_remover_favoritos(request, external_id):
         messages.success(request, f"Receita '{receita.nome}' removida dos favoritos.")
     else:
         messages.success(request, f"Receita '{receita.nome}' adicionada aos favoritos!")
+    # O feed da página inicial depende dos favoritos
+    cache.delete(_chave_cache('recomendadas', request.user.pk))
 
     return redirect('app_receitas:detalhes_receita', external_id=external_id)
 
@@ -353,15 +647,11 @@ def login_view(request):
     if request.method == 'POST':
         form = AuthenticationForm(request, data=request.POST)
         if form.is_valid():
-            username = form.cleaned_data.get('username')
-            password = form.cleaned_data.get('password')
-            user = authenticate(username=username, password=password)
-            if user is not None:
-                login(request, user)
-                messages.success(request, f"Bem-vindo, {username}!")
-                return redirect('app_receitas:index')
-            else:
-                messages.error(request, "Nome de utilizador ou palavra-passe inválidos.")
+            # O formulário já autenticou o usuário; autenticar de novo rodaria o hasher duas vezes
+            user = form.get_user()
+            login(request, user)
+            messages.success(request, f"Bem-vindo, {user.get_username()}!")
+            return redirect('app_receitas:index')
         else:
             messages.error(request, "Nome de utilizador ou palavra-passe inválidos.")
     else:
@@ -433,14 +723,34 @@ def mudar_senha_sucesso(request):
     """View para exibir uma mensagem de sucesso após a mudança de senha."""
     return render(request, 'app_receitas/mudar_senha_sucesso.html')
 
+def _versao_index(request):
+    """
+    Última alteração entre as receitas aprovadas (médias, favoritos e semelhantes
+    também contam) e quantas são: remover uma receita não muda o Max da data.
+    """
+    versao = Receita.objects.filter(status='aprovado').aggregate(Max('atualizado_em'), Count('pk'))
+    if versao['atualizado_em__max'] is None:
+        return None
+    return versao['atualizado_em__max'], versao['pk__count']
+
+@pagina_condicional(_versao_index)
 def index(request):
     """
     View para a página inicial, agora exibindo o ranking de receitas.
     """
     top_receitas = Receita.objects.filter(status='aprovado').exclude(media_avaliacoes__isnull=True).order_by('-media_avaliacoes')[:12]
 
+    recomendadas = []
+    if request.user.is_authenticated:
+        chave = _chave_cache('recomendadas', request.user.pk)
+        recomendadas = cache.get(chave)
+        if recomendadas is None:
+            recomendadas = recomendacoes_para_usuario(request.user, settings.RECOMENDACOES_HOMEPAGE)
+            cache.set(chave, recomendadas, settings.RECOMENDACOES_CACHE_TIMEOUT)
+
     context = {
         'top_receitas': top_receitas,
+        'recomendadas': recomendadas,
     }
 
     return render(request, 'app_receitas/index.html', context)
@@ -451,15 +761,79 @@ def is_superuser(user):
 @login_required
 @user_passes_test(is_superuser)
 def moderar_receitas(request):
-    receitas_pendentes = Receita.objects.filter(status='pendente')
-    return render(request, 'app_receitas/moderar_receitas.html', {'receitas_pendentes': receitas_pendentes})
+    """
+    Fila de moderação paginada por chave (?apos=<pk>): cada página é uma consulta
+    indexada em (status, id), sem OFFSET, por maior que seja a fila.
+    """
+    try:
+        apos = int(request.GET.get('apos', 0))
+    except ValueError:
+        apos = 0
+
+    pendentes = Receita.objects.filter(status='pendente')
+    por_pagina = settings.MODERACAO_POR_PAGINA
+    pagina = list(
+        pendentes.filter(pk__gt=apos)
+        .select_related('autor')
+        .only('pk', 'nome', 'autor__username')
+        .order_by('pk')[:por_pagina + 1]
+    )
+    tem_proxima = len(pagina) > por_pagina
+    pagina = pagina[:por_pagina]
+
+    context = {
+        'receitas_pendentes': pagina,
+        'total_pendentes': pendentes.count(),
+        'apos': apos,
+        'proximo_apos': pagina[-1].pk if tem_proxima else None,
+        'ultimo_pk': pendentes.order_by('-pk').values_list('pk', flat=True).first(),
+    }
+    return render(request, 'app_receitas/moderar_receitas.html', context)
+
+@login_required
+@user_passes_test(is_superuser)
+@require_POST
+def moderar_receitas_em_massa(request):
+    """
+    Aprova ou rejeita de uma vez as receitas selecionadas (ou todas as pendentes
+    até o último ID exibido) em uma única transação, com um UPDATE/DELETE por lote.
+    """
+    acao = request.POST.get('acao')
+    if acao not in ('aprovar', 'rejeitar'):
+        messages.error(request, "Ação de moderação inválida.")
+        return redirect('app_receitas:moderar_receitas')
+
+    alvo = Receita.objects.filter(status='pendente')
+    if request.POST.get('todas_pendentes'):
+        # Limita ao que o moderador viu, para não aprovar envios que chegaram depois
+        try:
+            alvo = alvo.filter(pk__lte=int(request.POST.get('ultimo_pk', 0)))
+        except ValueError:
+            alvo = alvo.none()
+    else:
+        ids = [int(pk) for pk in request.POST.getlist('ids') if pk.isdigit()]
+        alvo = alvo.filter(pk__in=ids)
+
+    with transaction.atomic():
+        if acao == 'aprovar':
+            aprovadas = list(alvo.values_list('pk', flat=True))
+            quantidade = Receita.objects.filter(pk__in=aprovadas).update(status='aprovado', atualizado_em=timezone.now())
+            transaction.on_commit(lambda: indice_despensa.atualizar_receitas(aprovadas))
+            transaction.on_commit(lambda: indice_autocompletar.atualizar_receitas(aprovadas))
+            messages.success(request, f"{quantidade} receita(s) aprovada(s) com sucesso.")
+        else:
+            _, removidas = alvo.delete()
+            quantidade = removidas.get(Receita._meta.label, 0)
+            messages.success(request, f"{quantidade} receita(s) rejeitada(s) e removida(s).")
+
+    return redirect('app_receitas:moderar_receitas')
 
 @login_required
 @user_passes_test(is_superuser)
 def aprovar_receita(request, pk):
-    receita = get_object_or_404(Receita, pk=pk)
+    receita = get_object_or_404(Receita.objects.only('pk', 'nome'), pk=pk)
     receita.status = 'aprovado'
-    receita.save()
+    receita.save(update_fields=['status', 'atualizado_em'])
     messages.success(request, f"A receita '{receita.nome}' foi aprovada com sucesso.")
     return redirect('app_receitas:moderar_receitas')
 
@@ -469,4 +843,22 @@ def rejeitar_receita(request, pk):
     receita = get_object_or_404(Receita, pk=pk)
     receita.delete()
     messages.success(request, f"A receita '{receita.nome}' foi rejeitada e removida.")
-    return redirect('app_receitas:moderar_receitas')
\ No newline at end of file
+    return redirect('app_receitas:moderar_receitas')
+
+def metricas(request):
+    """
+    Expõe os histogramas de tempo por etapa e os contadores do controle de
+    admissão no formato de texto do Prometheus.
+    Acessível a superusuários ou com o token configurado em METRICAS_TOKEN.
+    """
+    token = settings.METRICAS_TOKEN
+    autorizado = request.user.is_superuser or (
+        # Comparação em tempo constante, para o tempo de resposta não revelar o token
+        token and hmac.compare_digest(
+            request.headers.get('Authorization', '').encode('utf-8'), f'Bearer {token}'.encode('utf-8'),
+        )
+    )
+    if not autorizado:
+        return HttpResponseForbidden()
+    corpo = exportar_metricas() + '\n'.join(compartimento_upstream.exportar()) + '\n'
+    return HttpResponse(corpo, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -30,7 +30,7 @@ SECRET_KEY = os.getenv('DJANGO_SECRET_KEY')
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv('DJANGO_DEBUG', 'False') == 'True'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host.strip() for host in os.getenv('DJANGO_ALLOWED_HOSTS', '').split(',') if host.strip()]
 
 
 # Application definition
@@ -53,6 +53,8 @@ CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
 MIDDLEWARE = [
+    'app_receitas.registro.IdRequisicaoMiddleware',
+    'app_receitas.instrumentacao.TempoPorEtapaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -86,11 +88,111 @@ WSGI_APPLICATION = 'gerador_receitas.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+# DB_ENGINE=postgresql para produção; o padrão continua sendo o SQLite local.
+
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', 'gerador_receitas'),
+            'USER': os.getenv('DB_USER', 'postgres'),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            # Conexões persistentes, verificadas antes de reutilizar
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+            'OPTIONS': {},
+        }
     }
+    if os.getenv('DB_POOL', 'False') == 'True':
+        # Pool do psycopg 3 (requer psycopg[pool]); não pode ser usado junto com CONN_MAX_AGE
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX', 10)),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        }
+    }
+    if os.getenv('DB_SQLITE_OTIMIZADO', 'True') == 'True':
+        # WAL permite leituras durante uma escrita; IMMEDIATE pega o lock de escrita no
+        # início da transação e o timeout espera por ele em vez de falhar com "database is locked".
+        DATABASES['default']['OPTIONS'] = {
+            'timeout': int(os.getenv('DB_SQLITE_TIMEOUT', 20)),
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA mmap_size=134217728;'
+                'PRAGMA cache_size=-20000;'
+                'PRAGMA temp_store=MEMORY;'
+            ),
+        }
+
+# Réplicas de leitura: DB_REPLICAS é uma lista separada por vírgulas de hosts
+# (PostgreSQL) ou de arquivos (SQLite, útil para testar localmente).
+DB_REPLICAS = [r.strip() for r in os.getenv('DB_REPLICAS', '').split(',') if r.strip()]
+for numero, replica in enumerate(DB_REPLICAS, start=1):
+    config_replica = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if DB_ENGINE == 'postgresql':
+        config_replica['HOST'] = replica
+    else:
+        config_replica['NAME'] = replica
+    DATABASES[f'replica_{numero}'] = config_replica
+
+if DB_REPLICAS:
+    DATABASE_ROUTERS = ['app_receitas.roteador_banco.RoteadorReplicas']
+    MIDDLEWARE.append('app_receitas.roteador_banco.LeituraEmReplicaMiddleware')
+
+# Views cujas requisições GET podem ler das réplicas
+REPLICA_VIEWS = [
+    'app_receitas:index',
+    'app_receitas:buscar_receitas',
+    'app_receitas:o_que_cozinhar',
+    'app_receitas:detalhes_receita',
+    'app_receitas:comentarios_receita',
+    'app_receitas:interacoes_receita',
+    'app_receitas:receitas_favoritas',
+]
+# Por quanto tempo, após um POST, as leituras do usuário ficam no primário
+REPLICA_FIXACAO_SEGUNDOS = int(os.getenv('REPLICA_FIXACAO_SEGUNDOS', 15))
+
+# Logging configurado aqui, e não no import dos módulos da aplicação.
+# Os registros vão para uma fila e são gravados por uma thread em segundo plano,
+# em texto ou em JSON (LOG_FORMATO=json), sempre com o ID da requisição.
+LOG_FORMATO = os.getenv('LOG_FORMATO', 'texto')
+# Fração dos eventos de DEBUG da TheMealDB e da tradução que chega ao log
+LOG_AMOSTRAGEM_DEBUG = float(os.getenv('LOG_AMOSTRAGEM_DEBUG', 0.01))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'id_requisicao': {'()': 'app_receitas.registro.FiltroIdRequisicao'},
+        'amostragem': {'()': 'app_receitas.registro.FiltroAmostragem', 'taxa': LOG_AMOSTRAGEM_DEBUG},
+    },
+    'handlers': {
+        'fila': {
+            '()': 'app_receitas.registro.HandlerEmFila',
+            'formato': LOG_FORMATO,
+            'tamanho_fila': int(os.getenv('LOG_TAMANHO_FILA', 10000)),
+            'filters': ['id_requisicao'],
+        },
+    },
+    'loggers': {
+        'app_receitas.api_services': {'filters': ['amostragem']},
+        'app_receitas.views': {'filters': ['amostragem']},
+        'app_receitas.traducao': {'filters': ['amostragem']},
+    },
+    'root': {'handlers': ['fila'], 'level': os.getenv('LOG_LEVEL', 'INFO')},
 }
 
 # Password validation
@@ -111,6 +213,9 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Carrega o perfil na mesma consulta do usuário da sessão
+AUTHENTICATION_BACKENDS = ['app_receitas.autenticacao.BackendComPerfil']
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -126,18 +231,148 @@ LOCALE_PATHS = [
     os.path.join(BASE_DIR, 'locale'),
 ]
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-local-cache',
+# Backend de cache configurável por ambiente. O padrão em memória é local a
+# cada processo; use 'arquivo' ou 'redis' para que o aquecimento feito pelo
+# comando `aquecer_cache` seja compartilhado com os workers da aplicação.
+CACHE_BACKEND = os.getenv('DJANGO_CACHE_BACKEND', 'locmem')
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', 'redis://127.0.0.1:6379'),
+        }
     }
+elif CACHE_BACKEND == 'arquivo':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', os.path.join(BASE_DIR, 'cache_django')),
+            'OPTIONS': {'MAX_ENTRIES': 50000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-local-cache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Sessões: 'cached_db' lê do cache e só cai no banco em caso de falta, mas só é
+# seguro com um cache compartilhado entre os workers (redis ou arquivo). 'db' é o
+# padrão do Django; 'cache' e 'signed_cookies' dispensam o banco de vez.
+SESSION_BACKENDS = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
 }
+SESSION_BACKEND = os.getenv('DJANGO_SESSION_BACKEND', 'cached_db' if CACHE_BACKEND in ('redis', 'arquivo') else 'db')
+SESSION_ENGINE = SESSION_BACKENDS[SESSION_BACKEND]
+
+# Serviços externos. Podem apontar para servidores locais de teste (veja o
+# comando `benchmark_receitas`). TRADUCAO_URL deve ser compatível com
+# translate.google.com/m; sem ela, o provedor 'http' usa o próprio Google.
+THEMEALDB_BASE_URL = os.getenv('THEMEALDB_BASE_URL', 'https://www.themealdb.com/api/json/v1/1/')
+TRADUCAO_URL = os.getenv('TRADUCAO_URL')
+
+# Provedores de tradução, em ordem (veja app_receitas/traducao.py): 'http',
+# 'googletrans', 'dicionario' (offline) ou o caminho de uma classe. Cada chamada
+# tem TRADUCAO_PRAZO_SEGUNDOS; se o provedor da vez passa do seu p95 recente
+# (TRADUCAO_HEDGE_SEGUNDOS enquanto há poucas amostras), o próximo é acionado em paralelo.
+TRADUCAO_BACKENDS = os.getenv('TRADUCAO_BACKENDS', 'http' if TRADUCAO_URL else 'http,googletrans').split(',')
+TRADUCAO_PRAZO_SEGUNDOS = float(os.getenv('TRADUCAO_PRAZO_SEGUNDOS', 3))
+TRADUCAO_HEDGE_SEGUNDOS = float(os.getenv('TRADUCAO_HEDGE_SEGUNDOS', 0.8))
+TRADUCAO_HEDGE_PERCENTIL = float(os.getenv('TRADUCAO_HEDGE_PERCENTIL', 95))
+TRADUCAO_HEDGE_MINIMO_SEGUNDOS = 0.05
+TRADUCAO_HEDGE_AMOSTRAS_MINIMAS = 20
+TRADUCAO_THREADS = int(os.getenv('TRADUCAO_THREADS', 8))
+
+# Controle de admissão (app_receitas/admissao.py): quantas requisições por processo
+# podem usar a TheMealDB e o tradutor ao mesmo tempo, e quanto as demais esperam
+# por uma vaga antes de seguir só com o banco e o cache.
+UPSTREAM_MAX_SIMULTANEAS = int(os.getenv('UPSTREAM_MAX_SIMULTANEAS', 4))
+UPSTREAM_FILA_SEGUNDOS = float(os.getenv('UPSTREAM_FILA_SEGUNDOS', 0.5))
+UPSTREAM_RETRY_AFTER_SEGUNDOS = int(os.getenv('UPSTREAM_RETRY_AFTER_SEGUNDOS', 10))
+
+# Páginas públicas com GET condicional (app_receitas/condicional.py): por quanto
+# tempo um proxy reverso pode servir a versão anônima sem revalidar, e um valor a
+# trocar nos deploys que mudam templates, para invalidar os ETags já emitidos.
+PAGINAS_CACHE_SEGUNDOS = int(os.getenv('PAGINAS_CACHE_SEGUNDOS', 60))
+PAGINAS_VERSAO = os.getenv('PAGINAS_VERSAO', '1')
+
+# Tempo (em segundos) que traduções e buscas na TheMealDB ficam em cache
+TRADUCAO_CACHE_TIMEOUT = int(os.getenv('TRADUCAO_CACHE_TIMEOUT', 60 * 60 * 24 * 30))
+BUSCA_CACHE_TIMEOUT = int(os.getenv('BUSCA_CACHE_TIMEOUT', 60 * 60 * 6))
+
+# Hidratação de receitas da TheMealDB: duração da reserva de um worker e quanto
+# tempo os demais esperam por ela antes de mostrar a página de "em preparo". A
+# reserva cobre o pior caso, para não expirar no meio e deixar outro worker repetir
+# as chamadas: o lookup (timeout de 5 s) e até 44 traduções de TRADUCAO_PRAZO_SEGUNDOS
+# (nome, instruções, categoria, área e, em cada um dos 20 ingredientes, o nome e a
+# linha com medida desconhecida), com uma folga de 10 s.
+HIDRATACAO_TRADUCOES_MAXIMAS = 4 + 2 * 20
+HIDRATACAO_LEASE_SEGUNDOS = int(os.getenv(
+    'HIDRATACAO_LEASE_SEGUNDOS', 5 + HIDRATACAO_TRADUCOES_MAXIMAS * TRADUCAO_PRAZO_SEGUNDOS + 10,
+))
+HIDRATACAO_ESPERA_SEGUNDOS = float(os.getenv('HIDRATACAO_ESPERA_SEGUNDOS', 3))
+
+# Receitas por página na fila de moderação
+MODERACAO_POR_PAGINA = int(os.getenv('MODERACAO_POR_PAGINA', 50))
+
+# Índice da busca por despensa: reconstruído após este intervalo para incorporar
+# receitas alteradas por outros workers (as do próprio worker entram na hora)
+DESPENSA_RECONSTRUIR_SEGUNDOS = int(os.getenv('DESPENSA_RECONSTRUIR_SEGUNDOS', 600))
+DESPENSA_RESULTADOS = 30
+
+# Receitas semelhantes: quantas são pré-calculadas por receita e quantas aparecem na página
+SIMILARES_POR_RECEITA = int(os.getenv('SIMILARES_POR_RECEITA', 10))
+SIMILARES_EXIBIDOS = 4
+# Comentários por página no detalhe da receita (os demais vêm pelo botão "carregar mais")
+COMENTARIOS_POR_PAGINA = int(os.getenv('COMENTARIOS_POR_PAGINA', 10))
+# Feed "recomendadas para você" da página inicial
+RECOMENDACOES_HOMEPAGE = 6
+RECOMENDACOES_CACHE_TIMEOUT = int(os.getenv('RECOMENDACOES_CACHE_TIMEOUT', 300))
+
+# Sugestões da busca: índice em memória reconstruído periodicamente, como o da despensa
+AUTOCOMPLETAR_RECONSTRUIR_SEGUNDOS = int(os.getenv('AUTOCOMPLETAR_RECONSTRUIR_SEGUNDOS', 600))
+AUTOCOMPLETAR_MINIMO_CARACTERES = 2
+AUTOCOMPLETAR_SUGESTOES = 8
+
+# Estatísticas de busca: gravadas no banco a cada N consultas ou a cada X segundos
+ESTATISTICAS_BUSCA_LOTE = int(os.getenv('ESTATISTICAS_BUSCA_LOTE', 200))
+ESTATISTICAS_BUSCA_INTERVALO = int(os.getenv('ESTATISTICAS_BUSCA_INTERVALO', 30))
+
+# Token para o Prometheus coletar /metricas/ (sem ele, apenas superusuários acessam)
+METRICAS_TOKEN = os.getenv('METRICAS_TOKEN')
 
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = os.getenv('STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
+
+# Nomes com hash (cache imutável) e versões .gz/.br geradas pelo collectstatic
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': 'app_receitas.arquivos.ArmazenamentoEstatico' if not DEBUG
+        else 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Em produção, estáticos e mídia são servidos pela própria aplicação (SERVIR_ARQUIVOS=True)
+# ou por um proxy na frente dela. Com ARQUIVOS_SENDFILE ('x-accel-redirect' para o nginx,
+# 'x-sendfile' para Apache/lighttpd), o Django só autoriza e o proxy entrega o arquivo;
+# ARQUIVOS_PREFIXO_INTERNO é a location interna do nginx que aponta para STATIC_ROOT/MEDIA_ROOT.
+SERVIR_ARQUIVOS = os.getenv('SERVIR_ARQUIVOS', 'False') == 'True'
+ARQUIVOS_SENDFILE = os.getenv('ARQUIVOS_SENDFILE', '')
+ARQUIVOS_PREFIXO_INTERNO = os.getenv('ARQUIVOS_PREFIXO_INTERNO', '/_arquivos/')
+# Uploads nunca são sobrescritos (o storage gera outro nome), então podem ficar muito tempo em cache
+MEDIA_CACHE_SEGUNDOS = int(os.getenv('MEDIA_CACHE_SEGUNDOS', 60 * 60 * 24 * 30))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -159,4 +394,4 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 
 # Configurações para arquivos de mídia (imagens, etc.)
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
\ No newline at end of file
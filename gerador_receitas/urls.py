@@ -1,8 +1,12 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from app_receitas.arquivos import servir_arquivo
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('app_receitas.urls')),
@@ -13,4 +17,16 @@ urlpatterns = [
 
 # Esta linha permite que o Django sirva arquivos de mídia em desenvolvimento
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+elif settings.SERVIR_ARQUIVOS:
+    urlpatterns += [
+        re_path(rf'^{re.escape(settings.STATIC_URL.lstrip("/"))}(?P<caminho>.+)$', servir_arquivo, {
+            'raiz': settings.STATIC_ROOT,
+            'prefixo_interno': f"{settings.ARQUIVOS_PREFIXO_INTERNO}static/",
+        }),
+        re_path(rf'^{re.escape(settings.MEDIA_URL.lstrip("/"))}(?P<caminho>.+)$', servir_arquivo, {
+            'raiz': settings.MEDIA_ROOT,
+            'cache_control': f"public, max-age={settings.MEDIA_CACHE_SEGUNDOS}",
+            'prefixo_interno': f"{settings.ARQUIVOS_PREFIXO_INTERNO}media/",
+        }),
+    ]